@@ -0,0 +1,153 @@
+"""
+Micro-benchmark: extracción de campos Control-M
+  legacy    -> un re.search por campo (patrón construido en cada llamada)
+  tokenizer -> tokenize_controlm (una pasada)
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.bench_controlm_tokenizer [--iterations 20000] [--fuzz 20000]
+"""
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.service.controlm_tokenizer import CONTROLM_FIELDS, tokenize_controlm
+
+
+SAMPLES_FILE = Path("logs/controlm/controlm_log_alerts.txt")
+
+LEGACY_SAMPLE = (
+    "Detected Entry: 2025-02-09 07:09:52 call_type: I alert_id: 170172 data_center: CTMlinux "
+    "memname: BPHXCTLM.ksh order_id: 1oje6 severity: V status: Not_Noticed send_time: 20250209070952 "
+    "last_user: last_time: message: Ended not OK run_as: cntrlm sub_application: KXWHD_PROD-GP "
+    "application: KXWHD job_name: KMWHD001 host_id: kcmcsappp alert_type: R closed_from_em: "
+    "ticket_number: run_counter: 00002"
+)
+
+
+# -------------------------------------------------
+# Implementación anterior (referencia)
+# -------------------------------------------------
+
+def _norm(s: Optional[str]) -> Optional[str]:
+    if s is None:
+        return None
+    s = s.strip()
+    return s if s != "" else None
+
+
+def _val_between(text: str, key: str, next_key: str) -> Optional[str]:
+    pattern = rf"{re.escape(key)}:\s*(?P<val>.*?)\s+{re.escape(next_key)}:"
+    m = re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL)
+    if not m:
+        return None
+    return _norm(m.group("val"))
+
+
+def _val_after(text: str, key: str) -> Optional[str]:
+    pattern = rf"{re.escape(key)}:\s*(?P<val>.*)$"
+    m = re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL)
+    if not m:
+        return None
+    return _norm(m.group("val"))
+
+
+def _date_value(text: str, key: str) -> Optional[str]:
+    old_format = f"Detected Entry: {text}"
+    pattern = rf"{re.escape(key)}:\s*(?P<dt>\d{{4}}-\d{{2}}-\d{{2}}\s+\d{{2}}:\d{{2}}:\d{{2}})"
+    m = re.search(pattern, old_format, flags=re.IGNORECASE)
+    if not m:
+        return None
+    return _norm(m.group("dt"))
+
+
+def legacy_fields(text: str) -> Dict[str, Optional[str]]:
+    fields: Dict[str, Optional[str]] = {"detected_entry": _date_value(text, "Detected Entry")}
+    for key, next_key in CONTROLM_FIELDS:
+        if next_key is None:
+            fields[key] = _val_after(text, key)
+        else:
+            fields[key] = _val_between(text, key, next_key)
+    return fields
+
+
+# -------------------------------------------------
+# Datos
+# -------------------------------------------------
+
+def load_samples() -> List[str]:
+    """Reconstruye el mensaje syslog ("<fecha> call_type:...") desde controlm_log_alerts.txt."""
+    samples = [LEGACY_SAMPLE]
+    if SAMPLES_FILE.exists():
+        for line in SAMPLES_FILE.read_text(encoding="utf-8", errors="replace").splitlines():
+            parts = line.split(",", 3)
+            if len(parts) == 4:
+                samples.append(f"{parts[2]} {parts[3]}")
+    return samples
+
+
+def fuzz_inputs(samples: List[str], count: int, seed: int = 7) -> List[str]:
+    """Variantes: keys repetidas/faltantes, valores vacíos, mayúsculas, saltos de línea."""
+    rnd = random.Random(seed)
+    keys = [k for pair in CONTROLM_FIELDS for k in pair if k]
+    noise = [" ", "  ", "\n", "\t", ":", "x", "None", "_", "sub_", "application:", "\u017feverity:", "\u0130d:", "\u212a"]
+    out = []
+    for _ in range(count):
+        tokens = rnd.choice(samples).split(" ")
+        for _ in range(rnd.randint(1, 6)):
+            op = rnd.random()
+            i = rnd.randrange(len(tokens) + 1)
+            if op < 0.3:
+                tokens.insert(i, rnd.choice(keys) + ":" + rnd.choice(["", "v", " "]))
+            elif op < 0.5 and tokens:
+                tokens.pop(min(i, len(tokens) - 1))
+            elif op < 0.7:
+                tokens.insert(i, rnd.choice(noise))
+            elif tokens:
+                j = min(i, len(tokens) - 1)
+                tokens[j] = tokens[j].upper()
+        out.append(" ".join(tokens))
+    return out
+
+
+# -------------------------------------------------
+# Main
+# -------------------------------------------------
+
+def _bench(fn, inputs: List[str], iterations: int) -> float:
+    n = len(inputs)
+    t0 = time.perf_counter()
+    for i in range(iterations):
+        fn(inputs[i % n])
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=20000)
+    ap.add_argument("--fuzz", type=int, default=20000)
+    args = ap.parse_args()
+
+    samples = load_samples()
+
+    mismatches = 0
+    for text in samples + fuzz_inputs(samples, args.fuzz):
+        if legacy_fields(text) != tokenize_controlm(text):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"MISMATCH: {text!r}")
+
+    legacy_us = _bench(legacy_fields, samples, args.iterations)
+    tokenizer_us = _bench(tokenize_controlm, samples, args.iterations)
+
+    print(f"samples={len(samples)} fuzz={args.fuzz} mismatches={mismatches}")
+    print(f"legacy    : {legacy_us:8.2f} us/msg")
+    print(f"tokenizer : {tokenizer_us:8.2f} us/msg")
+    print(f"speedup   : {legacy_us / tokenizer_us:8.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
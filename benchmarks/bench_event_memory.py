@@ -0,0 +1,72 @@
+"""
+Benchmark de memoria: bytes por evento en vuelo (después de parsear,
+antes de escribir a DB)
+  legacy  -> SyslogPacket.message (str) + dict + SyslogEvent (dataclass)
+  compact -> parse_event: CompactSyslogEvent sobre los bytes del datagram
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.bench_event_memory [--messages 50000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Callable, List
+
+from benchmarks.bench_syslog_parser import legacy_event, make_packets
+from src.service.syslog_parser import parse_event
+
+
+def _packets(count: int, hosts: int) -> List:
+    # Paquetes frescos (sin message decodificado) en cada medición
+    return make_packets(count, hosts, seconds=60)
+
+
+def measure(build: Callable, count: int, hosts: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+
+    packets = _packets(count, hosts)
+    events = [build(p) for p in packets]
+    # El paquete sale de la cola al parsear: solo cuenta lo que retiene el evento
+    del packets
+    gc.collect()
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_event = (current - base) / len(events)
+    del events
+    return per_event
+
+
+def _bench(build: Callable, count: int, hosts: int) -> float:
+    packets = _packets(count, hosts)
+    t0 = time.perf_counter()
+    for p in packets:
+        build(p)
+    return (time.perf_counter() - t0) / count * 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=50000)
+    ap.add_argument("--hosts", type=int, default=50)
+    args = ap.parse_args()
+
+    # Calienta caches (timestamps / interning) para no medirlos como parte del evento
+    for p in _packets(1000, args.hosts):
+        parse_event(p)
+
+    legacy_bytes = measure(legacy_event, args.messages, args.hosts)
+    compact_bytes = measure(parse_event, args.messages, args.hosts)
+
+    print(f"messages={args.messages} hosts={args.hosts}")
+    print(f"legacy  : {legacy_bytes:8.1f} bytes/event  {_bench(legacy_event, args.messages, args.hosts):6.2f} us/msg")
+    print(f"compact : {compact_bytes:8.1f} bytes/event  {_bench(parse_event, args.messages, args.hosts):6.2f} us/msg")
+    print(f"ratio   : {legacy_bytes / compact_bytes:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: resolve_router con miles de reglas
+  IPs exactas + CIDRs (/16../32) + hostnames exactos + *.sufijos
+  sin cache (lookup directo) vs con LRU de (source_ip, hostname)
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.bench_routes [--rules 5000] [--lookups 200000] [--senders 2000]
+"""
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.service.routes_loader import load_routes, resolve_router
+
+
+def build_routes(rules: int, seed: int = 7) -> dict:
+    rnd = random.Random(seed)
+    routers = []
+    per = max(1, rules // 4)
+    for r in range(8):
+        routers.append({"id": r, "name": f"router-{r}", "ip_addresses": [], "hostnames": []})
+    for i in range(per):
+        router = routers[rnd.randrange(len(routers))]
+        router["ip_addresses"].append(f"10.{rnd.randrange(256)}.{rnd.randrange(256)}.{rnd.randrange(256)}")
+        plen = rnd.choice([16, 20, 24, 28, 32])
+        router["ip_addresses"].append(f"172.{rnd.randrange(16, 32)}.{rnd.randrange(256)}.0/{plen}")
+        router["hostnames"].append(f"host{i}.site{rnd.randrange(50)}.corp")
+        router["hostnames"].append(f"*.zone{i}.corp")
+    return {"version": 1, "default_router": "raw", "routers": routers}
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rules", type=int, default=5000)
+    ap.add_argument("--lookups", type=int, default=200000)
+    ap.add_argument("--senders", type=int, default=2000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "routes.json"
+        path.write_text(json.dumps(build_routes(args.rules)), encoding="utf-8")
+        cached = load_routes(str(path), cache_size=4096)
+        uncached = load_routes(str(path), cache_size=0)
+
+    rnd = random.Random(11)
+    per = max(1, args.rules // 4)
+    senders = [
+        (
+            f"{rnd.choice(['10', '172'])}.{rnd.randrange(16, 32)}.{rnd.randrange(256)}.{rnd.randrange(256)}",
+            rnd.choice([f"host{rnd.randrange(per)}.site1.corp", f"a.b.zone{rnd.randrange(per)}.corp", "unknown"]),
+        )
+        for _ in range(args.senders)
+    ]
+    traffic = [senders[rnd.randrange(len(senders))] for _ in range(args.lookups)]
+
+    mismatches = sum(1 for ip, host in senders if resolve_router(cached, ip, host) != resolve_router(uncached, ip, host))
+
+    results = {}
+    for label, index in (("uncached", uncached), ("lru", cached)):
+        t0 = time.perf_counter()
+        for ip, host in traffic:
+            resolve_router(index, ip, host)
+        results[label] = (time.perf_counter() - t0) / len(traffic) * 1e6
+
+    print(f"rules={args.rules} senders={args.senders} lookups={args.lookups} mismatches={mismatches}")
+    print(f"uncached : {results['uncached']:6.2f} us/lookup")
+    print(f"lru      : {results['lru']:6.2f} us/lookup")
+    print(f"index    : {cached.stats()}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+"""
+Benchmark: bytes por evento según MSSQL_STORAGE_MODE (full / compact / compressed)
+  DB local de reemplazo: SQLite con las mismas columnas que syslog_events y
+  ControlM_Router_Logs (raw NULL-able + raw_z, ver queries/storage_mode.sql)
+  - bytes de texto estimados como SQL Server (NVARCHAR = 2 bytes/char, VARBINARY tal cual)
+  - tamaño real del archivo SQLite (UTF-8, referencia)
+  - verifica que read_raw devuelva el raw original en todas las filas
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.bench_storage_mode [--messages 20000] [--controlm-ratio 0.2]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from typing import List
+
+from benchmarks.e2e.loadgen import messages
+from src.core.syslog_listener import SyslogPacket
+from src.service.syslog_parser import parse_event
+from src.storage.mssql_writer import MSSQLWriter
+from src.storage.raw_storage import (
+    CONTROLM_ROUTER_LOGS_LAYOUT,
+    STORAGE_MODES,
+    SYSLOG_EVENTS_LAYOUT,
+    StorageStats,
+    read_raw,
+    storage_rows,
+)
+
+
+SCHEMA = """
+CREATE TABLE syslog_events (
+    event_id INTEGER PRIMARY KEY,
+    received_at_utc TEXT, source_ip TEXT, source_port INTEGER, router_name TEXT,
+    pri INTEGER, facility INTEGER, severity INTEGER,
+    syslog_ts_utc TEXT, syslog_ts_raw TEXT,
+    hostname TEXT, app_name TEXT, pid INTEGER,
+    message TEXT NOT NULL, raw TEXT, raw_z BLOB
+);
+CREATE TABLE ControlM_Router_Logs (
+    log_id INTEGER PRIMARY KEY,
+    received_at_utc TEXT, source_ip TEXT, source_port INTEGER,
+    router_name TEXT, hostname TEXT, app_name TEXT,
+    pri INTEGER, facility INTEGER, severity INTEGER,
+    syslog_ts_utc TEXT, syslog_ts_raw TEXT,
+    message TEXT NOT NULL, raw TEXT, raw_z BLOB
+);
+"""
+
+
+def make_events(count: int, controlm_ratio: float, seed: int = 7) -> List:
+    """Tráfico del generador e2e (RFC 3164 + Control-M) y ~10% de otros formatos."""
+    rnd = random.Random(seed)
+    gen = messages(controlm_ratio, seed)
+    others = [
+        '<165>1 2026-10-18T14:22:01.003Z fw-edge01 pan 2211 TRAFFIC [meta seq="1"] allow tcp 10.1.2.3:443',
+        '{"host":"k8s-node3","app":"kubelet","level":"warning","msg":"image pull backoff","pod":"api-7f9"}',
+        "CEF:0|Fortinet|FortiGate|7.2|13|Blocked|7|src=10.4.4.4 dst=8.8.8.8 dvchost=fgt01",
+        "watchtower test desde windows",
+    ]
+    events = []
+    for _ in range(count):
+        if rnd.random() < 0.1:
+            text = rnd.choice(others)
+            is_controlm = False
+        else:
+            _id, is_controlm, template = next(gen)
+            text = template.format(mark="").rstrip()
+        packet = SyslogPacket(source_ip="10.1.59.21", source_port=514, raw=text.encode("utf-8"))
+        events.append((parse_event(packet), is_controlm))
+    return events
+
+
+def _sqlserver_bytes(row: tuple, layout) -> int:
+    """message + raw (NVARCHAR, 2 B/char) + raw_z (VARBINARY)."""
+    n = 2 * len(row[layout.message])
+    raw = row[layout.raw]
+    if raw is not None:
+        n += 2 * len(raw)
+    if len(row) > layout.raw + 1 and row[layout.raw + 1] is not None:
+        n += len(row[layout.raw + 1])
+    return n
+
+
+def run_mode(mode: str, events: List) -> dict:
+    syslog_rows = [MSSQLWriter.syslog_event_row(e, "sandbox") for e, _ in events]
+    controlm_rows = [MSSQLWriter.controlm_router_log_row(e, "sandbox") for e, is_ctm in events if is_ctm]
+
+    def _ser(rows):
+        # SQLite no tiene datetime: se guarda como texto ISO
+        return [tuple(v.isoformat() if hasattr(v, "isoformat") else v for v in r) for r in rows]
+
+    t0 = time.perf_counter()
+    stats_logs, stats_ctm = StorageStats(), StorageStats()
+    out_logs = storage_rows(mode, syslog_rows, SYSLOG_EVENTS_LAYOUT, stats_logs)
+    out_ctm = storage_rows(mode, controlm_rows, CONTROLM_ROUTER_LOGS_LAYOUT, stats_ctm)
+    encode_us = (time.perf_counter() - t0) / max(1, len(out_logs) + len(out_ctm)) * 1e6
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"{mode}.db")
+        db = sqlite3.connect(path)
+        db.executescript(SCHEMA)
+        if mode == "full":
+            out_logs = [r + (None,) for r in out_logs]
+            out_ctm = [r + (None,) for r in out_ctm]
+        db.executemany(
+            "INSERT INTO syslog_events (received_at_utc, source_ip, source_port, router_name, pri, facility, severity, "
+            "syslog_ts_utc, syslog_ts_raw, hostname, app_name, pid, message, raw, raw_z) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _ser(out_logs),
+        )
+        db.executemany(
+            "INSERT INTO ControlM_Router_Logs (received_at_utc, source_ip, source_port, router_name, hostname, app_name, "
+            "pri, facility, severity, syslog_ts_utc, syslog_ts_raw, message, raw, raw_z) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _ser(out_ctm),
+        )
+        db.commit()
+
+        # Lectura transparente: el raw reconstruido tiene que ser idéntico
+        mismatches = 0
+        originals = iter(e.raw for e, _ in events)
+        for raw, raw_z, pri, ts_raw, host, app, pid, msg in db.execute(
+            "SELECT raw, raw_z, pri, syslog_ts_raw, hostname, app_name, pid, message FROM syslog_events ORDER BY event_id"
+        ):
+            if read_raw(raw, raw_z, pri, ts_raw, host, app, pid, msg) != next(originals):
+                mismatches += 1
+        originals = iter(e.raw for e, is_ctm in events if is_ctm)
+        for raw, raw_z, pri, ts_raw, host, app, msg in db.execute(
+            "SELECT raw, raw_z, pri, syslog_ts_raw, hostname, app_name, message FROM ControlM_Router_Logs ORDER BY log_id"
+        ):
+            if read_raw(raw, raw_z, pri, ts_raw, host, app, None, msg) != next(originals):
+                mismatches += 1
+
+        db.execute("VACUUM")
+        db.close()
+        file_bytes = os.path.getsize(path)
+
+    rows = len(out_logs) + len(out_ctm)
+    text_bytes = sum(_sqlserver_bytes(r, SYSLOG_EVENTS_LAYOUT) for r in out_logs)
+    text_bytes += sum(_sqlserver_bytes(r, CONTROLM_ROUTER_LOGS_LAYOUT) for r in out_ctm)
+    return {
+        "mode": mode,
+        "events": len(events),
+        "rows": rows,
+        "text_bytes_per_event": round(text_bytes / len(events), 1),
+        "sqlite_bytes_per_event": round(file_bytes / len(events), 1),
+        "raw_rebuilt": stats_logs.rebuilt + stats_ctm.rebuilt,
+        "raw_compressed": stats_logs.compressed + stats_ctm.compressed,
+        "encode_us_per_row": round(encode_us, 2),
+        "mismatches": mismatches,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=20000)
+    ap.add_argument("--controlm-ratio", type=float, default=0.2)
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    events = make_events(args.messages, args.controlm_ratio)
+    results = [run_mode(mode, events) for mode in STORAGE_MODES]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        base = results[0]
+        print(f"events={args.messages} controlm_ratio={args.controlm_ratio} (syslog_events + ControlM_Router_Logs)")
+        for r in results:
+            saved = 1 - r["text_bytes_per_event"] / base["text_bytes_per_event"]
+            print(
+                f"{r['mode']:10s}: {r['text_bytes_per_event']:8.1f} B/event (NVARCHAR est., {saved:6.1%} less)  "
+                f"sqlite {r['sqlite_bytes_per_event']:8.1f} B/event  rebuilt={r['raw_rebuilt']} "
+                f"compressed={r['raw_compressed']} encode={r['encode_us_per_row']}us/row mismatches={r['mismatches']}"
+            )
+    return 1 if any(r["mismatches"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
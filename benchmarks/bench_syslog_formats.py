@@ -0,0 +1,88 @@
+"""
+Micro-benchmark: despacho por formato (syslog_formats.detect_format)
+  regex_miss -> camino anterior para todo lo que no es RFC 3164:
+                RFC3164_RE.match falla y se arma el resultado vacío
+  dispatch   -> solo detect_format (primeros caracteres, sin regex)
+  parse      -> detect_format + parser especializado (parse_syslog_rsyslog)
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.bench_syslog_formats [--iterations 200000]
+"""
+import argparse
+import time
+from typing import Callable, Dict
+
+from src.service.syslog_formats import detect_format
+from src.service.syslog_parser import RFC3164_RE, parse_syslog_rsyslog
+
+
+SAMPLES: Dict[str, str] = {
+    "rfc3164": "<13>Feb 18 21:45:10 hlarapc app[1]: hello world",
+    "rfc5424": (
+        '<165>1 2003-10-11T22:14:15.003Z mymachine.example.com evntslog 123 ID47 '
+        '[exampleSDID@32473 iut="3" eventSource="Application" eventID="1011"] An application event log entry'
+    ),
+    "json": (
+        '{"@timestamp":"2025-01-01T00:00:00Z","host":"web01","program":"nginx","pid":812,'
+        '"level":"error","message":"upstream timed out","path":"/api"}'
+    ),
+    "cef": (
+        "CEF:0|Security|threatmanager|1.0|100|worm successfully stopped|10|"
+        "src=10.0.0.1 dst=2.1.2.2 spt=1232 dvchost=fw01"
+    ),
+    "unknown": "plain text line from a device without syslog header",
+}
+
+
+def legacy_miss(message: str) -> dict:
+    msg_in = message.strip()
+    if RFC3164_RE.match(msg_in):
+        return {}
+    return {
+        "pri": None,
+        "facility": None,
+        "severity": None,
+        "timestamp": None,
+        "timestamp_raw": None,
+        "hostname": None,
+        "app_name": None,
+        "pid": None,
+        "message": msg_in,
+        "raw": message,
+    }
+
+
+def _bench(fn: Callable[[str], object], text: str, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn(text)
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--iterations", type=int, default=200000)
+    args = ap.parse_args()
+
+    failures = 0
+    print(f"{'format':<10} {'regex_miss':>11} {'dispatch':>10} {'parse':>10}   (us/msg)")
+    for name, text in SAMPLES.items():
+        detected = detect_format(text)
+        if detected != name:
+            failures += 1
+            print(f"DETECT MISMATCH: {name} -> {detected}")
+
+        miss_us = _bench(legacy_miss, text, args.iterations)
+        dispatch_us = _bench(detect_format, text, args.iterations)
+        parse_us = _bench(parse_syslog_rsyslog, text, args.iterations)
+        print(f"{name:<10} {miss_us:>11.3f} {dispatch_us:>10.3f} {parse_us:>10.3f}")
+
+        if name != "rfc3164" and dispatch_us >= miss_us:
+            failures += 1
+            print(f"  dispatch not cheaper than regex miss for {name}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: SyslogPacket -> SyslogEvent
+  legacy     -> parse_syslog_rsyslog (dict) + SyslogEvent(...), strptime por mensaje
+  parse_many -> evento directo (CompactSyslogEvent si es ASCII), timestamps
+                memoizados, strings internados
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.bench_syslog_parser [--messages 50000] [--hosts 50] [--seconds 60]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from src.core.syslog_listener import make_packet
+from src.domain.models import SyslogEvent
+from src.service.syslog_parser import parse_many, parse_syslog_rsyslog, parser_stats
+
+
+APPS = ["sshd[812]", "CRON[4410]", "controlm_test:", "kernel:", "systemd[1]", "app/worker-1[77]"]
+
+
+def legacy_event(packet) -> SyslogEvent:
+    parsed = parse_syslog_rsyslog(packet.message)
+    return SyslogEvent(
+        received_at_utc=packet.received_at_utc,
+        source_ip=packet.source_ip,
+        source_port=packet.source_port,
+        pri=parsed["pri"],
+        facility=parsed["facility"],
+        severity=parsed["severity"],
+        timestamp=parsed["timestamp"],
+        timestamp_raw=parsed["timestamp_raw"],
+        hostname=parsed["hostname"],
+        app_name=parsed["app_name"],
+        pid=parsed["pid"],
+        message=parsed["message"],
+        raw=parsed["raw"],
+    )
+
+
+def make_packets(count: int, hosts: int, seconds: int, seed: int = 7) -> List:
+    """Tráfico sintético: pocos hosts/apps, muchos mensajes por segundo, algo de basura."""
+    rnd = random.Random(seed)
+    base = int(datetime.now(timezone.utc).replace(month=2, day=18, hour=21, minute=0, second=0).timestamp())
+    packets = []
+    for i in range(count):
+        h = rnd.randrange(hosts)
+        ts = time.strftime("%b %d %H:%M:%S", time.gmtime(base + rnd.randrange(seconds)))
+        if rnd.random() < 0.02:
+            line = f"garbage line {i} without header"
+        else:
+            line = f"<{rnd.randrange(192)}>{ts} host-{h:03d} {rnd.choice(APPS)} message number {i} status=ok"
+        packets.append(make_packet(line.encode(), f"10.0.{h // 250}.{h % 250}", 50000 + h))
+    return packets
+
+
+def _bench(fn, packets: List, rounds: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn(packets)
+    return (time.perf_counter() - t0) / (rounds * len(packets)) * 1e6
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--messages", type=int, default=50000)
+    ap.add_argument("--hosts", type=int, default=50)
+    ap.add_argument("--seconds", type=int, default=60)
+    ap.add_argument("--rounds", type=int, default=3)
+    args = ap.parse_args()
+
+    packets = make_packets(args.messages, args.hosts, args.seconds)
+    # Decodifica una vez para que ambos midan solo el parseo
+    for p in packets:
+        p.message
+
+    expected = [legacy_event(p) for p in packets]
+    parsed = [getattr(e, "to_event", lambda e=e: e)() for e in parse_many(packets)]
+    mismatches = sum(1 for a, b in zip(expected, parsed) if a != b)
+
+    legacy_us = _bench(lambda ps: [legacy_event(p) for p in ps], packets, args.rounds)
+    many_us = _bench(parse_many, packets, args.rounds)
+
+    print(f"messages={len(packets)} hosts={args.hosts} distinct_seconds={args.seconds} mismatches={mismatches}")
+    print(f"legacy     : {legacy_us:8.2f} us/msg")
+    print(f"parse_many : {many_us:8.2f} us/msg")
+    print(f"speedup    : {legacy_us / many_us:8.2f}x")
+    print(f"parser     : {parser_stats()}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+"""
+DB falsa para el benchmark end-to-end: misma interfaz que MSSQLWriter (sin pyodbc ni SQL Server)
+- latencia inyectada por llamada (insert_latency_ms) y por fila (row_latency_us)
+- cada fila insertada se marca con su hora de commit; el mensaje trae "wtbench=<id>:<ns>"
+  (hora de envío del generador) => latencia end-to-end por mensaje
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from src.storage.mssql_writer import MSSQLWriter
+
+
+# Posición de message en las filas de cada tabla (ver MSSQLWriter.*_row)
+_MESSAGE_COL = {"syslog_events": 12, "controlm_router_logs": 11}
+MARKER = "wtbench="
+
+
+def _marker(message: Optional[str]):
+    if not message:
+        return None
+    i = message.find(MARKER)
+    if i < 0:
+        return None
+    token = message[i + len(MARKER):].split(" ", 1)[0]
+    msg_id, _, sent_ns = token.partition(":")
+    try:
+        return int(msg_id), int(sent_ns)
+    except ValueError:
+        return None
+
+
+class FakeMSSQLWriter:
+    def __init__(self, insert_latency_ms: float = 0.0, row_latency_us: float = 0.0):
+        self.insert_latency = insert_latency_ms / 1000.0
+        self.row_latency = row_latency_us / 1e6
+
+        self._lock = threading.Lock()
+        # tabla -> [(msg_id, ns de envío, ns de commit)]
+        self.stored: Dict[str, List[tuple]] = {"syslog_events": [], "controlm_router_logs": []}
+        self.rows = {"syslog_events": 0, "controlm_router_logs": 0}
+        self.calls = 0
+        self.last_commit_ns = 0
+
+    def _insert(self, table: str, rows: Sequence[tuple]) -> None:
+        delay = self.insert_latency + self.row_latency * len(rows)
+        if delay > 0:
+            time.sleep(delay)
+        now = time.time_ns()
+        col = _MESSAGE_COL[table]
+        marks = []
+        for row in rows:
+            m = _marker(row[col])
+            if m is not None:
+                marks.append((m[0], m[1], now))
+        with self._lock:
+            self.calls += 1
+            self.rows[table] += len(rows)
+            self.stored[table].extend(marks)
+            self.last_commit_ns = now
+
+    # -------------------------
+    # Interfaz MSSQLWriter
+    # -------------------------
+    def insert_syslog_event(self, event, router_name: str) -> None:
+        self._insert("syslog_events", [MSSQLWriter.syslog_event_row(event, router_name)])
+
+    def insert_syslog_events(self, rows: Sequence[tuple]) -> None:
+        self._insert("syslog_events", rows)
+
+    def insert_controlm_router_log(self, event, router_name: str) -> None:
+        self._insert("controlm_router_logs", [MSSQLWriter.controlm_router_log_row(event, router_name)])
+
+    def insert_controlm_router_logs(self, rows: Sequence[tuple]) -> None:
+        self._insert("controlm_router_logs", rows)
+
+    def fetch_controlm_jobs(self, since=None) -> List[tuple]:
+        return [("BENCHJOB01", "Z-BENCH-GRP", "Bench Group", 2, None)]
+
+    def fetch_controlm_job(self, job_name: str):
+        return None
+
+    def lookup_controlm_job(self, job_name):
+        return {"group_code": None, "group_name": None, "sev_num": None}
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {"fake_calls": self.calls, "fake_rows": dict(self.rows)}
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,137 @@
+"""
+Generador de carga UDP: tráfico RFC 3164 + Control-M a una tasa fija
+- mensajes marcados con "wtbench=<id>:<ns de envío>" (ver fake_db)
+- envío en ráfagas cada tick (1 ms) para sostener la tasa sin un sleep por mensaje
+
+Uso suelto contra un Watchtower ya corriendo (desde la raíz del repo):
+  python -m benchmarks.e2e.loadgen --host 127.0.0.1 --port 514 --rate 2000 --duration 10 [--controlm-ratio 0.1]
+"""
+import argparse
+import random
+import socket
+import time
+from datetime import datetime
+from typing import Iterator, Tuple
+
+from benchmarks.e2e.fake_db import MARKER
+
+
+# Hostnames que routes.json del benchmark manda a cada router
+SYSLOG_HOSTS = ("web01", "web02", "db01", "fw-edge01", "lb01")
+CONTROLM_HOST = "ctm-bench01"
+
+_APPS = ("sshd[812]", "CRON[4431]", "kernel", "nginx[2210]", "systemd[1]")
+_TEXTS = (
+    "Accepted publickey for svc_deploy from 10.2.3.4 port 51122 ssh2",
+    "pam_unix(cron:session): session opened for user root by (uid=0)",
+    "TCP: request_sock_TCP: Possible SYN flooding on port 443. Sending cookies.",
+    '10.9.8.7 - - "GET /health HTTP/1.1" 200 2 "-" "kube-probe/1.27"',
+    "Started Session 4211 of user svc_backup.",
+)
+
+
+def _syslog_ts(now: datetime) -> str:
+    # RFC 3164: día con padding de espacio ("Feb  8")
+    return f"{now:%b} {now.day:2d} {now:%H:%M:%S}"
+
+
+def controlm_text(alert_id: int, severity: str = "V") -> str:
+    detected = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return (
+        f"{detected} call_type: I alert_id: {alert_id} data_center: CTMlinux "
+        f"memname: BENCH.ksh order_id: 1oje6 severity: {severity} status: Not_Noticed "
+        f"send_time: 20250209070952 last_user: last_time: message: Ended not OK run_as: cntrlm "
+        f"sub_application: BENCH-GP application: BENCH job_name: BENCHJOB01 host_id: kcmcsappp "
+        f"alert_type: R closed_from_em: ticket_number: run_counter: 00002"
+    )
+
+
+def messages(controlm_ratio: float, seed: int = 7) -> Iterator[Tuple[int, bool, str]]:
+    """(msg_id, es_controlm, plantilla con {mark}) infinito."""
+    rnd = random.Random(seed)
+    msg_id = 0
+    while True:
+        msg_id += 1
+        ts = _syslog_ts(datetime.now())
+        if rnd.random() < controlm_ratio:
+            # alert_id único (sin dedupe): severity V => alerta, R => skip por severity
+            sev = "V" if rnd.random() < 0.5 else "R"
+            yield msg_id, True, f"<13>{ts} {CONTROLM_HOST} ctmagent: {controlm_text(msg_id, sev)} {{mark}}"
+        else:
+            host = SYSLOG_HOSTS[rnd.randrange(len(SYSLOG_HOSTS))]
+            app = _APPS[rnd.randrange(len(_APPS))]
+            text = _TEXTS[rnd.randrange(len(_TEXTS))]
+            pri = 8 + rnd.choice((3, 4, 5, 6))
+            yield msg_id, False, f"<{pri}>{ts} {host} {app}: {text} {{mark}}"
+
+
+class LoadResult:
+    def __init__(self):
+        self.sent = 0
+        self.sent_controlm = 0
+        self.send_errors = 0
+        self.started_ns = 0
+        self.finished_ns = 0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_ns - self.started_ns) / 1e9
+
+    def as_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "sent_controlm": self.sent_controlm,
+            "send_errors": self.send_errors,
+            "send_elapsed_sec": round(self.elapsed, 3),
+            "send_rate": round(self.sent / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+        }
+
+
+def run_load(host: str, port: int, rate: float, duration: float, controlm_ratio: float = 0.1, seed: int = 7) -> LoadResult:
+    result = LoadResult()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4 * 1024 * 1024)
+    target = (host, port)
+    gen = messages(controlm_ratio, seed)
+
+    total = int(rate * duration)
+    tick = 0.001
+    start = time.perf_counter()
+    result.started_ns = time.time_ns()
+    try:
+        while result.sent < total:
+            # Cuántos deberían haberse enviado a esta altura
+            due = min(total, int((time.perf_counter() - start) * rate) + 1)
+            while result.sent < due:
+                msg_id, is_controlm, template = next(gen)
+                payload = template.format(mark=f"{MARKER}{msg_id}:{time.time_ns()}").encode("utf-8")
+                try:
+                    sock.sendto(payload, target)
+                except OSError:
+                    result.send_errors += 1
+                result.sent += 1
+                if is_controlm:
+                    result.sent_controlm += 1
+            time.sleep(tick)
+    finally:
+        result.finished_ns = time.time_ns()
+        sock.close()
+    return result
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=514)
+    ap.add_argument("--rate", type=float, default=1000)
+    ap.add_argument("--duration", type=float, default=10)
+    ap.add_argument("--controlm-ratio", type=float, default=0.1)
+    args = ap.parse_args()
+
+    result = run_load(args.host, args.port, args.rate, args.duration, args.controlm_ratio)
+    print(result.as_dict())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
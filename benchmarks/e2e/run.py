@@ -0,0 +1,221 @@
+"""
+Benchmark end-to-end: generador UDP -> ListenerService -> DB falsa
+  - ListenerService real (listener, ingest, routing, pipelines, BatchingWriter, Control-M)
+    con FakeMSSQLWriter en lugar de MSSQLWriter/pyodbc (latencia inyectada)
+  - reporta msgs/s sostenidos, drop rate y latencia end-to-end p50/p99 (envío -> commit)
+  - compara contra baselines.json: exit 1 si algún escenario empeora más que la tolerancia
+
+Uso (desde la raíz del repo):
+  python -m benchmarks.e2e.run                       # todos los escenarios
+  python -m benchmarks.e2e.run --scenario mixed_2k --duration 5
+  python -m benchmarks.e2e.run --update-baselines    # guarda lo medido como baseline
+
+Las baselines dependen de la máquina: regenerarlas en el host de referencia.
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.e2e.fake_db import FakeMSSQLWriter
+from benchmarks.e2e.loadgen import CONTROLM_HOST, run_load
+
+
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+
+# Entorno del servicio durante el benchmark (el escenario puede sobreescribir)
+BASE_ENV = {
+    "CONSOLE_OUTPUT": "0",
+    "STATS_INTERVAL_SEC": "0",
+    "METRICS_PORT": "0",
+    "SPOOL_ENABLED": "0",
+    "ROUTES_RELOAD_SEC": "0",
+    "SYSLOG_RCVBUF_BYTES": str(8 * 1024 * 1024),
+}
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def _routes(path: Path) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "default_router": "raw",
+                "routers": [{"id": 1, "name": "controlm", "ip_addresses": [], "hostnames": [CONTROLM_HOST]}],
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def _sustained_rate(stored: List[tuple], started_ns: int, finished_ns: int) -> float:
+    """
+    Commits por segundo en régimen: ventana del envío sin el primer segundo (arranque,
+    primer batch). Si el pipeline no alcanza la tasa, aquí se nota (el drain final no cuenta).
+    """
+    warmup_ns = 1_000_000_000
+    start = started_ns + warmup_ns if finished_ns - started_ns > 2 * warmup_ns else started_ns
+    span = (finished_ns - start) / 1e9
+    if span <= 0:
+        return 0.0
+    committed = sum(1 for _id, _sent, at in stored if start <= at <= finished_ns)
+    return round(committed / span, 1)
+
+
+def _wait_drained(fake: FakeMSSQLWriter, expected: int, idle_timeout: float) -> None:
+    """Espera hasta ver `expected` filas en syslog_events o idle_timeout sin progreso."""
+    last = -1
+    last_change = time.monotonic()
+    while True:
+        stored = fake.rows["syslog_events"]
+        if stored >= expected:
+            return
+        if stored != last:
+            last = stored
+            last_change = time.monotonic()
+        elif time.monotonic() - last_change > idle_timeout:
+            return
+        time.sleep(0.05)
+
+
+def run_scenario(name: str, cfg: dict, duration: Optional[float] = None, drain_timeout: float = 5.0) -> Dict[str, object]:
+    from src.service.listener_service import ListenerService
+
+    duration = duration if duration is not None else float(cfg.get("duration", 10))
+    fake = FakeMSSQLWriter(
+        insert_latency_ms=float(cfg.get("insert_latency_ms", 0)),
+        row_latency_us=float(cfg.get("row_latency_us", 0)),
+    )
+
+    cwd = os.getcwd()
+    saved_env = dict(os.environ)
+    with tempfile.TemporaryDirectory(prefix="wt-e2e-") as tmp:
+        routes_path = Path(tmp) / "routes.json"
+        _routes(routes_path)
+        os.environ.update(BASE_ENV)
+        os.environ.update({k: str(v) for k, v in (cfg.get("env") or {}).items()})
+        os.environ["ROUTES_PATH"] = str(routes_path)
+
+        # logs/ y alertas del servicio quedan en el directorio temporal
+        os.chdir(tmp)
+        try:
+            port = _free_udp_port()
+            svc = ListenerService(host="127.0.0.1", port=port, mssql=fake)
+            thread = threading.Thread(target=svc.run_forever, name="e2e-service", daemon=True)
+            thread.start()
+            time.sleep(0.5)
+
+            load = run_load("127.0.0.1", port, float(cfg["rate"]), duration, float(cfg.get("controlm_ratio", 0.0)))
+            _wait_drained(fake, load.sent, drain_timeout)
+
+            stats = svc.stats()
+            svc.listener.stop()
+            thread.join(timeout=30)
+        finally:
+            os.chdir(cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+    stored = fake.stored["syslog_events"]
+    latencies = sorted((committed - sent) / 1e6 for _id, sent, committed in stored)
+    received = stats["listener"].get("received", 0)
+
+    return {
+        "scenario": name,
+        "rate": cfg["rate"],
+        "duration_sec": duration,
+        **load.as_dict(),
+        "received": received,
+        "stored": len(stored),
+        "stored_controlm": len(fake.stored["controlm_router_logs"]),
+        "db_calls": fake.calls,
+        "msgs_per_sec": _sustained_rate(stored, load.started_ns, load.finished_ns),
+        "drop_rate": round(1 - len(stored) / load.sent, 4) if load.sent else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) or 0.0, 2),
+        "p99_ms": round(_percentile(latencies, 99) or 0.0, 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "ingest_dropped": stats["ingest"].get("dropped", 0),
+        "router_dropped": {k: v.get("dropped", 0) for k, v in stats["routers"].items()},
+    }
+
+
+def check_regression(result: Dict[str, object], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Lista de regresiones (vacía = OK)."""
+    problems = []
+    if "msgs_per_sec" in baseline and result["msgs_per_sec"] < baseline["msgs_per_sec"] * (1 - tolerance):
+        problems.append(f"msgs_per_sec {result['msgs_per_sec']} < {baseline['msgs_per_sec']} -{tolerance:.0%}")
+    if "drop_rate" in baseline and result["drop_rate"] > baseline["drop_rate"] + max(0.001, baseline["drop_rate"] * tolerance):
+        problems.append(f"drop_rate {result['drop_rate']} > {baseline['drop_rate']}")
+    # Latencias: tolerancia relativa con un piso absoluto de 5 ms (ruido del scheduler)
+    for key in ("p50_ms", "p99_ms"):
+        if key in baseline and result[key] > max(baseline[key] * (1 + tolerance), baseline[key] + 5.0):
+            problems.append(f"{key} {result[key]} > {baseline[key]} +{tolerance:.0%}")
+    return problems
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scenario", action="append", help="escenario de baselines.json (repetible; default: todos)")
+    ap.add_argument("--duration", type=float, help="sobreescribe la duración de cada escenario (s)")
+    ap.add_argument("--tolerance", type=float, help="tolerancia relativa (default: la de baselines.json)")
+    ap.add_argument("--drain-timeout", type=float, default=5.0)
+    ap.add_argument("--update-baselines", action="store_true")
+    ap.add_argument("--json", action="store_true", help="imprime resultados como JSON")
+    args = ap.parse_args()
+
+    config = json.loads(BASELINES_FILE.read_text(encoding="utf-8"))
+    tolerance = args.tolerance if args.tolerance is not None else float(config.get("tolerance", 0.2))
+    scenarios = config["scenarios"]
+    names = args.scenario or list(scenarios)
+    unknown = [n for n in names if n not in scenarios]
+    if unknown:
+        ap.error(f"unknown scenario(s): {unknown} (known: {sorted(scenarios)})")
+
+    failed = False
+    results = []
+    for name in names:
+        cfg = scenarios[name]
+        result = run_scenario(name, cfg, duration=args.duration, drain_timeout=args.drain_timeout)
+        results.append(result)
+
+        if args.update_baselines:
+            cfg["baseline"] = {k: result[k] for k in ("msgs_per_sec", "drop_rate", "p50_ms", "p99_ms")}
+            status = "baseline updated"
+        else:
+            problems = check_regression(result, cfg.get("baseline") or {}, tolerance)
+            failed = failed or bool(problems)
+            status = "REGRESSION: " + "; ".join(problems) if problems else "ok"
+
+        if not args.json:
+            print(
+                f"{name:16s} rate={result['rate']:>6} sent={result['sent']:>7} stored={result['stored']:>7} "
+                f"msgs/s={result['msgs_per_sec']:>9} drop={result['drop_rate']:.2%} "
+                f"p50={result['p50_ms']:>8}ms p99={result['p99_ms']:>8}ms  [{status}]"
+            )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if args.update_baselines:
+        BASELINES_FILE.write_text(json.dumps(config, indent=2) + "\n", encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
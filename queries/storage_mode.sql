@@ -0,0 +1,71 @@
+/* ============================================================
+   WATCHTOWER - Storage mode compact / compressed
+   (MSSQL_STORAGE_MODE=compact|compressed en el .env)
+   - raw pasa a NULL-able: NULL cuando se reconstruye desde los campos parseados
+     "<pri>syslog_ts_raw hostname app_name[pid]: message"
+   - raw_z VARBINARY(MAX): raw comprimido (gzip de UTF-16LE = COMPRESS(N'...'))
+   - vistas *_full con la columna raw reconstruida (lectura transparente)
+   Correr una vez antes de cambiar el modo. Con MSSQL_STORAGE_MODE=full no hace falta.
+   ============================================================ */
+
+-----------------------
+-- 1) watchtower_logs
+-----------------------
+USE watchtower_logs;
+GO
+
+ALTER TABLE dbo.syslog_events ALTER COLUMN raw NVARCHAR(MAX) NULL;
+GO
+
+IF COL_LENGTH('dbo.syslog_events', 'raw_z') IS NULL
+    ALTER TABLE dbo.syslog_events ADD raw_z VARBINARY(MAX) NULL;
+GO
+
+CREATE OR ALTER VIEW dbo.syslog_events_full
+AS
+SELECT
+    event_id, received_at_utc, source_ip, source_port, router_name,
+    pri, facility, severity,
+    syslog_ts_utc, syslog_ts_raw,
+    hostname, app_name, pid,
+    message,
+    COALESCE(
+        raw,
+        CAST(DECOMPRESS(raw_z) AS NVARCHAR(MAX)),
+        CONCAT(
+            N'<', pri, N'>', syslog_ts_raw, N' ', hostname, N' ', app_name,
+            CASE WHEN pid IS NULL THEN N'' ELSE CONCAT(N'[', pid, N']') END,
+            N': ', message
+        )
+    ) AS raw
+FROM dbo.syslog_events;
+GO
+
+-----------------------
+-- 2) watchtower_controlm (sin pid: solo se reconstruye raw sin [pid])
+-----------------------
+USE watchtower_controlm;
+GO
+
+ALTER TABLE dbo.ControlM_Router_Logs ALTER COLUMN raw NVARCHAR(MAX) NULL;
+GO
+
+IF COL_LENGTH('dbo.ControlM_Router_Logs', 'raw_z') IS NULL
+    ALTER TABLE dbo.ControlM_Router_Logs ADD raw_z VARBINARY(MAX) NULL;
+GO
+
+CREATE OR ALTER VIEW dbo.ControlM_Router_Logs_full
+AS
+SELECT
+    log_id, received_at_utc, source_ip, source_port,
+    router_name, hostname, app_name,
+    pri, facility, severity,
+    syslog_ts_utc, syslog_ts_raw,
+    message,
+    COALESCE(
+        raw,
+        CAST(DECOMPRESS(raw_z) AS NVARCHAR(MAX)),
+        CONCAT(N'<', pri, N'>', syslog_ts_raw, N' ', hostname, N' ', app_name, N': ', message)
+    ) AS raw
+FROM dbo.ControlM_Router_Logs;
+GO
@@ -0,0 +1,139 @@
+import asyncio
+import inspect
+import logging
+import socket
+from typing import Any, Callable, Optional, Set
+
+from src.core.syslog_listener import SyslogPacket, bind_udp_socket, make_packet, read_proc_udp_drops
+
+
+class _SyslogDatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, listener: "AsyncSyslogListener"):
+        self.listener = listener
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        listener = self.listener
+        if len(data) > listener.buffer_size:
+            # Igual que recvfrom(buffer_size) del engine thread: el resto del datagram se pierde
+            listener.truncated += 1
+            data = data[: listener.buffer_size]
+        listener._dispatch(make_packet(data, addr[0], addr[1]))
+
+    def error_received(self, exc: Exception) -> None:
+        logging.warning("UDP error received: %s", exc)
+
+
+class AsyncSyslogListener:
+    """
+    UDP Syslog Listener sobre asyncio (alternativa a SyslogListener)
+    - mismo contrato on_message(SyslogPacket) y mismo start()/stop()
+    - si on_message es async, cada paquete corre como task en el loop:
+      sinks async solapan I/O sin un thread por operación en vuelo
+    - max_inflight acota las tasks pendientes (exceso => drop contado)
+    - datagrams de más de buffer_size se truncan y se cuentan (truncated), como en SyslogListener
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 1514,
+        buffer_size: int = 8192,
+        reuse_port: bool = False,
+        on_message: Optional[Callable[[SyslogPacket], Any]] = None,
+        max_inflight: int = 1000,
+        rcvbuf_bytes: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.buffer_size = buffer_size
+        self.reuse_port = reuse_port
+        self.on_message = on_message
+        self.max_inflight = max_inflight
+        self.rcvbuf_bytes = rcvbuf_bytes
+        self._sock = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._stop_requested = False
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.received = 0
+        self.truncated = 0
+        self.inflight_dropped = 0
+
+    def start(self) -> None:
+        if self._loop is not None:
+            raise RuntimeError("Listener already started")
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self._stop_requested:
+            return
+
+        sock = bind_udp_socket(self.host, self.port, self.reuse_port)
+        sock.setblocking(False)
+        if self.rcvbuf_bytes:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf_bytes)
+        self._sock = sock
+
+        transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: _SyslogDatagramProtocol(self),
+            sock=sock,
+        )
+        try:
+            await self._stopped.wait()
+        finally:
+            transport.close()
+            self._sock = None
+            if self._tasks:
+                await asyncio.wait(self._tasks, timeout=10)
+
+    def _dispatch(self, packet: SyslogPacket) -> None:
+        self.received += 1
+        if not self.on_message:
+            return
+
+        try:
+            result = self.on_message(packet)
+        except Exception:
+            logging.exception("on_message handler failed")
+            return
+
+        if not inspect.isawaitable(result):
+            return
+
+        if len(self._tasks) >= self.max_inflight:
+            self.inflight_dropped += 1
+            if inspect.iscoroutine(result):
+                result.close()
+            return
+
+        task = asyncio.ensure_future(result)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error("on_message handler failed", exc_info=task.exception())
+
+    def stop(self) -> None:
+        self._stop_requested = True
+        loop, stopped = self._loop, self._stopped
+        if loop is not None and stopped is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(stopped.set)
+            except RuntimeError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "engine": "asyncio",
+            "received": self.received,
+            "truncated": self.truncated,
+            "inflight": len(self._tasks),
+            "inflight_dropped": self.inflight_dropped,
+            "kernel_drops_proc": read_proc_udp_drops(self._sock) if self._sock is not None else None,
+        }
@@ -0,0 +1,164 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+
+_STOP = object()
+
+
+class IngestQueue:
+    """
+    Cola acotada entre el receive loop y el procesamiento
+    - submit() nunca bloquea: si la cola está llena descarta y cuenta el drop
+    - N worker threads drenan la cola y llaman al handler
+    - stats(): profundidad, drops y utilización de workers
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[object], None],
+        maxsize: int = 10000,
+        workers: int = 4,
+        name: str = "ingest",
+    ):
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+
+        self.handler = handler
+        self.maxsize = maxsize
+        self.workers = workers
+        self.name = name
+
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=maxsize)
+        self._threads: List[threading.Thread] = []
+
+        # Contadores: enqueued/dropped los escriben varios productores (listener UDP y TCP)
+        # bajo _counter_lock; processed/errors/busy cada worker en su propio slot (sin locks)
+        self._counter_lock = threading.Lock()
+        self._enqueued = 0
+        self._dropped = 0
+        self._processed = [0] * workers
+        self._errors = [0] * workers
+        self._busy = [0.0] * workers
+
+        self._started_at: Optional[float] = None
+        self._stats_lock = threading.Lock()
+        self._window_at = 0.0
+        self._window_busy = 0.0
+
+    def start(self) -> None:
+        if self._threads:
+            raise RuntimeError("IngestQueue already started")
+
+        self._started_at = time.monotonic()
+        self._window_at = self._started_at
+
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=self._worker,
+                args=(i,),
+                name=f"{self.name}-worker-{i}",
+                daemon=True,
+            )
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, item: object) -> bool:
+        """Encola sin bloquear. Regresa False si la cola está llena (drop)."""
+        return self._put(item, count_drop=True)
+
+    def try_submit(self, item: object) -> bool:
+        """
+        Como submit(), pero cola llena no cuenta como drop: el llamador reintenta
+        el mismo item (backpressure del listener TCP).
+        """
+        return self._put(item, count_drop=False)
+
+    def _put(self, item: object, count_drop: bool) -> bool:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if count_drop:
+                with self._counter_lock:
+                    self._dropped += 1
+            return False
+        with self._counter_lock:
+            self._enqueued += 1
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Drena lo pendiente y detiene los workers."""
+        if not self._threads:
+            return
+
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            try:
+                self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+        alive = [t.name for t in self._threads if t.is_alive()]
+        if alive:
+            logging.warning("[%s] Workers still running after stop: %s", self.name, alive)
+
+        self._threads = []
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _worker(self, idx: int) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            t0 = time.perf_counter()
+            try:
+                self.handler(item)
+            except Exception:
+                self._errors[idx] += 1
+                logging.exception("[%s] handler failed", self.name)
+            finally:
+                self._busy[idx] += time.perf_counter() - t0
+                self._processed[idx] += 1
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Snapshot de métricas.
+        worker_utilisation es la fracción de tiempo ocupado de los workers
+        desde la lectura anterior de stats().
+        """
+        now = time.monotonic()
+        busy = sum(self._busy)
+
+        with self._stats_lock:
+            elapsed = now - self._window_at
+            window_busy = busy - self._window_busy
+            self._window_at = now
+            self._window_busy = busy
+
+        utilisation = 0.0
+        if elapsed > 0:
+            utilisation = min(1.0, window_busy / (elapsed * self.workers))
+
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self.maxsize,
+            "workers": self.workers,
+            "enqueued": self._enqueued,
+            "dropped": self._dropped,
+            "processed": sum(self._processed),
+            "errors": sum(self._errors),
+            "worker_busy_seconds": round(busy, 3),
+            "worker_utilisation": round(utilisation, 4),
+        }
@@ -0,0 +1,353 @@
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Latencias (segundos): de 50us a 10s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _PerThread:
+    """
+    Celdas por thread: cada thread escribe solo en su lista (sin locks en el hot path);
+    el lock se toma una vez por thread al crear su celda y al leer (scrape).
+    Las celdas de threads terminados se conservan (los contadores no bajan).
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._cells: List[list] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> list:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = [0] * self._size
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def total(self) -> list:
+        out = [0] * self._size
+        with self._lock:
+            cells = list(self._cells)
+        for cell in cells:
+            for i, v in enumerate(cell):
+                out[i] += v
+        return out
+
+
+class CounterChild:
+    __slots__ = ("_cells",)
+
+    def __init__(self):
+        self._cells = _PerThread(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._cells.cell()[0] += amount
+
+    def value(self) -> float:
+        return self._cells.total()[0]
+
+
+class HistogramChild:
+    __slots__ = ("_bounds", "_cells")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # [bucket_0 .. bucket_n, +Inf, sum]
+        self._cells = _PerThread(len(bounds) + 2)
+
+    def observe(self, value: float) -> None:
+        cell = self._cells.cell()
+        cell[bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def snapshot(self) -> Tuple[List[int], int, float]:
+        """(buckets acumulados, count, sum)"""
+        total = self._cells.total()
+        cumulative = []
+        running = 0
+        for n in total[:-1]:
+            running += n
+            cumulative.append(running)
+        return cumulative, running, total[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Hijo por combinación de labels (se crea una vez; después es un dict lookup)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _items(self):
+        with self._lock:
+            return sorted(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_labels_text(self.labelnames, values)} {_fmt(child.value())}"
+            for values, child in self._items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        out = []
+        for values, child in self._items():
+            cumulative, count, total = child.snapshot()
+            for bound, n in zip(self.buckets + (float("inf"),), cumulative):
+                le = 'le="%s"' % _fmt(bound)
+                out.append(f"{self.name}_bucket{_labels_text(self.labelnames, values, le)} {n}")
+            labels = _labels_text(self.labelnames, values)
+            out.append(f"{self.name}_sum{labels} {_fmt(total)}")
+            out.append(f"{self.name}_count{labels} {count}")
+        return out
+
+
+class CallbackMetric(_Metric):
+    """Valor leído al momento del scrape (profundidad de colas, contadores que ya existen en stats())."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Dict[Tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+        self.kind = kind
+
+    def _samples(self) -> List[str]:
+        try:
+            values = self.fn()
+        except Exception:
+            logging.exception("Metrics callback failed (%s)", self.name)
+            return []
+        return [
+            f"{self.name}{_labels_text(self.labelnames, key)} {_fmt(value)}"
+            for key, value in sorted(values.items())
+            if value is not None
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric, replace: bool = False) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not replace:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(
+        self,
+        name: str,
+        help_text: str,
+        fn: Callable[[], Dict[Tuple[str, ...], float]],
+        labelnames: Sequence[str] = (),
+        kind: str = "gauge",
+    ) -> CallbackMetric:
+        """Registra (o reemplaza) una métrica calculada en el scrape."""
+        return self._register(CallbackMetric(name, help_text, fn, labelnames, kind), replace=True)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[k] for k in sorted(self._metrics)]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Sin una línea de log por scrape
+        pass
+
+
+class MetricsServer:
+    """
+    Endpoint HTTP local con las métricas en formato de texto Prometheus (GET /metrics)
+    - thread propio (ThreadingHTTPServer); el render solo suma celdas por thread
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9514, registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        logging.info("Metrics endpoint on http://%s:%s/metrics", self.host, self.port)
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# -------------------------------------------------
+# Métricas de Watchtower (una definición, se importan donde se miden)
+# -------------------------------------------------
+
+MESSAGES = REGISTRY.counter(
+    "watchtower_messages_total", "Mensajes procesados por router (rate() => msgs/s)", ("router",)
+)
+PARSE_SECONDS = REGISTRY.histogram("watchtower_parse_seconds", "Latencia de parseo syslog")
+PARSE_FAILURES = REGISTRY.counter(
+    "watchtower_parse_failures_total", "Mensajes sin header syslog reconocible (se guardan como texto)"
+)
+ROUTE_SECONDS = REGISTRY.histogram("watchtower_route_seconds", "Latencia de resolve_router")
+SHED = REGISTRY.counter(
+    "watchtower_shed_total", "Eventos de baja prioridad descartados en modo sobrecarga", ("router",)
+)
+RATE_LIMITED = REGISTRY.counter(
+    "watchtower_rate_limited_total",
+    "Mensajes descartados por token bucket (router=source: bucket de la IP sin router conocido)",
+    ("router",),
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "watchtower_stage_seconds", "Latencia por stage de pipeline", ("router", "stage")
+)
+PIPELINE_SECONDS = REGISTRY.histogram(
+    "watchtower_pipeline_seconds", "Latencia encolado en router -> fin del pipeline", ("router",)
+)
+DB_INSERT_SECONDS = REGISTRY.histogram(
+    "watchtower_db_insert_seconds", "Latencia de insert (executemany, una transacción)", ("table",)
+)
+DB_INSERT_ROWS = REGISTRY.counter("watchtower_db_insert_rows_total", "Filas insertadas", ("table",))
+DB_INSERT_ERRORS = REGISTRY.counter(
+    "watchtower_db_insert_errors_total", "Inserts fallidos (kind=connection|data)", ("table", "kind")
+)
+JOB_LOOKUP_SECONDS = REGISTRY.histogram("watchtower_controlm_job_lookup_seconds", "Latencia de lookup de job Control-M")
+ALERTS = REGISTRY.counter(
+    "watchtower_controlm_alerts_total",
+    "Mensajes Control-M evaluados: result=generated|skipped, reason del skip",
+    ("result", "reason"),
+)
+ALERT_WRITE_SECONDS = REGISTRY.histogram("watchtower_controlm_alert_write_seconds", "Latencia de write_alert")
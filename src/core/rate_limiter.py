@@ -0,0 +1,198 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+# (rate msgs/s, burst)
+BucketSpec = Tuple[float, float]
+
+# Tope de IPs distintas en el resumen de drops de una ventana (el resto va a "other")
+_MAX_REPORTED_SOURCES = 1000
+
+
+def _take(bucket: List[float], spec: BucketSpec, now: float) -> bool:
+    """Token bucket [tokens, last]: recarga por tiempo transcurrido y consume 1."""
+    rate, burst = spec
+    tokens = bucket[0] + (now - bucket[1]) * rate
+    if tokens > burst:
+        tokens = burst
+    bucket[1] = now
+    if tokens >= 1.0:
+        bucket[0] = tokens - 1.0
+        return True
+    bucket[0] = tokens
+    return False
+
+
+class RateLimiter:
+    """
+    Token buckets de ingest (justo después del receive, antes del parseo)
+    - por source_ip: tabla LRU acotada (max_sources); una IP expulsada vuelve con el bucket lleno,
+      así un scan de IPs spoofeadas no crece la memoria (el bucket del router sigue acotando el total)
+    - por router: un bucket compartido por todo el tráfico del router
+    - excedente: se descarta y se cuenta (por IP y por router); resumen en el log cada report_sec
+    Config desde routes.json ("rate_limit", ver parse_routes): configure() en cada hot reload.
+    Sin límites configurados enabled=False y el servicio no lo llama.
+    """
+
+    def __init__(self, report_sec: float = 60.0, clock=time.monotonic):
+        self.report_sec = report_sec
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self.per_source: Optional[BucketSpec] = None
+        self.router_limits: Dict[str, BucketSpec] = {}
+        self.source_overrides: Dict[str, BucketSpec] = {}
+        self.max_sources = 10000
+
+        self._sources: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._routers: Dict[str, List[float]] = {}
+
+        self.allowed = 0
+        self.dropped_source = 0
+        self.dropped_router: Dict[str, int] = {}
+        self.evictions = 0
+
+        # Ventana del resumen periódico
+        self._window_started = self._clock()
+        self._window_sources: Dict[str, int] = {}
+        self._window_routers: Dict[str, int] = {}
+        self._window_other = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.per_source or self.router_limits or self.source_overrides)
+
+    @property
+    def by_router(self) -> bool:
+        """True si hace falta el router (por IP) antes del parseo."""
+        return bool(self.router_limits or self.source_overrides)
+
+    def configure(self, rate_limit: dict, router_configs: Dict[str, dict]) -> None:
+        """rate_limit global + "rate_limit" de cada router (ya validados por parse_routes)."""
+        router_limits = {}
+        source_overrides = {}
+        for name, cfg in router_configs.items():
+            if cfg.get("rate_limit"):
+                router_limits[name] = cfg["rate_limit"]
+            if cfg.get("per_source_limit"):
+                source_overrides[name] = cfg["per_source_limit"]
+
+        with self._lock:
+            self.per_source = rate_limit.get("per_source")
+            self.max_sources = int(rate_limit.get("max_sources") or 10000)
+            self.router_limits = router_limits
+            self.source_overrides = source_overrides
+            # Buckets de routers que ya no tienen límite se descartan; los demás conservan sus tokens
+            self._routers = {k: v for k, v in self._routers.items() if k in router_limits}
+            while len(self._sources) > self.max_sources:
+                self._sources.popitem(last=False)
+                self.evictions += 1
+
+    # -------------------------
+    # Hot path
+    # -------------------------
+    def allow(self, source_ip: str, router: Optional[str] = None) -> bool:
+        """
+        Bucket de la IP y, si router no es None, el del router.
+        router: el que resuelve la IP sola (ip_addresses / CIDR); None si depende del hostname.
+        """
+        now = self._clock()
+        report = None
+        with self._lock:
+            spec = self.source_overrides.get(router) if router is not None else None
+            if spec is None:
+                spec = self.per_source
+            ok = True
+            if spec is not None:
+                bucket = self._sources.get(source_ip)
+                if bucket is None:
+                    bucket = self._sources[source_ip] = [spec[1], now]
+                    if len(self._sources) > self.max_sources:
+                        self._sources.popitem(last=False)
+                        self.evictions += 1
+                else:
+                    self._sources.move_to_end(source_ip)
+                if not _take(bucket, spec, now):
+                    ok = False
+                    self.dropped_source += 1
+                    self._count_window(source_ip, None)
+
+            if ok and router is not None:
+                ok = self._take_router(router, source_ip, now)
+
+            if ok:
+                self.allowed += 1
+            if now - self._window_started >= self.report_sec:
+                report = self._take_report(now)
+
+        if report:
+            logging.warning("%s", report)
+        return ok
+
+    def allow_router(self, router: str, source_ip: str) -> bool:
+        """Bucket del router resuelto después del parseo (hostname / default)."""
+        if router not in self.router_limits:
+            return True
+        with self._lock:
+            return self._take_router(router, source_ip, self._clock())
+
+    def _take_router(self, router: str, source_ip: str, now: float) -> bool:
+        spec = self.router_limits.get(router)
+        if spec is None:
+            return True
+        bucket = self._routers.get(router)
+        if bucket is None:
+            bucket = self._routers[router] = [spec[1], now]
+        if _take(bucket, spec, now):
+            return True
+        self.dropped_router[router] = self.dropped_router.get(router, 0) + 1
+        self._count_window(source_ip, router)
+        return False
+
+    def _count_window(self, source_ip: str, router: Optional[str]) -> None:
+        if source_ip in self._window_sources or len(self._window_sources) < _MAX_REPORTED_SOURCES:
+            self._window_sources[source_ip] = self._window_sources.get(source_ip, 0) + 1
+        else:
+            self._window_other += 1
+        if router is not None:
+            self._window_routers[router] = self._window_routers.get(router, 0) + 1
+
+    # -------------------------
+    # Resumen / stats
+    # -------------------------
+    def _take_report(self, now: float) -> Optional[str]:
+        elapsed = now - self._window_started
+        sources, self._window_sources = self._window_sources, {}
+        routers, self._window_routers = self._window_routers, {}
+        other, self._window_other = self._window_other, 0
+        self._window_started = now
+        total = sum(sources.values()) + other
+        if not total:
+            return None
+        top = sorted(sources.items(), key=lambda kv: kv[1], reverse=True)[:10]
+        return (
+            f"[RATE_LIMIT] dropped={total} in {elapsed:.0f}s sources={len(sources) + (1 if other else 0)} "
+            f"top_sources={dict(top)} by_router={routers}" + (f" other={other}" if other else "")
+        )
+
+    def report(self) -> None:
+        """Fuerza el resumen de la ventana actual (p.ej. al apagar)."""
+        with self._lock:
+            report = self._take_report(self._clock())
+        if report:
+            logging.warning("%s", report)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "allowed": self.allowed,
+                "dropped_source": self.dropped_source,
+                "dropped_router": dict(self.dropped_router),
+                "sources_tracked": len(self._sources),
+                "max_sources": self.max_sources,
+                "evictions": self.evictions,
+            }
@@ -1,26 +1,112 @@
+import os
 import socket
+import sys
 import threading
+import time
 import logging
-from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Callable, Optional
 
 
-@dataclass(frozen=True)
+# Linux: contador de datagrams descartados por el kernel (socket buffer lleno)
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40 if sys.platform.startswith("linux") else None)
+
+
 class SyslogPacket:
-    received_at_utc: datetime
-    source_ip: str
-    source_port: int
-    raw: bytes
-    message: str
+    """
+    Datagram recibido.
+    message (decode UTF-8) y received_at_utc (datetime) se calculan la primera
+    vez que se leen: el receive loop solo guarda bytes + time.time().
+    """
+
+    __slots__ = ("source_ip", "source_port", "raw", "received_ts", "_message", "_received_at_utc")
+
+    def __init__(
+        self,
+        received_at_utc: Optional[datetime] = None,
+        source_ip: str = "",
+        source_port: int = 0,
+        raw: bytes = b"",
+        message: Optional[str] = None,
+        received_ts: Optional[float] = None,
+    ):
+        self.source_ip = source_ip
+        self.source_port = source_port
+        self.raw = raw
+        self._message = message
+        self._received_at_utc = received_at_utc
+        if received_ts is None:
+            received_ts = received_at_utc.timestamp() if received_at_utc is not None else time.time()
+        self.received_ts = received_ts
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self.raw.decode("utf-8", errors="replace")
+        return self._message
+
+    @property
+    def received_at_utc(self) -> datetime:
+        if self._received_at_utc is None:
+            self._received_at_utc = datetime.fromtimestamp(self.received_ts, timezone.utc)
+        return self._received_at_utc
+
+    def __repr__(self) -> str:
+        return f"SyslogPacket(source_ip={self.source_ip!r}, source_port={self.source_port}, raw={self.raw!r})"
+
+
+def bind_udp_socket(host: str, port: int, reuse_port: bool = False) -> socket.socket:
+    """
+    Socket UDP bindeado. reuse_port=True (Linux) permite que varios procesos
+    bindeen el mismo puerto y el kernel reparta los datagrams entre ellos.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT not supported on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    return sock
+
+
+def make_packet(data: bytes, ip: str, src_port: int) -> SyslogPacket:
+    return SyslogPacket(source_ip=ip, source_port=src_port, raw=data, received_ts=time.time())
+
+
+def read_proc_udp_drops(sock: socket.socket) -> Optional[int]:
+    """Columna drops de /proc/net/udp{,6} para este socket (Linux), None si no aplica."""
+    try:
+        inode = str(os.fstat(sock.fileno()).st_ino)
+    except (OSError, ValueError):
+        return None
+
+    for path in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(path, "r", encoding="ascii") as f:
+                next(f, None)
+                for line in f:
+                    cols = line.split()
+                    if len(cols) >= 13 and cols[9] == inode:
+                        return int(cols[12])
+        except OSError:
+            continue
+    return None
 
 
 class SyslogListener:
     """
     Core UDP Syslog Listener
     - Recibe datagrams UDP
-    - Decodifica a texto (no revienta)
+    - Decodifica a texto (no revienta), de forma lazy en SyslogPacket
     - Entrega paquetes a callback (service layer)
+
+    recv_mode:
+      "recvfrom" -> un bytes nuevo de buffer_size por datagram (modo original)
+      "into"     -> recvfrom_into/recvmsg_into sobre un buffer preasignado y
+                    memoryview; solo se copian los n bytes recibidos.
+                    En Linux además lee SO_RXQ_OVFL (drops del kernel).
+    rcvbuf_bytes: SO_RCVBUF solicitado (el kernel puede limitarlo, ver stats()).
     """
 
     def __init__(
@@ -28,25 +114,59 @@ class SyslogListener:
         host: str = "0.0.0.0",
         port: int = 1514,
         buffer_size: int = 8192,
+        reuse_port: bool = False,
         on_message: Optional[Callable[[SyslogPacket], None]] = None,
+        recv_mode: str = "recvfrom",
+        rcvbuf_bytes: Optional[int] = None,
     ):
+        if recv_mode not in ("recvfrom", "into"):
+            raise ValueError(f"Invalid recv_mode={recv_mode!r}")
+
         self.host = host
         self.port = port
         self.buffer_size = buffer_size
+        self.reuse_port = reuse_port
         self.on_message = on_message
+        self.recv_mode = recv_mode
+        self.rcvbuf_bytes = rcvbuf_bytes
 
         self._sock: Optional[socket.socket] = None
         self._stop_event = threading.Event()
 
+        self.received = 0
+        self.truncated = 0
+        self.kernel_drops: Optional[int] = None
+
     def start(self) -> None:
         if self._sock is not None:
             raise RuntimeError("Listener already started")
 
-        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._sock.bind((self.host, self.port))
+        self._sock = bind_udp_socket(self.host, self.port, self.reuse_port)
         self._sock.settimeout(1.0)
 
+        if self.rcvbuf_bytes:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf_bytes)
+            logging.info(
+                "UDP SO_RCVBUF requested=%s effective=%s",
+                self.rcvbuf_bytes,
+                self._sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF),
+            )
+
+        if self.recv_mode == "into":
+            self._receive_into()
+        else:
+            self._receive_from()
+
+        self._cleanup()
+
+    def _deliver(self, packet: SyslogPacket) -> None:
+        if self.on_message:
+            try:
+                self.on_message(packet)
+            except Exception:
+                logging.exception("on_message handler failed")
+
+    def _receive_from(self) -> None:
         while not self._stop_event.is_set():
             try:
                 data, (ip, src_port) = self._sock.recvfrom(self.buffer_size)
@@ -55,29 +175,69 @@ class SyslogListener:
             except OSError:
                 break
 
-            received_at = datetime.now(timezone.utc)
-            msg = data.decode("utf-8", errors="replace")
+            self.received += 1
+            self._deliver(make_packet(data, ip, src_port))
 
-            packet = SyslogPacket(
-                received_at_utc=received_at,
-                source_ip=ip,
-                source_port=src_port,
-                raw=data,
-                message=msg,
-            )
+    def _receive_into(self) -> None:
+        buf = bytearray(self.buffer_size)
+        view = memoryview(buf)
+        sock = self._sock
 
-            if self.on_message:
-                try:
-                    self.on_message(packet)
-                except Exception:
-                    logging.exception("on_message handler failed")
+        use_recvmsg = hasattr(sock, "recvmsg_into") and SO_RXQ_OVFL is not None
+        if use_recvmsg:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+                self.kernel_drops = 0
+            except OSError:
+                use_recvmsg = False
 
-        self._cleanup()
+        ancbufsize = socket.CMSG_SPACE(4) if use_recvmsg else 0
+        trunc_flag = getattr(socket, "MSG_TRUNC", 0)
+
+        while not self._stop_event.is_set():
+            try:
+                if use_recvmsg:
+                    n, ancdata, flags, addr = sock.recvmsg_into([view], ancbufsize)
+                    for level, ctype, cdata in ancdata:
+                        if level == socket.SOL_SOCKET and ctype == SO_RXQ_OVFL and len(cdata) >= 4:
+                            # Contador acumulado desde que se creó el socket
+                            self.kernel_drops = int.from_bytes(cdata[:4], sys.byteorder)
+                    if flags & trunc_flag:
+                        self.truncated += 1
+                else:
+                    n, addr = sock.recvfrom_into(view)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            self.received += 1
+            # Única copia: exactamente los n bytes recibidos (el packet sale del loop)
+            self._deliver(make_packet(bytes(view[:n]), addr[0], addr[1]))
 
     def stop(self) -> None:
         self._stop_event.set()
         self._cleanup()
 
+    def stats(self) -> dict:
+        out = {
+            "engine": "thread",
+            "recv_mode": self.recv_mode,
+            "received": self.received,
+            "truncated": self.truncated,
+            "kernel_drops_rxq_ovfl": self.kernel_drops,
+            "kernel_drops_proc": None,
+            "rcvbuf_bytes": None,
+        }
+        sock = self._sock
+        if sock is not None:
+            try:
+                out["rcvbuf_bytes"] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            except OSError:
+                pass
+            out["kernel_drops_proc"] = read_proc_udp_drops(sock)
+        return out
+
     def _cleanup(self) -> None:
         if self._sock:
             try:
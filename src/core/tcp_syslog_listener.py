@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.syslog_listener import SyslogPacket, make_packet
+
+
+class FramingError(Exception):
+    pass
+
+
+class SyslogFramer:
+    """
+    Framer incremental RFC 6587 (uno por conexión)
+    - octet-counting:  "<LEN> <MSG>"   (el frame empieza con dígito)
+    - non-transparent: "<MSG>\\n"       (delimitado por LF, se quita CR final)
+    El método se detecta por frame, como hace rsyslog.
+    Un frame LF demasiado grande se trunca a max_frame; un octet count
+    mayor a max_frame lanza FramingError (no hay forma de resincronizar).
+    """
+
+    def __init__(self, max_frame: int = 65536):
+        self.max_frame = max_frame
+        self._buf = bytearray()
+        self._discarding = False
+        self.oversize = 0
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buf)
+
+    def feed(self, data: bytes) -> List[bytes]:
+        self._buf += data
+        frames: List[bytes] = []
+        buf = self._buf
+
+        while buf:
+            if self._discarding:
+                # Resto de un frame LF demasiado grande: descartar hasta el LF
+                nl = buf.find(b"\n")
+                if nl < 0:
+                    buf.clear()
+                    break
+                del buf[: nl + 1]
+                self._discarding = False
+                continue
+
+            if 48 <= buf[0] <= 57:
+                sp = buf.find(b" ", 0, 12)
+                if sp < 0 and len(buf) < 12:
+                    break  # header incompleto
+                if sp > 0 and buf[:sp].isdigit():
+                    length = int(buf[:sp])
+                    if length > self.max_frame:
+                        raise FramingError(f"Frame too large ({length} > {self.max_frame})")
+                    end = sp + 1 + length
+                    if len(buf) < end:
+                        break
+                    frames.append(bytes(buf[sp + 1 : end]))
+                    del buf[:end]
+                    continue
+                # Empieza con dígito pero no es "<LEN> ": frame LF sin PRI (p.ej. una fecha)
+
+            nl = buf.find(b"\n")
+            if nl < 0:
+                if len(buf) > self.max_frame:
+                    frames.append(bytes(buf[: self.max_frame]))
+                    self.oversize += 1
+                    self._discarding = True
+                    buf.clear()
+                break
+
+            frame = bytes(buf[:nl])
+            del buf[: nl + 1]
+            if frame.endswith(b"\r"):
+                frame = frame[:-1]
+            if len(frame) > self.max_frame:
+                frame = frame[: self.max_frame]
+                self.oversize += 1
+            if frame:
+                frames.append(frame)
+
+        return frames
+
+
+class _ConnStats:
+    __slots__ = ("peer", "connected_at", "bytes", "frames", "backpressure_waits", "framer")
+
+    def __init__(self, peer: str, framer: SyslogFramer):
+        self.peer = peer
+        self.connected_at = time.monotonic()
+        self.bytes = 0
+        self.frames = 0
+        self.backpressure_waits = 0
+        self.framer = framer
+
+    def snapshot(self) -> Dict[str, object]:
+        elapsed = max(1e-6, time.monotonic() - self.connected_at)
+        return {
+            "peer": self.peer,
+            "bytes": self.bytes,
+            "frames": self.frames,
+            "frames_per_sec": round(self.frames / elapsed, 2),
+            "backlog_bytes": self.framer.buffered,
+            "oversize": self.framer.oversize,
+            "backpressure_waits": self.backpressure_waits,
+        }
+
+
+class TcpSyslogListener:
+    """
+    TCP Syslog Listener (RFC 6587) sobre asyncio
+    - muchas conexiones concurrentes en un solo thread (start_server)
+    - framing octet-counting y non-transparent (LF)
+    - entrega SyslogPacket al mismo on_message que el listener UDP
+    - backpressure: si on_message regresa False (cola llena) deja de leer
+      el socket y reintenta, así TCP frena al emisor en vez de perder mensajes
+    - admit (opcional): filtro que corre una sola vez por frame, antes de los reintentos
+      (p.ej. rate limit: un frame en backpressure no vuelve a gastar tokens); False => descartado
+    """
+
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: int = 1514,
+        on_message: Optional[Callable[[SyslogPacket], Any]] = None,
+        admit: Optional[Callable[[SyslogPacket], bool]] = None,
+        max_frame: int = 65536,
+        max_connections: int = 1000,
+        read_size: int = 65536,
+        reuse_port: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.reuse_port = reuse_port
+        self.on_message = on_message
+        self.admit = admit
+        self.max_frame = max_frame
+        self.max_connections = max_connections
+        self.read_size = read_size
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._stop_requested = False
+        self._conns: Dict[int, _ConnStats] = {}
+
+        self.accepted = 0
+        self.rejected = 0
+        self.framing_errors = 0
+        self.total_bytes = 0
+        self.total_frames = 0
+        self.backpressure_waits = 0
+        self.not_admitted = 0
+        # Frames que seguían esperando cola al apagar (los reintentos no son drops)
+        self.dropped_at_stop = 0
+
+    def start(self) -> None:
+        if self._loop is not None:
+            raise RuntimeError("Listener already started")
+        asyncio.run(self._serve())
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        if self._stop_requested:
+            return
+
+        server = await asyncio.start_server(
+            self._handle,
+            self.host,
+            self.port,
+            reuse_address=True,
+            reuse_port=self.reuse_port or None,
+        )
+        logging.info("TCP syslog listener on %s:%s", self.host, self.port)
+        try:
+            await self._stopped.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peername = writer.get_extra_info("peername") or ("?", 0)
+        ip, port = peername[0], peername[1]
+
+        if len(self._conns) >= self.max_connections:
+            self.rejected += 1
+            writer.close()
+            return
+
+        self.accepted += 1
+        framer = SyslogFramer(self.max_frame)
+        conn = _ConnStats(f"{ip}:{port}", framer)
+        key = id(conn)
+        self._conns[key] = conn
+
+        try:
+            while not self._stopped.is_set():
+                data = await reader.read(self.read_size)
+                if not data:
+                    break
+                conn.bytes += len(data)
+                self.total_bytes += len(data)
+
+                try:
+                    frames = framer.feed(data)
+                except FramingError as exc:
+                    self.framing_errors += 1
+                    logging.warning("[TCP] Closing %s: %s", conn.peer, exc)
+                    break
+
+                for frame in frames:
+                    await self._deliver(conn, make_packet(frame, ip, port))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            logging.exception("[TCP] Connection handler failed (%s)", conn.peer)
+        finally:
+            self._conns.pop(key, None)
+            writer.close()
+
+    async def _deliver(self, conn: _ConnStats, packet: SyslogPacket) -> None:
+        conn.frames += 1
+        self.total_frames += 1
+        if not self.on_message:
+            return
+        if self.admit is not None:
+            try:
+                admitted = self.admit(packet)
+            except Exception:
+                logging.exception("admit handler failed")
+                return
+            if not admitted:
+                self.not_admitted += 1
+                return
+
+        delay = 0.001
+        while True:
+            try:
+                accepted = self.on_message(packet)
+            except Exception:
+                logging.exception("on_message handler failed")
+                return
+            if accepted is not False:
+                return
+            if self._stopped.is_set():
+                self.dropped_at_stop += 1
+                return
+            # Cola llena: no leer más de este socket hasta que haya espacio
+            conn.backpressure_waits += 1
+            self.backpressure_waits += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def stop(self) -> None:
+        self._stop_requested = True
+        loop, stopped = self._loop, self._stopped
+        if loop is not None and stopped is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(stopped.set)
+            except RuntimeError:
+                pass
+
+    def stats(self, top: int = 20) -> Dict[str, object]:
+        conns = sorted(self._conns.values(), key=lambda c: c.bytes, reverse=True)
+        return {
+            "connections": len(conns),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "framing_errors": self.framing_errors,
+            "bytes": self.total_bytes,
+            "frames": self.total_frames,
+            "backlog_bytes": sum(c.framer.buffered for c in conns),
+            "backpressure_waits": self.backpressure_waits,
+            "dropped_at_stop": self.dropped_at_stop,
+            "not_admitted": self.not_admitted,
+            "top_connections": [c.snapshot() for c in conns[:top]],
+        }
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Optional, Tuple, Union
 
 
 @dataclass(frozen=True)
@@ -20,3 +20,108 @@ class SyslogEvent:
 
     message: str
     raw: str
+
+    # RFC 5424 / JSON / CEF (None en RFC 3164)
+    msg_id: Optional[str] = None
+    structured_data: Optional[str] = None
+
+
+class CompactSyslogEvent:
+    """
+    SyslogEvent compacto (mismos atributos, solo lectura por convención)
+    - un solo buffer: los bytes del datagram tal cual llegaron
+    - hostname/app_name/message/raw son offsets dentro del buffer y se
+      decodifican al leerlos (nada de str intermedios mientras está en vuelo)
+    - pri/pid/timestamp/timestamp_raw ya parseados (ints y objetos compartidos)
+    Solo se construye para datagrams ASCII (ver syslog_parser.parse_event):
+    ahí decode(slice) == slice(decode), así que el resultado es idéntico.
+    """
+
+    __slots__ = ("received_ts", "source_ip", "source_port", "pri", "timestamp", "timestamp_raw", "pid", "_buf", "_spans")
+
+    # Campos RFC 5424 / JSON / CEF: no aplican a este formato
+    msg_id = None
+    structured_data = None
+
+    def __init__(
+        self,
+        received_ts: float,
+        source_ip: str,
+        source_port: int,
+        buf: bytes,
+        spans: Tuple[int, int, int, int, int, int],
+        pri: Optional[int] = None,
+        timestamp: Optional[datetime] = None,
+        timestamp_raw: Optional[str] = None,
+        pid: Optional[int] = None,
+    ):
+        self.received_ts = received_ts
+        self.source_ip = source_ip
+        self.source_port = source_port
+        self.pri = pri
+        self.timestamp = timestamp
+        self.timestamp_raw = timestamp_raw
+        self.pid = pid
+        self._buf = buf
+        # (host_start, host_end, app_start, app_end, msg_start, msg_end); -1 = None
+        self._spans = spans
+
+    def _text(self, start: int, end: int) -> Optional[str]:
+        if start < 0:
+            return None
+        return self._buf[start:end].decode("ascii")
+
+    @property
+    def received_at_utc(self) -> datetime:
+        return datetime.fromtimestamp(self.received_ts, timezone.utc)
+
+    @property
+    def facility(self) -> Optional[int]:
+        return None if self.pri is None else self.pri // 8
+
+    @property
+    def severity(self) -> Optional[int]:
+        return None if self.pri is None else self.pri % 8
+
+    @property
+    def hostname(self) -> Optional[str]:
+        s = self._spans
+        return self._text(s[0], s[1])
+
+    @property
+    def app_name(self) -> Optional[str]:
+        s = self._spans
+        return self._text(s[2], s[3])
+
+    @property
+    def message(self) -> str:
+        s = self._spans
+        return self._text(s[4], s[5])
+
+    @property
+    def raw(self) -> str:
+        return self._buf.decode("ascii")
+
+    def to_event(self) -> SyslogEvent:
+        return SyslogEvent(
+            received_at_utc=self.received_at_utc,
+            source_ip=self.source_ip,
+            source_port=self.source_port,
+            pri=self.pri,
+            facility=self.facility,
+            severity=self.severity,
+            timestamp=self.timestamp,
+            timestamp_raw=self.timestamp_raw,
+            hostname=self.hostname,
+            app_name=self.app_name,
+            pid=self.pid,
+            message=self.message,
+            raw=self.raw,
+        )
+
+    def __repr__(self) -> str:
+        return f"CompactSyslogEvent(source_ip={self.source_ip!r}, source_port={self.source_port}, raw={self.raw!r})"
+
+
+# Lo que entrega syslog_parser.parse_event (mismos atributos en ambos)
+AnySyslogEvent = Union[SyslogEvent, CompactSyslogEvent]
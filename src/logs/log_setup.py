@@ -0,0 +1,213 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+LOG_FILE = "logs/syslog_listener.log"
+
+# Categoría de un registro: logging.info(..., extra={"category": CATEGORY_CONTROLM})
+CATEGORY_INCOMING = "incoming"
+CATEGORY_CONTROLM = "controlm"
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip() in ("1", "true", "True", "YES", "yes")
+
+
+def console_enabled() -> bool:
+    """
+    Salida a consola (print + StreamHandler).
+    Bajo el servicio de Windows (WATCHTOWER_SERVICE=1) stdout/stderr van a
+    archivos que duplican el log, así que se apaga; CONSOLE_OUTPUT=0 también.
+    """
+    if _env_flag("WATCHTOWER_SERVICE", "0"):
+        return False
+    return _env_flag("CONSOLE_OUTPUT", "1")
+
+
+def _parse_category_spec(spec: str) -> Dict[str, int]:
+    """ "incoming=100,controlm=10" -> {"incoming": 100, "controlm": 10} """
+    out: Dict[str, int] = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name and value.strip():
+            out[name] = int(value)
+    return out
+
+
+class CategorySampler:
+    """
+    Muestreo / rate limit por categoría de log
+    - sample_every: 1 de cada N registros de la categoría
+    - max_per_sec: tope de registros por segundo de la categoría
+    Categorías sin configuración (p.ej. las alertas) siempre pasan.
+    Cuenta lo suprimido para verlo en [STATS].
+    """
+
+    def __init__(self, sample_every: Optional[Dict[str, int]] = None, max_per_sec: Optional[Dict[str, int]] = None):
+        self.sample_every = {k: v for k, v in (sample_every or {}).items() if v > 1}
+        self.max_per_sec = {k: v for k, v in (max_per_sec or {}).items() if v > 0}
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+        self._window: Dict[str, list] = {}
+        self.suppressed: Dict[str, int] = {}
+
+    def allow(self, category: Optional[str]) -> bool:
+        if category is None:
+            return True
+        every = self.sample_every.get(category)
+        limit = self.max_per_sec.get(category)
+        if every is None and limit is None:
+            return True
+
+        with self._lock:
+            if every is not None:
+                n = self._seen.get(category, 0)
+                self._seen[category] = n + 1
+                if n % every:
+                    self.suppressed[category] = self.suppressed.get(category, 0) + 1
+                    return False
+
+            if limit is not None:
+                second = int(time.monotonic())
+                window = self._window.get(category)
+                if window is None or window[0] != second:
+                    window = self._window[category] = [second, 0]
+                if window[1] >= limit:
+                    self.suppressed[category] = self.suppressed.get(category, 0) + 1
+                    return False
+                window[1] += 1
+
+        return True
+
+
+class _CategoryFilter(logging.Filter):
+    """Aplica el sampler a los registros con extra={"category": ...} (WARNING+ siempre pasan)."""
+
+    def __init__(self, sampler: CategorySampler):
+        super().__init__()
+        self.sampler = sampler
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        return self.sampler.allow(getattr(record, "category", None))
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler con cola acotada: si el writer no alcanza se descarta y se cuenta."""
+
+    dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _DroppingQueueHandler.dropped += 1
+
+
+sampler = CategorySampler()
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(process_tag: bool = False) -> None:
+    """
+    Logging root: archivo logs/syslog_listener.log + consola.
+    process_tag=True agrega el nombre del proceso (shards del listener).
+
+    Variables (.env):
+      LOG_MODE=queue|sync    queue: los threads solo encolan, un QueueListener escribe
+      LOG_MAX_BYTES / LOG_BACKUP_COUNT   rotación por tamaño (0 = sin rotación;
+                                         con shards no se rota, comparten archivo)
+      LOG_QUEUE_SIZE         registros en cola (llena => se descartan y cuentan)
+      LOG_SAMPLE             "incoming=100,controlm=10"  (1 de cada N)
+      LOG_RATE_LIMIT         "incoming=200"              (máximo por segundo)
+    """
+    global sampler, _queue_listener
+
+    Path("logs").mkdir(exist_ok=True)
+    shutdown_logging()
+
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+
+    fmt = "%(asctime)s - %(levelname)s - %(message)s"
+    if process_tag:
+        fmt = "%(asctime)s - %(levelname)s - [%(processName)s] %(message)s"
+    formatter = logging.Formatter(fmt)
+
+    max_bytes = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+    if max_bytes > 0 and not process_tag:
+        file_handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=max_bytes,
+            backupCount=int(os.getenv("LOG_BACKUP_COUNT", "5")),
+            encoding="utf-8",
+        )
+    else:
+        file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+
+    handlers = [file_handler]
+    if console_enabled():
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    sampler = CategorySampler(
+        sample_every=_parse_category_spec(os.getenv("LOG_SAMPLE", "")),
+        max_per_sec=_parse_category_spec(os.getenv("LOG_RATE_LIMIT", "")),
+    )
+
+    logger.handlers = []
+    logger.filters = []
+    logger.addFilter(_CategoryFilter(sampler))
+
+    if os.getenv("LOG_MODE", "queue").strip().lower() == "queue":
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        logger.addHandler(_DroppingQueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _queue_listener.start()
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+
+
+def shutdown_logging() -> None:
+    """
+    Vacía la cola del QueueListener (si hay) y lo detiene. Lo que se loguee
+    después va directo a los handlers (modo sync).
+    """
+    global _queue_listener
+    if _queue_listener is None:
+        return
+    listener, _queue_listener = _queue_listener, None
+    listener.stop()
+
+    logger = logging.getLogger()
+    logger.handlers = [h for h in logger.handlers if not isinstance(h, _DroppingQueueHandler)]
+    for handler in listener.handlers:
+        logger.addHandler(handler)
+
+
+def log_allowed(category: str) -> bool:
+    """Para el hot path: decidir antes de construir el mensaje (cuenta como suprimido si no)."""
+    return sampler.allow(category)
+
+
+def logging_stats() -> dict:
+    return {
+        "mode": "queue" if _queue_listener is not None else "sync",
+        "queue_dropped": _DroppingQueueHandler.dropped,
+        "suppressed": dict(sampler.suppressed),
+    }
+
+
+atexit.register(shutdown_logging)
@@ -1,6 +1,7 @@
 ﻿import os
 from dotenv import load_dotenv
 from src.service.listener_service import ListenerService
+from src.service.shard_supervisor import ShardSupervisor, sharding_requested
 
 
 def main():
@@ -8,6 +9,20 @@ def main():
     host = os.getenv("SYSLOG_HOST", "0.0.0.0")
     port = int(os.getenv("SYSLOG_PORT", "514"))
 
+    # LISTENER_PROCESSES>1 (Linux): N procesos con SO_REUSEPORT en el mismo puerto
+    processes = sharding_requested()
+    if processes:
+        supervisor = ShardSupervisor(
+            host=host,
+            port=port,
+            processes=processes,
+            stats_interval=float(os.getenv("STATS_INTERVAL_SEC", "60")),
+            restart_backoff_sec=float(os.getenv("SHARD_RESTART_BACKOFF_SEC", "1")),
+            restart_backoff_max_sec=float(os.getenv("SHARD_RESTART_BACKOFF_MAX_SEC", "60")),
+        )
+        supervisor.run_forever()
+        return
+
     service = ListenerService(host=host, port=port)
     service.run_forever()
 
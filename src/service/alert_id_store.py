@@ -0,0 +1,220 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin shards, no hace falta lock entre procesos
+    fcntl = None
+
+
+class AlertIdStore:
+    """
+    Set de alert_ids ya alertados (dedupe O(1))
+    - carga el log una sola vez al inicio
+    - append-only: cada id nuevo se agrega al archivo ("alert_id<TAB>epoch")
+    - evicción por antigüedad (max_age_sec): los ids "de hoy" expiran solos
+    - compactación periódica del archivo (reescribe solo los ids vigentes)
+    - thread-safe (varios workers de ingest)
+    Líneas legacy sin timestamp se toman como vistas al momento de cargar.
+    seed_paths: archivos de solo lectura que también se cargan al inicio
+    (p.ej. los ids_alerted.shard-N.log de versiones anteriores).
+    shared=True: varios procesos (shards) usan el mismo archivo. Cada add_if_new toma un
+    flock sobre <path>.lock, lee lo que agregaron los demás desde el último offset
+    (o el archivo entero si otro lo compactó) y recién ahí decide y agrega.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_age_sec: float = 48 * 3600,
+        evict_interval_sec: float = 60.0,
+        compact_min_lines: int = 1000,
+        seed_paths: Iterable[str] = (),
+        shared: bool = False,
+    ):
+        if shared and fcntl is None:
+            raise RuntimeError("AlertIdStore shared=True needs fcntl (POSIX)")
+
+        self.path = path
+        self.max_age_sec = max_age_sec
+        self.evict_interval_sec = evict_interval_sec
+        self.compact_min_lines = compact_min_lines
+        self.shared = shared
+
+        self._lock = threading.Lock()
+        # dict mantiene orden de inserción => los más viejos primero
+        self._ids: Dict[str, float] = {}
+        self._file_lines = 0
+        self._last_evict = time.time()
+        self._fh: Optional[TextIO] = None
+        # shared: bytes del archivo ya incorporados (todo lo anterior está en _ids)
+        self._offset = 0
+        self._lock_fh: Optional[TextIO] = None
+
+        for seed in seed_paths:
+            if os.path.exists(seed) and os.path.abspath(seed) != os.path.abspath(path):
+                self._read(seed, count_lines=False)
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        if shared:
+            self._lock_fh = open(f"{self.path}.lock", "a")
+        with self._file_lock():
+            self._load()
+            self._evict(time.time())
+            self._maybe_compact()
+
+    @contextmanager
+    def _file_lock(self):
+        """Lock entre procesos (solo shared); el threading.Lock lo toma quien llama."""
+        if self._lock_fh is None:
+            yield
+            return
+        fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        Path(self.path).touch(exist_ok=True)
+
+        self._read(self.path, count_lines=True)
+        self._fh = open(self.path, "a", encoding="utf-8", errors="replace")
+        self._offset = os.fstat(self._fh.fileno()).st_size
+        logging.info("[ControlM] Alert id store loaded: %s ids from %s", len(self._ids), self.path)
+
+    def _read(self, path: str, count_lines: bool) -> None:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            self._add_lines(f, count_lines)
+
+    def _add_lines(self, lines: Iterable[str], count_lines: bool) -> None:
+        loaded_at = time.time()
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if count_lines:
+                self._file_lines += 1
+
+            alert_id, _, ts = line.partition("\t")
+            try:
+                seen_at = float(ts) if ts else loaded_at
+            except ValueError:
+                seen_at = loaded_at
+
+            # Re-insertar para que el orden refleje la última vez visto
+            self._ids.pop(alert_id, None)
+            self._ids[alert_id] = seen_at
+
+    def _sync(self) -> None:
+        """shared (con el flock tomado): incorpora lo que escribieron los otros procesos."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is None or st.st_ino != os.fstat(self._fh.fileno()).st_ino:
+            # Otro shard compactó (os.replace => archivo nuevo): reabrir y releerlo entero
+            self._fh.close()
+            Path(self.path).touch(exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8", errors="replace")
+            self._file_lines = 0
+            self._offset = 0
+            st = os.fstat(self._fh.fileno())
+
+        if st.st_size <= self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        # Solo líneas completas (un proceso que murió a mitad de write deja una cola sin \n)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        self._offset += end
+        lines: List[str] = data[:end].decode("utf-8", errors="replace").splitlines()
+        self._add_lines(lines, count_lines=True)
+
+    def add_if_new(self, alert_id: Optional[str]) -> bool:
+        """True si el alert_id no se había visto (y queda registrado)."""
+        if not alert_id:
+            return False
+
+        now = time.time()
+        with self._lock, self._file_lock():
+            if self.shared:
+                self._sync()
+
+            if now - self._last_evict >= self.evict_interval_sec:
+                self._evict(now)
+                self._maybe_compact()
+
+            if alert_id in self._ids:
+                return False
+
+            self._ids[alert_id] = now
+            self._fh.write(f"{alert_id}\t{int(now)}\n")
+            self._fh.flush()
+            self._file_lines += 1
+            if self.shared:
+                self._offset = os.fstat(self._fh.fileno()).st_size
+            return True
+
+    def _evict(self, now: float) -> int:
+        self._last_evict = now
+        cutoff = now - self.max_age_sec
+        evicted = 0
+        for alert_id, seen_at in list(self._ids.items()):
+            if seen_at >= cutoff:
+                break
+            del self._ids[alert_id]
+            evicted += 1
+        return evicted
+
+    def _maybe_compact(self) -> None:
+        # El archivo solo crece: compactar cuando la mitad o más son líneas muertas
+        if self._file_lines < self.compact_min_lines or self._file_lines < 2 * len(self._ids):
+            return
+        self._compact()
+
+    def compact(self) -> None:
+        """Reescribe el archivo solo con los ids vigentes (atómico vía os.replace)."""
+        with self._lock, self._file_lock():
+            if self.shared:
+                self._sync()
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", errors="replace") as f:
+            for alert_id, seen_at in self._ids.items():
+                f.write(f"{alert_id}\t{int(seen_at)}\n")
+
+        if self._fh:
+            self._fh.close()
+        os.replace(tmp_path, self.path)
+        self._fh = open(self.path, "a", encoding="utf-8", errors="replace")
+        self._offset = os.fstat(self._fh.fileno()).st_size
+
+        logging.info(
+            "[ControlM] Alert id store compacted: %s -> %s lines",
+            self._file_lines,
+            len(self._ids),
+        )
+        self._file_lines = len(self._ids)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+            if self._lock_fh:
+                self._lock_fh.close()
+                self._lock_fh = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,324 @@
+import gzip
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import BinaryIO, List, Optional, TextIO, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin shards, no hace falta lock entre procesos
+    fcntl = None
+
+
+class AlertSink:
+    """
+    Writer de larga vida para un archivo de alertas (alerts_to_work.log / controlm_log_alerts.txt)
+    - write() solo encola la línea; un thread hace group commit: una escritura por batch,
+      a lo más flush_ms después de la primera línea pendiente o al juntar max_batch líneas
+    - wait=True: write() vuelve cuando su línea ya está en el archivo (mismo batch compartido)
+    - rotación por tamaño (rotate_bytes) y/o por día: archivo.AAAAMMDD[.N][.gz]
+      (rename + archivo nuevo, lo que espera el agente de Dynatrace que lo sigue)
+    - keep_rotated > 0 borra los rotados más viejos
+    - flush() explícito; close() escribe lo pendiente (shutdown del servicio)
+    Sin start() (uso suelto) cada write() escribe en el momento.
+    Con shards varios procesos comparten el archivo: append + reabre si otro lo rotó.
+    El tamaño para rotar es el del archivo (stat), no lo escrito por este proceso, y la
+    rotación se decide y hace bajo flock en <archivo>.lock (un solo shard renombra).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_ms: float = 50.0,
+        max_batch: int = 256,
+        rotate_bytes: int = 0,
+        rotate_daily: bool = False,
+        compress_rotated: bool = False,
+        keep_rotated: int = 0,
+        fsync: bool = False,
+        wait: bool = False,
+        wait_timeout_sec: float = 5.0,
+    ):
+        self.path = Path(path)
+        self.flush_sec = max(0.0, flush_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self.compress_rotated = compress_rotated
+        self.keep_rotated = keep_rotated
+        self.fsync = fsync
+        self.wait = wait
+        self.wait_timeout_sec = wait_timeout_sec
+
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._first_at = 0.0
+        self._seq = 0            # última línea encolada
+        self._written_seq = 0    # última línea escrita
+        # Serializa swap + escritura: los batches llegan al archivo en orden
+        self._io_lock = threading.Lock()
+        self._fh: Optional[BinaryIO] = None
+        self._lock_fh: Optional[TextIO] = None
+        self._size = 0
+        self._day: Optional[date] = None
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.lines_written = 0
+        self.batches = 0
+        self.bytes_written = 0
+        self.max_batch_seen = 0
+        self.rotations = 0
+        self.write_errors = 0
+        self.wait_timeouts = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is not None and (rotate_bytes or rotate_daily):
+            self._lock_fh = open(f"{self.path}.lock", "a")
+        with self._io_lock:
+            self._open()
+
+    # -------------------------
+    # API
+    # -------------------------
+    def write(self, line: str) -> None:
+        if self._thread is None:
+            with self._cond:
+                self._pending.append(line)
+                self._seq += 1
+            self.flush()
+            return
+
+        with self._cond:
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append(line)
+            self._seq += 1
+            seq = self._seq
+            self._cond.notify_all()
+            if not self.wait:
+                return
+            deadline = time.monotonic() + self.wait_timeout_sec
+            while self._written_seq < seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # La línea sigue pendiente (disco lento / error): no bloquea más al worker
+                    self.wait_timeouts += 1
+                    return
+                self._cond.wait(remaining)
+
+    def flush(self) -> bool:
+        """Escribe lo pendiente. False si la escritura falló (las líneas quedan pendientes)."""
+        with self._io_lock:
+            with self._cond:
+                lines, self._pending = self._pending, []
+                seq = self._seq
+            if not lines:
+                return True
+            try:
+                self._write_batch(lines)
+            except Exception:
+                self.write_errors += 1
+                logging.exception("Alert sink write failed (%s)", self.path)
+                # Vuelven al frente: se reintenta en el próximo batch
+                with self._cond:
+                    self._pending[:0] = lines
+                return False
+            with self._cond:
+                self._written_seq = seq
+                self._cond.notify_all()
+            return True
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._flush_loop, name=f"alert-sink-{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+        with self._io_lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self._lock_fh is not None:
+                self._lock_fh.close()
+                self._lock_fh = None
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                # Group commit: espera compañeros de batch hasta el límite de latencia
+                deadline = self._first_at + self.flush_sec
+                while len(self._pending) < self.max_batch and not self._stop:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if not self.flush():
+                time.sleep(1.0)
+
+    # -------------------------
+    # Archivo
+    # -------------------------
+    def _open(self) -> None:
+        self._fh = open(self.path, "ab")
+        st = os.fstat(self._fh.fileno())
+        self._size = st.st_size
+        # Archivo con contenido de otro día (p.ej. servicio apagado a medianoche): su día es el del mtime
+        self._day = datetime.fromtimestamp(st.st_mtime).date() if st.st_size else date.today()
+
+    def _write_batch(self, lines: List[str]) -> None:
+        data = ("\n".join(lines) + "\n").encode("utf-8", errors="replace")
+        if self._fh is None:
+            self._open()
+        self._maybe_rotate(len(data))
+
+        self._fh.write(data)
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+
+        self._size += len(data)
+        self.lines_written += len(lines)
+        self.batches += 1
+        self.bytes_written += len(data)
+        self.max_batch_seen = max(self.max_batch_seen, len(lines))
+
+    def _maybe_rotate(self, incoming: int) -> None:
+        if not self.rotate_bytes and not self.rotate_daily:
+            return
+        if not self._rotation_due(incoming):
+            return
+        with self._file_lock():
+            # Otro shard pudo rotar mientras se esperaba el lock: decidir de nuevo con el archivo actual
+            if self._rotation_due(incoming):
+                self._rotate()
+
+    def _rotation_due(self, incoming: int) -> bool:
+        self._refresh()
+        by_day = self.rotate_daily and self._size > 0 and self._day != date.today()
+        by_size = self.rotate_bytes > 0 and self._size > 0 and self._size + incoming > self.rotate_bytes
+        return by_day or by_size
+
+    def _refresh(self) -> None:
+        """Tamaño real del archivo (incluye lo que escribieron los otros shards); reabre si otro lo rotó."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+        if st is None or st.st_ino != os.fstat(self._fh.fileno()).st_ino:
+            self._fh.close()
+            self._open()
+        else:
+            self._size = st.st_size
+
+    @contextmanager
+    def _file_lock(self):
+        if self._lock_fh is None:
+            yield
+            return
+        fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fh.fileno(), fcntl.LOCK_UN)
+
+    def _rotate(self) -> None:
+        suffix = self._day.strftime("%Y%m%d")
+        target = self._rotated_name(suffix)
+
+        # Windows no renombra archivos abiertos: cerrar antes
+        self._fh.close()
+        self._fh = None
+        try:
+            os.replace(self.path, target)
+        except OSError:
+            # Lo tiene tomado otro proceso (agente sin FILE_SHARE_DELETE): sigue creciendo, reintento al próximo batch
+            self.write_errors += 1
+            logging.warning("Alert sink rotation failed (%s -> %s)", self.path, target, exc_info=True)
+            self._open()
+            return
+
+        self._open()
+        self.rotations += 1
+        logging.info("Alert sink rotated %s -> %s", self.path, target.name)
+
+        if self.compress_rotated:
+            threading.Thread(target=self._compress, args=(target,), name="alert-sink-gzip", daemon=True).start()
+        else:
+            self._apply_keep()
+
+    def _rotated(self) -> List[Tuple[str, int, Path]]:
+        """Rotados existentes como (AAAAMMDD, N, path), del más viejo al más nuevo."""
+        out = []
+        for p in self.path.parent.glob(self.path.name + ".*"):
+            parts = p.name[len(self.path.name) + 1:].split(".")
+            if parts and parts[-1] == "gz":
+                parts = parts[:-1]
+            if not parts or not parts[0].isdigit() or len(parts) > 2 or (len(parts) == 2 and not parts[1].isdigit()):
+                continue
+            out.append((parts[0], int(parts[1]) if len(parts) == 2 else 0, p))
+        out.sort(key=lambda item: (item[0], item[1]))
+        return out
+
+    def _rotated_name(self, suffix: str) -> Path:
+        # Siguiente N del día: los números no se reutilizan aunque keep_rotated haya borrado
+        used = [n for day, n, _p in self._rotated() if day == suffix]
+        n = max(used) + 1 if used else 0
+        return self.path.with_name(f"{self.path.name}.{suffix}" + (f".{n}" if n else ""))
+
+    def _compress(self, target: Path) -> None:
+        gz = target.with_name(target.name + ".gz")
+        try:
+            with open(target, "rb") as src, gzip.open(gz, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            target.unlink()
+        except Exception:
+            logging.exception("Alert sink compression failed (%s)", target)
+            return
+        with self._io_lock:
+            self._apply_keep()
+
+    def _apply_keep(self) -> None:
+        if self.keep_rotated <= 0:
+            return
+        for _day, _n, old in self._rotated()[:-self.keep_rotated]:
+            try:
+                old.unlink()
+            except OSError:
+                logging.warning("Alert sink could not delete %s", old, exc_info=True)
+
+    def stats(self) -> dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "lines": self.lines_written,
+            "batches": self.batches,
+            "lines_per_batch": round(self.lines_written / self.batches, 2) if self.batches else 0.0,
+            "max_batch": self.max_batch_seen,
+            "bytes": self.bytes_written,
+            "pending": pending,
+            "rotations": self.rotations,
+            "write_errors": self.write_errors,
+            "wait_timeouts": self.wait_timeouts,
+        }
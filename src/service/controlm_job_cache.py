@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+JobInfo = Dict[str, Optional[object]]
+
+_EMPTY: JobInfo = {"group_code": None, "group_name": None, "sev_num": None}
+
+
+def _job_key(job_name: str) -> str:
+    # JobName en SQL Server se compara case-insensitive e ignora espacios finales
+    return job_name.rstrip().upper()
+
+
+class ControlMJobCache:
+    """
+    Réplica en memoria de Jobs_information/Groups para lookups Control-M
+    - snapshot dict JobName -> {group_code, group_name, sev_num}
+    - refresh incremental por CreatedAtUtc + full refresh periódico (background)
+    - negative cache con TTL para jobs desconocidos
+    - si la DB no responde se mantiene el último snapshot bueno
+    lookup() tiene el mismo contrato que MSSQLWriter.lookup_controlm_job.
+    """
+
+    def __init__(
+        self,
+        fetch_jobs: Callable[[Optional[datetime]], List[tuple]],
+        fetch_job: Callable[[str], Optional[JobInfo]],
+        refresh_sec: float = 60.0,
+        full_refresh_sec: float = 900.0,
+        negative_ttl_sec: float = 300.0,
+        negative_max_entries: int = 10000,
+    ):
+        self.fetch_jobs = fetch_jobs
+        self.fetch_job = fetch_job
+        self.refresh_sec = refresh_sec
+        self.full_refresh_sec = full_refresh_sec
+        self.negative_ttl_sec = negative_ttl_sec
+        self.negative_max_entries = negative_max_entries
+
+        self._jobs: Dict[str, JobInfo] = {}
+        self._negative: Dict[str, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._loaded = False
+        self._last_full_at = 0.0
+        self._last_refresh_ok: Optional[float] = None
+
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._hits = 0
+        self._negative_hits = 0
+        self._live_lookups = 0
+        self._live_lookup_errors = 0
+        self._refresh_errors = 0
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self) -> None:
+        self.refresh(full=True)
+        self._thread = threading.Thread(target=self._refresh_loop, name="controlm-job-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.wait(self.refresh_sec):
+            full = not self._loaded or time.monotonic() - self._last_full_at >= self.full_refresh_sec
+            self.refresh(full=full)
+
+    # -------------------------
+    # Refresh
+    # -------------------------
+    def refresh(self, full: bool = False) -> bool:
+        with self._refresh_lock:
+            full = full or not self._loaded
+            try:
+                rows = self.fetch_jobs(None if full else self._watermark)
+            except Exception:
+                self._refresh_errors += 1
+                logging.exception(
+                    "[ControlM] Job cache refresh failed (full=%s). Keeping last snapshot (%s jobs)",
+                    full,
+                    len(self._jobs),
+                )
+                return False
+
+            jobs = {} if full else self._jobs
+            watermark = None if full else self._watermark
+
+            for job_name, group_code, group_name, severity, changed_at in rows:
+                if not job_name:
+                    continue
+                jobs[_job_key(job_name)] = {
+                    "group_code": group_code,
+                    "group_name": group_name,
+                    "sev_num": int(severity) if severity is not None else None,
+                }
+                if changed_at is not None and (watermark is None or changed_at > watermark):
+                    watermark = changed_at
+
+            if full:
+                # Swap atómico del snapshot completo
+                self._jobs = jobs
+                self._negative = {}
+                self._last_full_at = time.monotonic()
+            elif rows:
+                # Jobs nuevos dejan de estar en negative cache
+                for job_name, *_ in rows:
+                    if job_name:
+                        self._negative.pop(_job_key(job_name), None)
+
+            self._watermark = watermark
+            self._loaded = True
+            self._last_refresh_ok = time.time()
+
+            if full or rows:
+                logging.info("[ControlM] Job cache refreshed (full=%s changed=%s total=%s)", full, len(rows), len(jobs))
+            return True
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def lookup(self, job_name: Optional[str]) -> JobInfo:
+        if not job_name:
+            return dict(_EMPTY)
+
+        key = _job_key(job_name)
+        info = self._jobs.get(key)
+        if info is not None:
+            self._hits += 1
+            return dict(info)
+
+        now = time.monotonic()
+        neg_at = self._negative.get(key)
+        if neg_at is not None and now - neg_at < self.negative_ttl_sec:
+            self._negative_hits += 1
+            return dict(_EMPTY)
+
+        # Job desconocido: una consulta puntual por TTL (puede ser un alta reciente)
+        self._live_lookups += 1
+        try:
+            info = self.fetch_job(job_name)
+        except Exception:
+            # Sin caché negativa: al volver la DB el próximo lookup consulta de nuevo
+            self._live_lookup_errors += 1
+            logging.warning("[ControlM] Live job lookup failed for %s (DB unreachable?)", job_name)
+            return dict(_EMPTY)
+
+        if info is not None:
+            self._jobs[key] = info
+            return dict(info)
+
+        if len(self._negative) >= self.negative_max_entries:
+            self._negative.clear()
+        self._negative[key] = now
+        return dict(_EMPTY)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "jobs": len(self._jobs),
+            "negative": len(self._negative),
+            "hits": self._hits,
+            "negative_hits": self._negative_hits,
+            "live_lookups": self._live_lookups,
+            "live_lookup_errors": self._live_lookup_errors,
+            "refresh_errors": self._refresh_errors,
+            "last_refresh_ok": self._last_refresh_ok,
+        }
@@ -2,69 +2,40 @@ import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Callable
+from typing import Optional, Dict, Callable, Iterable
 
+from src.core.metrics import ALERTS
 from src.domain.models import SyslogEvent
+from src.logs.log_setup import CATEGORY_CONTROLM
+from src.service.alert_id_store import AlertIdStore
+from src.service.alert_sink import AlertSink
+from src.service.controlm_tokenizer import tokenize_controlm
 
 
 # -------------------------------------------------
 # Helpers
 # -------------------------------------------------
 
-def _norm(s: Optional[str]) -> Optional[str]:
-    if s is None:
-        return None
-    s = s.strip()
-    return s if s != "" else None
-
-
 def _safe(val):
     return val if val not in (None, "", "None") else "-"
 
 
+@lru_cache(maxsize=None)
+def _key_prefix_re(key: str) -> "re.Pattern[str]":
+    return re.compile(rf"(?i)^\s*{re.escape(key)}\s*:\s*")
+
+
 def _strip_key_prefix(val: Optional[str], key: str) -> Optional[str]:
     """If a captured value accidentally includes 'key:' prefix, strip it safely."""
     if not val:
         return val
     # Remove leading "key:" (case-insensitive) if present
-    val = re.sub(rf"(?i)^\s*{re.escape(key)}\s*:\s*", "", val).strip()
+    val = _key_prefix_re(key).sub("", val).strip()
     return val or None
 
 
-def _val_between(text: str, key: str, next_key: str) -> Optional[str]:
-    pattern = rf"{re.escape(key)}:\s*(?P<val>.*?)\s+{re.escape(next_key)}:"
-    m = re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL)
-    if not m:
-        return None
-    return _norm(m.group("val"))
-
-
-def _val_after(text: str, key: str) -> Optional[str]:
-    pattern = rf"{re.escape(key)}:\s*(?P<val>.*)$"
-    m = re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL)
-    if not m:
-        return None
-    return _norm(m.group("val"))
-
-
-def _date_value(text: str, key: str) -> Optional[str]:
-    old_format = f"Detected Entry: {text}"
-    pattern = rf"{re.escape(key)}:\s*(?P<dt>\d{{4}}-\d{{2}}-\d{{2}}\s+\d{{2}}:\d{{2}}:\d{{2}})"
-    m = re.search(pattern, old_format, flags=re.IGNORECASE)
-    if not m:
-        return None
-    return _norm(m.group("dt"))
-
-
-def _text_between(text: str, start_key: str, end_key: str) -> Optional[str]:
-    pattern = rf"{re.escape(start_key)}:\s*(?P<val>.*?)\s+{re.escape(end_key)}:"
-    m = re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL)
-    if not m:
-        return None
-    return _norm(m.group("val"))
-
-
 def _string_to_date(s: str) -> datetime:
     return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
 
@@ -84,23 +55,6 @@ def _ensure_file(path: str) -> None:
     Path(path).touch(exist_ok=True)
 
 
-def _need_alert_id(alert_id: Optional[str], ids_file: str) -> bool:
-    if not alert_id:
-        return False
-
-    _ensure_file(ids_file)
-
-    with open(ids_file, "r", encoding="utf-8", errors="replace") as f:
-        for line in f:
-            if alert_id == line.strip():
-                return False
-
-    with open(ids_file, "a", encoding="utf-8", errors="replace") as f:
-        f.write(f"{alert_id}\n")
-
-    return True
-
-
 def _assign_priority_from_sev(sev_num: Optional[int]) -> str:
     if sev_num == 3:
         return "Priority 2"
@@ -137,6 +91,10 @@ class ControlMProcessor:
         ids_alerted_file: str = "logs/controlm/ids_alerted.log",
         alerts_to_work_file: str = "logs/controlm/alerts_to_work.log",
         internal_alerts_file: str = "logs/controlm/controlm_log_alerts.txt",
+        alert_ids_max_age_sec: float = 48 * 3600,
+        alert_ids_seed_files: Iterable[str] = (),
+        alert_ids_shared: bool = False,
+        alert_sink_options: Optional[Dict[str, object]] = None,
     ):
         self.ids_alerted_file = ids_alerted_file
         self.alerts_to_work_file = alerts_to_work_file
@@ -146,6 +104,20 @@ class ControlMProcessor:
         _ensure_file(self.alerts_to_work_file)
         _ensure_file(self.internal_alerts_file)
 
+        # Dedupe en memoria respaldado por ids_alerted.log (thread-safe)
+        self.alert_ids = AlertIdStore(
+            self.ids_alerted_file,
+            max_age_sec=alert_ids_max_age_sec,
+            seed_paths=alert_ids_seed_files,
+            shared=alert_ids_shared,
+        )
+
+        # Archivos de alertas abiertos todo el proceso: group commit + rotación (ver AlertSink).
+        # Thread-safe: varios workers de ingest comparten el processor
+        sink_options = alert_sink_options or {}
+        self.internal_sink = AlertSink(self.internal_alerts_file, **sink_options)
+        self.dynatrace_sink = AlertSink(self.alerts_to_work_file, **sink_options)
+
     def try_build_alert(
         self,
         event: SyslogEvent,
@@ -155,25 +127,28 @@ class ControlMProcessor:
 
         text = event.message
 
-        detected_entry = _date_value(text, "Detected Entry")
+        # Una sola pasada sobre el mensaje para todos los campos
+        fields = tokenize_controlm(text)
+
+        detected_entry = fields["detected_entry"]
 
-        call_type = _val_between(text, "call_type", "alert_id")
-        alert_id = _val_between(text, "alert_id", "data_center")
-        data_center = _val_between(text, "data_center", "memname")
-        memname = _val_between(text, "memname", "order_id")
-        order_id = _val_between(text, "order_id", "severity")
-        severity_letter = _val_between(text, "severity", "status")
-        status = _val_between(text, "status", "send_time")
-        send_time = _val_between(text, "send_time", "last_user")
-        last_user = _val_between(text, "last_user", "last_time")
-        last_time = _val_between(text, "last_time", "message")
+        call_type = fields["call_type"]
+        alert_id = fields["alert_id"]
+        data_center = fields["data_center"]
+        memname = fields["memname"]
+        order_id = fields["order_id"]
+        severity_letter = fields["severity"]
+        status = fields["status"]
+        send_time = fields["send_time"]
+        last_user = fields["last_user"]
+        last_time = fields["last_time"]
 
-        message = _text_between(text, "message", "run_as") or ""
+        message = fields["message"] or ""
 
-        run_as = _val_between(text, "run_as", "sub_application")
-        sub_application = _val_between(text, "sub_application", "application")
-        application = _val_between(text, "application", "job_name")
-        job_name = _val_between(text, "job_name", "host_id")
+        run_as = fields["run_as"]
+        sub_application = fields["sub_application"]
+        application = fields["application"]
+        job_name = fields["job_name"]
 
         # FIX: avoid 'application:application: RTR' if the captured value includes prefix
         application = _strip_key_prefix(application, "application")
@@ -181,25 +156,33 @@ class ControlMProcessor:
         # Optional debug (remove later)
         # logging.info("[ControlM] parsed application=%r", application)
 
-        host_id = _val_between(text, "host_id", "alert_type")
-        alert_type = _val_between(text, "alert_type", "closed_from_em")
-        closed_from_em = _val_between(text, "closed_from_em", "ticket_number")
-        ticket_number = _val_between(text, "ticket_number", "run_counter")
-        run_counter = _val_after(text, "run_counter")
+        host_id = fields["host_id"]
+        alert_type = fields["alert_type"]
+        closed_from_em = fields["closed_from_em"]
+        ticket_number = fields["ticket_number"]
+        run_counter = fields["run_counter"]
 
         # Rule: only today
         if not _is_today(detected_entry):
-            logging.info("[ControlM] Skip alert_id=%s (not today)", alert_id)
+            ALERTS.labels("skipped", "not_today").inc()
+            logging.info("[ControlM] Skip alert_id=%s (not today)", alert_id, extra={"category": CATEGORY_CONTROLM})
             return None
 
         # Rule: dedupe
-        if not _need_alert_id(alert_id, self.ids_alerted_file):
-            logging.info("[ControlM] Skip alert_id=%s (duplicate)", alert_id)
+        if not self.alert_ids.add_if_new(alert_id):
+            ALERTS.labels("skipped", "duplicate").inc()
+            logging.info("[ControlM] Skip alert_id=%s (duplicate)", alert_id, extra={"category": CATEGORY_CONTROLM})
             return None
 
         # Rule: severity V only
         if (severity_letter or "").strip().upper() != "V":
-            logging.info("[ControlM] Skip alert_id=%s (severity=%s)", alert_id, severity_letter)
+            ALERTS.labels("skipped", "severity").inc()
+            logging.info(
+                "[ControlM] Skip alert_id=%s (severity=%s)",
+                alert_id,
+                severity_letter,
+                extra={"category": CATEGORY_CONTROLM},
+            )
             return None
 
         # DB lookup
@@ -256,6 +239,7 @@ class ControlMProcessor:
             f"AssignmentGroupCode:{_safe(group_code)}"
         )
 
+        ALERTS.labels("generated", "").inc()
         return ControlMAlert(
             job_name=job_name,
             group_code=group_code,
@@ -269,8 +253,24 @@ class ControlMProcessor:
         )
 
     def write_alert(self, alert: ControlMAlert) -> None:
-        with open(self.internal_alerts_file, "a", encoding="utf-8", errors="replace") as f:
-            f.write(alert.internal_line + "\n")
-
-        with open(self.alerts_to_work_file, "a", encoding="utf-8", errors="replace") as f:
-            f.write(alert.dynatrace_line + "\n")
+        self.internal_sink.write(alert.internal_line)
+        self.dynatrace_sink.write(alert.dynatrace_line)
+
+    def start(self) -> None:
+        self.internal_sink.start()
+        self.dynatrace_sink.start()
+
+    def flush(self) -> None:
+        self.internal_sink.flush()
+        self.dynatrace_sink.flush()
+
+    def stats(self) -> dict:
+        return {
+            "alerts_to_work": self.dynatrace_sink.stats(),
+            "internal_alerts": self.internal_sink.stats(),
+        }
+
+    def close(self) -> None:
+        self.dynatrace_sink.close()
+        self.internal_sink.close()
+        self.alert_ids.close()
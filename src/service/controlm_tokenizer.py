@@ -0,0 +1,121 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# (campo, key siguiente) en el orden del mensaje Control-M.
+# El valor de un campo es el texto entre "campo:" y " <siguiente>:".
+CONTROLM_FIELDS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("call_type", "alert_id"),
+    ("alert_id", "data_center"),
+    ("data_center", "memname"),
+    ("memname", "order_id"),
+    ("order_id", "severity"),
+    ("severity", "status"),
+    ("status", "send_time"),
+    ("send_time", "last_user"),
+    ("last_user", "last_time"),
+    ("last_time", "message"),
+    ("message", "run_as"),
+    ("run_as", "sub_application"),
+    ("sub_application", "application"),
+    ("application", "job_name"),
+    ("job_name", "host_id"),
+    ("host_id", "alert_type"),
+    ("alert_type", "closed_from_em"),
+    ("closed_from_em", "ticket_number"),
+    ("ticket_number", "run_counter"),
+    ("run_counter", None),  # hasta el final del mensaje
+)
+
+_KEYS: List[str] = sorted({k for pair in CONTROLM_FIELDS for k in pair if k}, key=len, reverse=True)
+
+_KEY_SET = frozenset(_KEYS)
+_KEY_LENGTHS = sorted({len(k) for k in _KEYS}, reverse=True)
+
+# Palabra pegada a ":". Con IGNORECASE, [a-z_] también acepta estos 4 caracteres
+# no ASCII; se pliegan igual que lo hace el motor de re para que el resultado
+# sea idéntico al re.search(..., re.IGNORECASE) por campo.
+_WORD_RE = re.compile(r"([a-z_]+):", re.IGNORECASE)
+_CASE_FOLD = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s", "\u212a": "k"})
+
+_DATE = r"(?P<dt>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})"
+_DATE_AT_START_RE = re.compile(r"\s*" + _DATE)
+_DETECTED_ENTRY_RE = re.compile(r"Detected Entry:\s*" + _DATE, re.IGNORECASE)
+
+
+def _norm(s: str) -> Optional[str]:
+    s = s.strip()
+    return s if s != "" else None
+
+
+def detected_entry(text: str) -> Optional[str]:
+    """
+    Fecha del "Detected Entry". El mensaje puede llegar sin el prefijo
+    (rsyslog lo recorta), así que la fecha al inicio también cuenta.
+    """
+    m = _DATE_AT_START_RE.match(text) or _DETECTED_ENTRY_RE.search(text)
+    if not m:
+        return None
+    return _norm(m.group("dt"))
+
+
+def _key_positions(text: str) -> Dict[str, List[int]]:
+    """
+    Una sola pasada: posición de cada "key:" conocida (case-insensitive).
+    Una key puede ser sufijo de la palabra ("application" dentro de
+    "sub_application:"), igual que matcheaba el patrón anterior.
+    """
+    positions: Dict[str, List[int]] = {}
+    for m in _WORD_RE.finditer(text):
+        word = m.group(1)
+        if not word.isascii():
+            word = word.translate(_CASE_FOLD)
+        word = word.lower()
+        end = m.end(1)
+        n = len(word)
+        for length in _KEY_LENGTHS:
+            if length > n:
+                continue
+            key = word if length == n else word[n - length:]
+            if key in _KEY_SET:
+                positions.setdefault(key, []).append(end - length)
+    return positions
+
+
+def _value(text: str, positions: Dict[str, List[int]], key: str, next_key: Optional[str]) -> Optional[str]:
+    starts = positions.get(key)
+    if not starts:
+        return None
+
+    # Inicio del valor: primera aparición de "key:" + espacios
+    s = starts[0] + len(key) + 1
+    if next_key is None:
+        return _norm(text[s:])
+
+    g = s
+    n = len(text)
+    while g < n and text[g].isspace():
+        g += 1
+
+    # Fin del valor: primera " next_key:" (precedida de espacio) después del valor
+    for k in positions.get(next_key, ()):
+        if k > g and text[k - 1].isspace():
+            return _norm(text[s:k])
+    return None
+
+
+def tokenize_controlm(text: str) -> Dict[str, Optional[str]]:
+    """
+    Extrae en una pasada todos los campos Control-M de un mensaje.
+    Mismo resultado que el re.search por campo que se usaba antes
+    (incluye el quirk de "application" capturado dentro de "sub_application:").
+
+    Returns:
+      {"detected_entry": ..., "call_type": ..., ..., "run_counter": ...}
+    """
+    positions = _key_positions(text)
+
+    fields: Dict[str, Optional[str]] = {"detected_entry": detected_entry(text)}
+    for key, next_key in CONTROLM_FIELDS:
+        fields[key] = _value(text, positions, key, next_key)
+    return fields
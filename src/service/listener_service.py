@@ -1,99 +1,368 @@
+import glob
 import logging
 import os
-from pathlib import Path
+import threading
+import time
 
 from dotenv import load_dotenv
 
+from src.core.async_syslog_listener import AsyncSyslogListener
+from src.core.ingest_queue import IngestQueue
+from src.core.metrics import (
+    ALERT_WRITE_SECONDS,
+    JOB_LOOKUP_SECONDS,
+    MESSAGES,
+    PARSE_FAILURES,
+    PARSE_SECONDS,
+    RATE_LIMITED,
+    REGISTRY,
+    ROUTE_SECONDS,
+    SHED,
+    MetricsServer,
+)
+from src.core.rate_limiter import RateLimiter
 from src.core.syslog_listener import SyslogListener, SyslogPacket
+from src.core.tcp_syslog_listener import TcpSyslogListener
+from src.logs.log_setup import (
+    CATEGORY_CONTROLM,
+    CATEGORY_INCOMING,
+    console_enabled,
+    log_allowed,
+    logging_stats,
+    setup_logging,
+    shutdown_logging,
+)
 from src.domain.models import SyslogEvent
-from src.service.syslog_parser import parse_syslog_rsyslog
-from src.service.routes_loader import load_routes, resolve_router
+from src.service.syslog_parser import parse_event, parser_stats
+from src.service.routes_loader import RoutesIndex, resolve_router
+from src.service.routes_watcher import RoutesWatcher
+from src.service.load_shedder import LoadShedder
+from src.service.router_pipelines import CONTROLM_PIPELINE, RouterPipelines
+from src.storage.batch_writer import BatchingWriter
+from src.storage.disk_spool import DiskSpool
+from src.storage.event_archive import EventArchive
 from src.storage.mssql_writer import MSSQLWriter
 from src.service.controlm_processor import ControlMProcessor
+from src.service.controlm_job_cache import ControlMJobCache
 
 
 class ListenerService:
-    # Routers que deben ejecutar pipeline Control-M (explícito)
+    # Routers con pipeline Control-M por defecto (si routes.json no trae "pipeline")
     CONTROLM_ROUTERS = {"sandbox", "controlm-dev", "controlm"}
 
-    def __init__(self, host="0.0.0.0", port=514):
+    LISTENER_ENGINES = {
+        "thread": SyslogListener,
+        "asyncio": AsyncSyslogListener,
+    }
+
+    def __init__(self, host="0.0.0.0", port=514, shard_id=None, stats_queue=None, mssql=None):
         load_dotenv()
 
         self.host = host
         self.port = port
 
+        # Sharding multi-proceso (ver ShardSupervisor): cada shard bindea con SO_REUSEPORT
+        self.shard_id = shard_id
+        self.stats_queue = stats_queue
+
         # Flag para imprimir payload completo (opcional)
         self.print_raw = os.getenv("PRINT_RAW_SYSLOG", "0").strip() in ("1", "true", "True", "YES", "yes")
 
         self._setup_logging()
+        # print() por mensaje solo en modo interactivo (no bajo el servicio de Windows)
+        self.console_output = console_enabled()
+
+        # Pipelines por router: cola + workers propios por router (un router lento no frena a otros)
+        self.pipelines = RouterPipelines(
+            stages={
+                "syslog_store": self._stage_syslog_store,
+                "controlm_store": self._stage_controlm_store,
+                "controlm_alert": self._stage_controlm_alert,
+            },
+            defaults={name: CONTROLM_PIPELINE for name in self.CONTROLM_ROUTERS},
+            queue_size=int(os.getenv("ROUTER_QUEUE_SIZE", "10000")),
+            workers=int(os.getenv("ROUTER_WORKERS", "2")),
+        )
 
-        # Routes dinámicas
+        # Routes dinámicas: carga inicial + hot reload (ROUTES_RELOAD_SEC=0 => solo al arrancar)
         routes_path = os.getenv("ROUTES_PATH", "docs/routes.json")
-        self.routes_index = load_routes(routes_path)
+        self.routes_watcher = RoutesWatcher(
+            routes_path,
+            on_swap=self._swap_routes,
+            poll_sec=float(os.getenv("ROUTES_RELOAD_SEC", "5")),
+            cache_size=int(os.getenv("ROUTES_CACHE_SIZE", "4096")),
+            validate=lambda index: self.pipelines.validate(index.router_configs),
+        )
+        self.routes_index = self.routes_watcher.load()
+        self.pipelines.configure(self.routes_index.router_configs)
+
+        # Token buckets por source_ip / router ("rate_limit" en routes.json), antes del parseo
+        self.rate_limiter = RateLimiter(report_sec=float(os.getenv("RATE_LIMIT_REPORT_SEC", "60")))
+        self.rate_limiter.configure(self.routes_index.rate_limit, self.routes_index.router_configs)
+
+        # MSSQL writer (2 DBs). DB_BATCH_SIZE<=1 => insert por mensaje (modo original)
+        # mssql: writer alterno con la misma interfaz (p.ej. DB falsa de benchmarks/e2e)
+        self.mssql = mssql if mssql is not None else MSSQLWriter()
+        self.db_writer = self.mssql
+        batch_size = int(os.getenv("DB_BATCH_SIZE", "500"))
+
+        # Spool en disco: con la DB caída las filas van a SPOOL_DIR y se replican al volver
+        self.spool = None
+        if os.getenv("SPOOL_ENABLED", "1").strip() in ("1", "true", "True", "YES", "yes"):
+            spool_dir = os.getenv("SPOOL_DIR", "logs/spool")
+            if self.shard_id is not None:
+                spool_dir = os.path.join(spool_dir, f"shard-{self.shard_id}")
+            self.spool = DiskSpool(
+                spool_dir,
+                max_bytes=int(os.getenv("SPOOL_MAX_BYTES", str(1024 * 1024 * 1024))),
+                segment_bytes=int(os.getenv("SPOOL_SEGMENT_BYTES", str(16 * 1024 * 1024))),
+                fsync=os.getenv("SPOOL_FSYNC", "0").strip() in ("1", "true", "True", "YES", "yes"),
+            )
 
-        logging.info(
-            "Routes loaded: version=%s default_router=%s routes_path=%s",
-            self.routes_index.version,
-            self.routes_index.default_router,
-            routes_path
+        if batch_size > 1 or self.spool is not None:
+            self.db_writer = BatchingWriter(
+                self.mssql,
+                batch_size=batch_size,
+                max_age_sec=int(os.getenv("DB_BATCH_MAX_AGE_MS", "1000")) / 1000.0,
+                spool=self.spool,
+                replay_sec=float(os.getenv("SPOOL_REPLAY_SEC", "2")),
+                replay_batch_size=int(os.getenv("SPOOL_REPLAY_BATCH", "5000")),
+            )
+
+        # Réplica en memoria de Jobs_information/Groups (lookup fuera del camino crítico)
+        self.controlm_jobs = ControlMJobCache(
+            fetch_jobs=self.mssql.fetch_controlm_jobs,
+            fetch_job=self.mssql.fetch_controlm_job,
+            refresh_sec=float(os.getenv("CONTROLM_JOBS_REFRESH_SEC", "60")),
+            full_refresh_sec=float(os.getenv("CONTROLM_JOBS_FULL_REFRESH_SEC", "900")),
+            negative_ttl_sec=float(os.getenv("CONTROLM_JOBS_NEGATIVE_TTL_SEC", "300")),
         )
 
-        # MSSQL writer (2 DBs)
-        self.db_writer = MSSQLWriter()
+        # Archivo local comprimido por hora (histórico más allá de la retención de 48h en SQL)
+        self.archive = None
+        if os.getenv("ARCHIVE_ENABLED", "0").strip() in ("1", "true", "True", "YES", "yes"):
+            archive_dir = os.getenv("ARCHIVE_DIR", "logs/archive")
+            if self.shard_id is not None:
+                archive_dir = os.path.join(archive_dir, f"shard-{self.shard_id}")
+            self.archive = EventArchive(
+                archive_dir,
+                block_events=int(os.getenv("ARCHIVE_BLOCK_EVENTS", "2000")),
+                flush_sec=float(os.getenv("ARCHIVE_FLUSH_SEC", "5")),
+                retain_days=int(os.getenv("ARCHIVE_RETAIN_DAYS", "0")),
+            )
+
+        # Control-M processor. Con shards todos comparten ids_alerted.log (flock + relectura
+        # de lo que agregaron los demás antes de cada alta): un alert_id alerta una sola vez.
+        # Los ids_alerted.shard-N.log de versiones anteriores se cargan como seed.
+        ids_seed_files = []
+        if self.shard_id is not None:
+            ids_seed_files = glob.glob("logs/controlm/ids_alerted.shard-*.log")
 
-        # Control-M processor
         self.controlm = ControlMProcessor(
             ids_alerted_file="logs/controlm/ids_alerted.log",
             alerts_to_work_file="logs/controlm/alerts_to_work.log",
             internal_alerts_file="logs/controlm/controlm_log_alerts.txt",
+            alert_ids_max_age_sec=float(os.getenv("CONTROLM_ALERT_IDS_MAX_AGE_SEC", str(48 * 3600))),
+            alert_ids_seed_files=ids_seed_files,
+            alert_ids_shared=self.shard_id is not None,
+            # Archivos de alertas: group commit (una escritura por batch) + rotación
+            alert_sink_options={
+                "flush_ms": float(os.getenv("ALERT_FLUSH_MS", "50")),
+                "max_batch": int(os.getenv("ALERT_MAX_BATCH", "256")),
+                "wait": os.getenv("ALERT_WAIT_WRITE", "0").strip() in ("1", "true", "True", "YES", "yes"),
+                "fsync": os.getenv("ALERT_FSYNC", "0").strip() in ("1", "true", "True", "YES", "yes"),
+                "rotate_bytes": int(os.getenv("ALERT_ROTATE_BYTES", "0")),
+                "rotate_daily": os.getenv("ALERT_ROTATE_DAILY", "0").strip() in ("1", "true", "True", "YES", "yes"),
+                "compress_rotated": os.getenv("ALERT_ROTATE_GZIP", "0").strip() in ("1", "true", "True", "YES", "yes"),
+                "keep_rotated": int(os.getenv("ALERT_ROTATE_KEEP", "0")),
+            },
+        )
+
+        # Cola de ingest + workers: el listener solo recibe y encola
+        self.ingest = IngestQueue(
+            handler=self._on_message,
+            maxsize=int(os.getenv("INGEST_QUEUE_SIZE", "10000")),
+            workers=int(os.getenv("INGEST_WORKERS", "4")),
         )
 
-        # Listener UDP
-        self.listener = SyslogListener(
+        # Modo sobrecarga: con backlog / latencia de cola altos se descarta (o muestrea) primero
+        # el tráfico de baja prioridad; los routers Control-M (y los que tengan controlm_alert) nunca
+        self.shedder = None
+        if os.getenv("SHED_ENABLED", "1").strip() in ("1", "true", "True", "YES", "yes"):
+            min_severity = int(os.getenv("SHED_MIN_SEVERITY", "6"))
+            self.shedder = LoadShedder(
+                backlog=self._backlog,
+                protected=self._protected_routers(self.routes_index),
+                shed_routers=self._shed_routers(self.routes_index),
+                min_severity=min_severity if min_severity >= 0 else None,
+                sample_backlog=float(os.getenv("SHED_SAMPLE_BACKLOG", "0.5")),
+                shed_backlog=float(os.getenv("SHED_BACKLOG", "0.8")),
+                recover_backlog=float(os.getenv("SHED_RECOVER_BACKLOG", "0.2")),
+                latency_sec=int(os.getenv("SHED_LATENCY_MS", "2000")) / 1000.0,
+                recover_sec=float(os.getenv("SHED_RECOVER_SEC", "5")),
+                sample_every=int(os.getenv("SHED_SAMPLE_EVERY", "10")),
+            )
+
+        # Intervalo de log de métricas (0 = deshabilitado)
+        self.stats_interval = float(os.getenv("STATS_INTERVAL_SEC", "60"))
+        self._stats_stop = threading.Event()
+        self._stats_thread = None
+
+        # Listener UDP: LISTENER_ENGINE=thread (recvfrom bloqueante) | asyncio (DatagramProtocol)
+        self.engine = os.getenv("LISTENER_ENGINE", "thread").strip().lower()
+        if self.engine not in self.LISTENER_ENGINES:
+            raise ValueError(f"Invalid LISTENER_ENGINE={self.engine!r} (expected one of {sorted(self.LISTENER_ENGINES)})")
+
+        listener_kwargs = {}
+        rcvbuf = int(os.getenv("SYSLOG_RCVBUF_BYTES", "0"))
+        if rcvbuf > 0:
+            listener_kwargs["rcvbuf_bytes"] = rcvbuf
+        if self.engine == "thread":
+            # SYSLOG_RECV_MODE=into: buffer preasignado + drops del kernel (SO_RXQ_OVFL)
+            listener_kwargs["recv_mode"] = os.getenv("SYSLOG_RECV_MODE", "recvfrom").strip().lower()
+
+        self.listener = self.LISTENER_ENGINES[self.engine](
             host=self.host,
             port=self.port,
-            on_message=self._on_message
+            buffer_size=int(os.getenv("SYSLOG_BUFFER_SIZE", "8192")),
+            reuse_port=self.shard_id is not None,
+            on_message=self._on_receive,
+            **listener_kwargs,
         )
 
-    def _setup_logging(self):
-        Path("logs").mkdir(exist_ok=True)
+        # Listener TCP (RFC 6587) opcional, mismo pipeline que UDP. SYSLOG_TCP_PORT=0 => deshabilitado
+        self.tcp_listener = None
+        self._tcp_thread = None
+        tcp_port = int(os.getenv("SYSLOG_TCP_PORT", "0"))
+        if tcp_port > 0:
+            self.tcp_listener = TcpSyslogListener(
+                host=self.host,
+                port=tcp_port,
+                # admit una vez por frame; cola llena => try_submit False sin contar drop y el listener reintenta
+                admit=self._admit,
+                on_message=self.ingest.try_submit,
+                max_frame=int(os.getenv("SYSLOG_TCP_MAX_FRAME", "65536")),
+                max_connections=int(os.getenv("SYSLOG_TCP_MAX_CONNECTIONS", "1000")),
+                reuse_port=self.shard_id is not None,
+            )
 
-        logger = logging.getLogger()
-        logger.setLevel(logging.INFO)
+        # Endpoint Prometheus (GET /metrics). METRICS_PORT=0 => deshabilitado; shard N => puerto + N
+        self.metrics_server = None
+        metrics_port = int(os.getenv("METRICS_PORT", "9514"))
+        if metrics_port > 0:
+            self.metrics_server = MetricsServer(
+                host=os.getenv("METRICS_HOST", "127.0.0.1"),
+                port=metrics_port + (self.shard_id or 0),
+            )
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        """Métricas que ya existen en stats(): se leen al momento del scrape."""
+        REGISTRY.callback(
+            "watchtower_listener_received_total",
+            "Datagramas recibidos por el listener UDP",
+            lambda: {(): self.listener.received},
+            kind="counter",
+        )
+        REGISTRY.callback(
+            "watchtower_queue_depth",
+            "Elementos en cola (ingest y por router)",
+            lambda: {
+                ("ingest",): self.ingest.depth(),
+                **{(f"router-{name}",): q.depth() for name, q in self.pipelines.queues().items()},
+            },
+            labelnames=("queue",),
+        )
+        REGISTRY.callback(
+            "watchtower_queue_dropped_total",
+            "Elementos descartados por cola llena",
+            lambda: {
+                ("ingest",): self.ingest.dropped,
+                **{(f"router-{name}",): q.dropped for name, q in self.pipelines.queues().items()},
+            },
+            labelnames=("queue",),
+            kind="counter",
+        )
+        if self.shedder is not None:
+            REGISTRY.callback(
+                "watchtower_shed_level",
+                "Modo sobrecarga: 0=normal 1=sample 2=shed",
+                lambda: {(): self.shedder.level},
+            )
+        if self.spool is not None:
+            REGISTRY.callback(
+                "watchtower_spool_depth",
+                "Filas en el spool de disco pendientes de replay",
+                lambda: {(): self.spool.pending()},
+            )
 
-        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    def _swap_routes(self, index: RoutesIndex) -> None:
+        self.pipelines.configure(index.router_configs)
+        self.rate_limiter.configure(index.rate_limit, index.router_configs)
+        if self.shedder is not None:
+            self.shedder.protected = self._protected_routers(index)
+            self.shedder.shed_routers = self._shed_routers(index)
+        # Asignación atómica: cada mensaje usa el índice que leyó al entrar
+        self.routes_index = index
+
+    def _protected_routers(self, index: RoutesIndex) -> frozenset:
+        """Routers que el load shedder nunca descarta: Control-M y los que tengan controlm_alert en su pipeline."""
+        alerting = (
+            name for name, cfg in index.router_configs.items() if "controlm_alert" in (cfg.get("pipeline") or ())
+        )
+        return self.CONTROLM_ROUTERS | frozenset(alerting)
 
-        file_handler = logging.FileHandler("logs/syslog_listener.log", encoding="utf-8")
-        file_handler.setFormatter(formatter)
+    def _shed_routers(self, index: RoutesIndex) -> frozenset:
+        """SHED_ROUTERS (coma) o, sin configurar, el default_router de routes.json."""
+        names = [n.strip() for n in os.getenv("SHED_ROUTERS", "").split(",") if n.strip()]
+        return frozenset(names or [index.default_router]) - self._protected_routers(index)
 
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
+    def _backlog(self) -> float:
+        """
+        Fracción ocupada de la cola más llena (ingest o router).
+        Colas sin tope (maxsize=0) no cuentan; si ninguna tiene tope queda solo la señal de latencia.
+        """
+        queues = [self.ingest, *self.pipelines.queues().values()]
+        return max((q.depth() / q.maxsize for q in queues if q.maxsize > 0), default=0.0)
 
-        logger.handlers = []
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+    def _setup_logging(self):
+        setup_logging(process_tag=self.shard_id is not None)
 
-    def _should_run_controlm(self, router_name: str) -> bool:
-        return router_name in self.CONTROLM_ROUTERS
+    def _admit(self, packet: SyslogPacket) -> bool:
+        """
+        Rate limit de ingest (una vez por mensaje). False => excedente del token bucket, descartado.
+        TCP lo llama antes de los reintentos por backpressure (ver TcpSyslogListener admit).
+        """
+        limiter = self.rate_limiter
+        if not limiter.enabled:
+            return True
+        router = None
+        if limiter.by_router:
+            # Solo la IP (sin parsear): router conocido si matchea ip_addresses / CIDR
+            name, reason = self.routes_index.resolve(packet.source_ip, None)
+            if reason in ("ip", "cidr"):
+                router = name
+        if limiter.allow(packet.source_ip, router):
+            return True
+        RATE_LIMITED.labels("source" if router is None else router).inc()
+        return False
+
+    def _on_receive(self, packet: SyslogPacket):
+        """UDP: rate limit -> cola de ingest."""
+        if not self._admit(packet):
+            return None
+        return self.ingest.submit(packet)
 
     def _on_message(self, packet: SyslogPacket):
-        parsed = parse_syslog_rsyslog(packet.message)
-
-        event = SyslogEvent(
-            received_at_utc=packet.received_at_utc,
-            source_ip=packet.source_ip,
-            source_port=packet.source_port,
-            pri=parsed["pri"],
-            facility=parsed["facility"],
-            severity=parsed["severity"],
-            timestamp=parsed["timestamp"],
-            timestamp_raw=parsed["timestamp_raw"],
-            hostname=parsed["hostname"],
-            app_name=parsed["app_name"],
-            pid=parsed["pid"],
-            message=parsed["message"],
-            raw=parsed["raw"],
-        )
+        if self.shedder is not None:
+            # Latencia de cola: recibido -> inicio de procesamiento
+            self.shedder.observe(time.time() - packet.received_ts)
+        t0 = time.perf_counter()
+        event = parse_event(packet)
+        t1 = time.perf_counter()
+        PARSE_SECONDS.observe(t1 - t0)
+        if event.pri is None:
+            PARSE_FAILURES.inc()
 
         # Routing dinámico
         router_name, reason = resolve_router(
@@ -101,71 +370,66 @@ class ListenerService:
             event.source_ip,
             event.hostname
         )
+        ROUTE_SECONDS.observe(time.perf_counter() - t1)
 
-        # ✅ SIEMPRE imprime lo que llega
-        summary = (
-            f"[INCOMING router={router_name} reason={reason}] "
-            f"src={event.source_ip}:{event.source_port} "
-            f"host={event.hostname or '-'} "
-            f"app={event.app_name or '-'} "
-            f"sev={event.severity if event.severity is not None else '-'} "
-            f"msg={event.message.strip()}"
-        )
-        print(summary, flush=True)
-        logging.info(summary)
-
-        if self.print_raw:
-            print(f"[RAW] {event.raw}", flush=True)
-            logging.info("[RAW] %s", event.raw)
-
-        # 1) Siempre insertar en watchtower_logs
-        self.db_writer.insert_syslog_event(event, router_name)
-
-        # 2) Acciones por router (explícito)
-        if router_name == "raw":
-            logging.info("[ROUTER=raw] Stored only in watchtower_logs (no pipeline).")
-            return
-
-        if router_name == "sandbox":
-            logging.info("[ROUTER=sandbox] Executing Control-M pipeline...")
-            self._run_controlm_pipeline(event, router_name)
+        # Router por hostname / default: su bucket solo se conoce después del parseo
+        if reason not in ("ip", "cidr") and not self.rate_limiter.allow_router(router_name, event.source_ip):
+            RATE_LIMITED.labels(router_name).inc()
             return
-
-        if router_name == "controlm-dev":
-            logging.info("[ROUTER=controlm-dev] Executing Control-M pipeline...")
-            self._run_controlm_pipeline(event, router_name)
-            return
-
-        if router_name == "controlm":
-            logging.info("[ROUTER=controlm] Executing Control-M pipeline...")
-            self._run_controlm_pipeline(event, router_name)
+        if self.shedder is not None and self.shedder.should_shed(router_name, event.severity):
+            SHED.labels(router_name).inc()
             return
+        MESSAGES.labels(router_name).inc()
+
+        # ✅ Imprime lo que llega (LOG_SAMPLE / LOG_RATE_LIMIT "incoming" => 1 de N / máx. por segundo)
+        if log_allowed(CATEGORY_INCOMING):
+            summary = (
+                f"[INCOMING router={router_name} reason={reason}] "
+                f"src={event.source_ip}:{event.source_port} "
+                f"host={event.hostname or '-'} "
+                f"app={event.app_name or '-'} "
+                f"sev={event.severity if event.severity is not None else '-'} "
+                f"msg={event.message.strip()}"
+            )
+            if self.console_output:
+                print(summary, flush=True)
+            logging.info(summary)
+
+            if self.print_raw:
+                if self.console_output:
+                    print(f"[RAW] {event.raw}", flush=True)
+                logging.info("[RAW] %s", event.raw)
+
+        if self.archive is not None:
+            self.archive.add(event, router_name)
+
+        # Acciones por router: pipeline configurado, en la cola del router
+        self.pipelines.submit(router_name, event)
+
+    # -------------------------
+    # Stages de pipeline (ver RouterPipelines)
+    # -------------------------
+    def _stage_syslog_store(self, event: SyslogEvent, router_name: str) -> None:
+        """Insert en watchtower_logs.syslog_events."""
+        self.db_writer.insert_syslog_event(event, router_name)
 
-        # Router no reconocido (por ahora se trata como raw, pero queda auditado)
-        logging.warning(
-            "[ROUTER=%s] Not explicitly handled. Treating as raw for now.",
-            router_name
-        )
-
-    def _run_controlm_pipeline(self, event: SyslogEvent, router_name: str) -> None:
-        """
-        Pipeline Control-M:
-          - Insert raw log a watchtower_controlm.ControlM_Router_Logs
-          - Aplicar reglas Control-M
-          - Si alerta => escribir alerts_to_work.log + controlm_log_alerts.txt
-        """
-        # 1) Guardar log crudo en DB controlm
+    def _stage_controlm_store(self, event: SyslogEvent, router_name: str) -> None:
+        """Insert raw log a watchtower_controlm.ControlM_Router_Logs."""
+        logging.info("[ROUTER=%s] Executing Control-M pipeline...", router_name, extra={"category": CATEGORY_CONTROLM})
         self.db_writer.insert_controlm_router_log(event, router_name)
 
-        # 2) Reglas Control-M
+    def _stage_controlm_alert(self, event: SyslogEvent, router_name: str) -> None:
+        """Reglas Control-M. Si alerta => escribir alerts_to_work.log + controlm_log_alerts.txt"""
         alert = self.controlm.try_build_alert(
             event=event,
             router_name=router_name,
-            job_lookup=self.db_writer.lookup_controlm_job
+            job_lookup=self._lookup_job
         )
 
         if alert:
+            t0 = time.perf_counter()
             self.controlm.write_alert(alert)
+            ALERT_WRITE_SECONDS.observe(time.perf_counter() - t0)
             logging.info(
                 "[ControlM] ALERT generated alert_id=%s job=%s group=%s priority=%s",
                 alert.alert_id,
@@ -174,14 +438,115 @@ class ListenerService:
                 alert.incident_priority
             )
         else:
-            logging.info("[ControlM] No alert generated for this message (rules not met)")
+            logging.info(
+                "[ControlM] No alert generated for this message (rules not met)",
+                extra={"category": CATEGORY_CONTROLM},
+            )
+
+    def _lookup_job(self, job_name):
+        t0 = time.perf_counter()
+        try:
+            return self.controlm_jobs.lookup(job_name)
+        finally:
+            JOB_LOOKUP_SECONDS.observe(time.perf_counter() - t0)
+
+    def stats(self) -> dict:
+        stats = {
+            "listener": self.listener.stats(),
+            "ingest": self.ingest.stats(),
+            "routers": self.pipelines.stats(),
+            "db": self.db_writer.stats(),
+            "controlm_jobs": self.controlm_jobs.stats(),
+            "alerts": self.controlm.stats(),
+            "routes": {**self.routes_index.stats(), **self.routes_watcher.stats()},
+            "rate_limit": self.rate_limiter.stats(),
+            "parser": parser_stats(),
+            "logging": logging_stats(),
+        }
+        if self.tcp_listener is not None:
+            stats["tcp"] = self.tcp_listener.stats()
+        if self.archive is not None:
+            stats["archive"] = self.archive.stats()
+        if self.shedder is not None:
+            stats["shed"] = self.shedder.stats()
+        return stats
+
+    def _report_stats(self, final: bool = False) -> None:
+        stats = self.stats()
+        logging.info("[STATS]%s %s", " final" if final else "", stats)
+
+        # Shard: publica al supervisor para la vista agregada
+        if self.stats_queue is not None:
+            try:
+                self.stats_queue.put_nowait((self.shard_id, stats))
+            except Exception:
+                pass
+
+    def _stats_loop(self) -> None:
+        while not self._stats_stop.wait(self.stats_interval):
+            try:
+                self._report_stats()
+            except Exception:
+                logging.exception("Stats reporting failed")
+
+    def _start_stats_reporter(self) -> None:
+        if self.stats_interval <= 0:
+            return
+        self._stats_thread = threading.Thread(target=self._stats_loop, name="stats-reporter", daemon=True)
+        self._stats_thread.start()
+
+    def _start_tcp_listener(self) -> None:
+        if self.tcp_listener is None:
+            return
+        self._tcp_thread = threading.Thread(target=self.tcp_listener.start, name="tcp-listener", daemon=True)
+        self._tcp_thread.start()
+
+    def _stop_tcp_listener(self) -> None:
+        if self.tcp_listener is None:
+            return
+        self.tcp_listener.stop()
+        if self._tcp_thread is not None:
+            self._tcp_thread.join(timeout=5.0)
 
     def run_forever(self):
-        logging.info("ListenerService starting on %s:%s", self.host, self.port)
+        logging.info(
+            "ListenerService starting on %s:%s (engine=%s workers=%s queue_size=%s)",
+            self.host,
+            self.port,
+            self.engine,
+            self.ingest.workers,
+            self.ingest.maxsize,
+        )
+        self.controlm_jobs.start()
+        self.controlm.start()
+        self.routes_watcher.start()
+        if self.archive is not None:
+            self.archive.start()
+        self.pipelines.start(routers=[self.routes_index.default_router, *self.routes_index.router_configs])
+        self.ingest.start()
+        self._start_tcp_listener()
+        if self.metrics_server is not None:
+            self.metrics_server.start()
+        self._start_stats_reporter()
         try:
             self.listener.start()
         except KeyboardInterrupt:
             logging.info("ListenerService stopped by user (Ctrl+C)")
         finally:
             self.listener.stop()
+            self._stop_tcp_listener()
+            self.ingest.stop()
+            self.pipelines.stop()
+            if self.archive is not None:
+                self.archive.close()
+            self.db_writer.close()
+            self.controlm_jobs.stop()
+            self.routes_watcher.stop()
+            self.controlm.close()
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+            self._stats_stop.set()
+            self.rate_limiter.report()
+            self._report_stats(final=True)
             logging.info("ListenerService shutdown complete")
+            shutdown_logging()
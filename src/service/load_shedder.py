@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+
+# Niveles de sobrecarga
+LEVEL_NORMAL = 0
+LEVEL_SAMPLE = 1   # tráfico de baja prioridad: pasa 1 de cada sample_every
+LEVEL_SHED = 2     # tráfico de baja prioridad: se descarta todo
+LEVEL_NAMES = {LEVEL_NORMAL: "normal", LEVEL_SAMPLE: "sample", LEVEL_SHED: "shed"}
+
+
+class LoadShedder:
+    """
+    Modo sobrecarga con prioridad por router / severidad
+    - presión = backlog (fracción de la cola más llena: ingest o router) y latencia de cola
+      (EWMA de recibido -> inicio de procesamiento)
+    - backlog >= sample_backlog o latencia >= latency_sec          => sample
+    - backlog >= shed_backlog o latencia >= 2 * latency_sec         => shed
+    - histéresis: se baja un nivel solo tras recover_sec con backlog < recover_backlog
+      y latencia < latency_sec / 2 (no oscila en el borde del umbral)
+    - baja prioridad: routers en shed_routers (p.ej. el default "raw") o severidad >= min_severity
+      (6 = info, 7 = debug); los routers protegidos (Control-M / pipeline con controlm_alert) nunca
+      se descartan; protected y shed_routers se reasignan en cada hot reload de routes.json
+    - cuenta lo descartado por router y nivel; cambios de nivel al log
+    """
+
+    def __init__(
+        self,
+        backlog: Callable[[], float],
+        protected: Iterable[str] = (),
+        shed_routers: Iterable[str] = (),
+        min_severity: Optional[int] = 6,
+        sample_backlog: float = 0.5,
+        shed_backlog: float = 0.8,
+        recover_backlog: float = 0.2,
+        latency_sec: float = 2.0,
+        recover_sec: float = 5.0,
+        sample_every: int = 10,
+        check_sec: float = 0.25,
+        clock=time.monotonic,
+    ):
+        self.backlog = backlog
+        self.protected = frozenset(protected)
+        self.shed_routers = frozenset(shed_routers)
+        self.min_severity = min_severity
+        self.sample_backlog = sample_backlog
+        self.shed_backlog = shed_backlog
+        self.recover_backlog = recover_backlog
+        self.latency_sec = latency_sec
+        self.recover_sec = recover_sec
+        self.sample_every = max(1, sample_every)
+        self.check_sec = check_sec
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self.level = LEVEL_NORMAL
+        self._latency = 0.0
+        self._last_backlog = 0.0
+        self._next_check = 0.0
+        self._last_eval = clock()
+        self._calm_since: Optional[float] = None
+        self._seen = 0
+
+        self.shed: Dict[str, int] = {}
+        self.sampled_in = 0
+        self.transitions = 0
+        self.overload_sec = 0.0
+        self._level_since = clock()
+
+    # -------------------------
+    # Hot path
+    # -------------------------
+    def observe(self, queue_latency: float) -> None:
+        """Latencia de cola de un mensaje (s). EWMA sin lock: una carrera pierde una muestra, no importa."""
+        self._latency += (queue_latency - self._latency) * 0.05
+        now = self._clock()
+        if now >= self._next_check:
+            self._evaluate(now)
+
+    def is_low_priority(self, router_name: str, severity: Optional[int]) -> bool:
+        if router_name in self.protected:
+            return False
+        if router_name in self.shed_routers:
+            return True
+        return self.min_severity is not None and severity is not None and severity >= self.min_severity
+
+    def should_shed(self, router_name: str, severity: Optional[int]) -> bool:
+        """True => descartar el evento (y queda contado)."""
+        level = self.level
+        if level == LEVEL_NORMAL or not self.is_low_priority(router_name, severity):
+            return False
+        with self._lock:
+            if level == LEVEL_SAMPLE:
+                self._seen += 1
+                if self._seen % self.sample_every == 0:
+                    self.sampled_in += 1
+                    return False
+            key = f"{router_name}:{LEVEL_NAMES[level]}"
+            self.shed[key] = self.shed.get(key, 0) + 1
+        return True
+
+    # -------------------------
+    # Niveles
+    # -------------------------
+    def _evaluate(self, now: float) -> None:
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_sec
+            last_eval, self._last_eval = self._last_eval, now
+            try:
+                backlog = self.backlog()
+            except Exception:
+                logging.exception("Load shedder backlog check failed")
+                return
+            self._last_backlog = backlog
+            latency = self._latency
+
+            if backlog >= self.shed_backlog or latency >= 2 * self.latency_sec:
+                target = LEVEL_SHED
+            elif backlog >= self.sample_backlog or latency >= self.latency_sec:
+                target = LEVEL_SAMPLE
+            else:
+                target = LEVEL_NORMAL
+
+            previous = self.level
+            if target > previous:
+                # Subir es inmediato
+                self._calm_since = None
+                self._set_level(target, now, backlog, latency)
+            elif previous > LEVEL_NORMAL and backlog < self.recover_backlog and latency < self.latency_sec / 2:
+                # Bajar un nivel por cada recover_sec en calma
+                # Sin tráfico no se evalúa: la calma cuenta desde la evaluación anterior
+                if self._calm_since is None:
+                    self._calm_since = last_eval
+                if now - self._calm_since >= self.recover_sec:
+                    self._calm_since = now
+                    self._set_level(previous - 1, now, backlog, latency)
+            else:
+                self._calm_since = None
+
+    def _set_level(self, level: int, now: float, backlog: float, latency: float) -> None:
+        if self.level != LEVEL_NORMAL:
+            self.overload_sec += now - self._level_since
+        logging.warning(
+            "[SHED] %s -> %s (backlog=%.0f%% queue_latency=%.3fs shed_total=%s)",
+            LEVEL_NAMES[self.level],
+            LEVEL_NAMES[level],
+            backlog * 100,
+            latency,
+            sum(self.shed.values()),
+        )
+        self.level = level
+        self._level_since = now
+        self.transitions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            overload = self.overload_sec
+            if self.level != LEVEL_NORMAL:
+                overload += self._clock() - self._level_since
+            return {
+                "level": LEVEL_NAMES[self.level],
+                "backlog_pct": round(self._last_backlog * 100, 1),
+                "queue_latency_ms": round(self._latency * 1000, 2),
+                "shed": dict(self.shed),
+                "shed_total": sum(self.shed.values()),
+                "sampled_in": self.sampled_in,
+                "transitions": self.transitions,
+                "overload_sec": round(overload, 1),
+            }
@@ -0,0 +1,224 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from src.core.ingest_queue import IngestQueue
+from src.core.metrics import PIPELINE_SECONDS, STAGE_SECONDS
+
+
+# Stage: (event, router_name) -> None
+Stage = Callable[[object, str], None]
+
+# Pipelines por defecto (si el router no trae "pipeline" en routes.json)
+DEFAULT_PIPELINE: Tuple[str, ...] = ("syslog_store",)
+CONTROLM_PIPELINE: Tuple[str, ...] = ("syslog_store", "controlm_store", "controlm_alert")
+
+
+class RouterPipeline:
+    """
+    Ejecución aislada de un router
+    - cola acotada + workers propios (IngestQueue): si este router se atrasa
+      o se llena solo descarta lo suyo, no frena a los demás
+    - corre los stages en orden para cada evento
+    - stats: throughput, latencia (encolado -> fin) y tiempo por stage
+    """
+
+    def __init__(
+        self,
+        router_name: str,
+        stages: Tuple[str, ...],
+        registry: Dict[str, Stage],
+        maxsize: int = 10000,
+        workers: int = 2,
+    ):
+        self.router_name = router_name
+        self.stages = stages
+        self.registry = registry
+        self._latency_metric = PIPELINE_SECONDS.labels(router_name)
+        self.queue = IngestQueue(
+            handler=self._run,
+            maxsize=maxsize,
+            workers=workers,
+            name=f"router-{router_name}",
+        )
+
+        # Ventana de latencia desde la lectura anterior de stats()
+        self._lock = threading.Lock()
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._latency_n = 0
+        self._stage_sum: Dict[str, float] = {}
+
+    def start(self) -> None:
+        self.queue.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self.queue.stop(timeout=timeout)
+
+    def submit(self, event) -> bool:
+        return self.queue.submit((event, time.perf_counter()))
+
+    def _run(self, item) -> None:
+        event, enqueued_at = item
+        registry = self.registry
+        timings = []
+        try:
+            for stage in self.stages:
+                t0 = time.perf_counter()
+                registry[stage](event, self.router_name)
+                timings.append((stage, time.perf_counter() - t0))
+        finally:
+            latency = time.perf_counter() - enqueued_at
+            with self._lock:
+                self._latency_sum += latency
+                self._latency_n += 1
+                if latency > self._latency_max:
+                    self._latency_max = latency
+                for stage, elapsed in timings:
+                    self._stage_sum[stage] = self._stage_sum.get(stage, 0.0) + elapsed
+            self._latency_metric.observe(latency)
+            for stage, elapsed in timings:
+                STAGE_SECONDS.labels(self.router_name, stage).observe(elapsed)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            n = self._latency_n
+            latency_sum, latency_max, stage_sum = self._latency_sum, self._latency_max, self._stage_sum
+            self._latency_sum = 0.0
+            self._latency_max = 0.0
+            self._latency_n = 0
+            self._stage_sum = {}
+
+        out = self.queue.stats()
+        out["pipeline"] = list(self.stages)
+        out["window_processed"] = n
+        out["latency_avg_ms"] = round(latency_sum / n * 1000, 3) if n else 0.0
+        out["latency_max_ms"] = round(latency_max * 1000, 3)
+        out["stage_avg_ms"] = {k: round(v / n * 1000, 3) for k, v in stage_sum.items()} if n else {}
+        return out
+
+
+class RouterPipelines:
+    """
+    Registry router -> pipeline de stages
+    - stages: nombre -> callable, los registra el service (syslog_store, controlm_store, ...)
+    - configuración por router en routes.json: "pipeline", "queue_size", "workers";
+      sin "pipeline" se usa defaults[router] o DEFAULT_PIPELINE
+    - cada router tiene su RouterPipeline (se crea al primer mensaje)
+    - configure() con un RoutesIndex nuevo (hot reload) actualiza los stages;
+      queue_size/workers de un router ya creado se mantienen hasta reiniciar
+    """
+
+    def __init__(
+        self,
+        stages: Dict[str, Stage],
+        defaults: Optional[Dict[str, Tuple[str, ...]]] = None,
+        queue_size: int = 10000,
+        workers: int = 2,
+    ):
+        self.stages = dict(stages)
+        self.defaults = dict(defaults or {})
+        self.queue_size = queue_size
+        self.workers = workers
+
+        self._configs: Dict[str, dict] = {}
+        self._pipelines: Dict[str, RouterPipeline] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopped = False
+
+    def register_stage(self, name: str, stage: Stage) -> None:
+        self.stages[name] = stage
+
+    def _pipeline_for(self, router_name: str) -> Tuple[str, ...]:
+        cfg = self._configs.get(router_name) or {}
+        if cfg.get("pipeline"):
+            return tuple(cfg["pipeline"])
+        return self.defaults.get(router_name, DEFAULT_PIPELINE)
+
+    def validate(self, router_configs: Dict[str, dict]) -> None:
+        """ValueError si algún router usa un stage que no existe."""
+        for router_name, cfg in router_configs.items():
+            for stage in cfg.get("pipeline") or ():
+                if stage not in self.stages:
+                    raise ValueError(
+                        f"routes: unknown pipeline stage {stage!r} in router {router_name!r} "
+                        f"(known: {sorted(self.stages)})"
+                    )
+
+    def configure(self, router_configs: Dict[str, dict]) -> None:
+        self.validate(router_configs)
+        with self._lock:
+            self._configs = dict(router_configs)
+            for router_name, pipeline in self._pipelines.items():
+                stages = self._pipeline_for(router_name)
+                if stages != pipeline.stages:
+                    logging.info("[ROUTER=%s] Pipeline changed: %s -> %s", router_name, pipeline.stages, stages)
+                    pipeline.stages = stages
+
+    def _get(self, router_name: str) -> Optional[RouterPipeline]:
+        pipeline = self._pipelines.get(router_name)
+        if pipeline is not None:
+            return pipeline
+
+        with self._lock:
+            pipeline = self._pipelines.get(router_name)
+            if pipeline is not None or self._stopped:
+                return pipeline
+
+            cfg = self._configs.get(router_name) or {}
+            if not cfg.get("pipeline") and router_name not in self.defaults and router_name not in self._configs:
+                logging.warning(
+                    "[ROUTER=%s] Not explicitly handled. Treating as raw for now.",
+                    router_name
+                )
+
+            pipeline = RouterPipeline(
+                router_name,
+                self._pipeline_for(router_name),
+                self.stages,
+                maxsize=int(cfg.get("queue_size") or self.queue_size),
+                workers=int(cfg.get("workers") or self.workers),
+            )
+            if self._started:
+                pipeline.start()
+            self._pipelines[router_name] = pipeline
+            logging.info(
+                "[ROUTER=%s] Pipeline %s (queue_size=%s workers=%s)",
+                router_name,
+                list(pipeline.stages),
+                pipeline.queue.maxsize,
+                pipeline.queue.workers,
+            )
+            return pipeline
+
+    def submit(self, router_name: str, event) -> bool:
+        """Encola el evento en la cola del router. False si se descartó (cola llena / detenido)."""
+        pipeline = self._get(router_name)
+        if pipeline is None:
+            return False
+        return pipeline.submit(event)
+
+    def start(self, routers: Iterable[str] = ()) -> None:
+        """Arranca los pipelines existentes y crea de una vez los de `routers`."""
+        with self._lock:
+            self._started = True
+            for pipeline in self._pipelines.values():
+                pipeline.start()
+        for router_name in routers:
+            self._get(router_name)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            self._stopped = True
+            pipelines = list(self._pipelines.values())
+        for pipeline in pipelines:
+            pipeline.stop(timeout=timeout)
+
+    def queues(self) -> Dict[str, IngestQueue]:
+        """router -> cola (lectura sin resetear las ventanas de stats())."""
+        return {name: p.queue for name, p in list(self._pipelines.items())}
+
+    def stats(self) -> Dict[str, object]:
+        return {name: p.stats() for name, p in sorted(self._pipelines.items())}
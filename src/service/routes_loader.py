@@ -1,7 +1,9 @@
 import json
-from dataclasses import dataclass
+import socket
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 def _norm_hostname(hostname: Optional[str]) -> Optional[str]:
@@ -14,33 +16,228 @@ def _norm_hostname(hostname: Optional[str]) -> Optional[str]:
     return h or None
 
 
+def _ip_to_int(ip: str) -> Optional[Tuple[int, int]]:
+    """"10.1.59.21" -> (4, int); "fe80::1" -> (6, int); None si no es IP."""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+    except OSError:
+        pass
+    try:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), "big")
+    except OSError:
+        return None
+
+
+_IP_BITS = {4: 32, 6: 128}
+
+
+def _parse_bucket(value, where: str) -> Tuple[float, float]:
+    """{"rate": msgs/s, "burst": n} -> (rate, burst). burst por defecto = rate (1 s de ráfaga)."""
+    if not isinstance(value, dict):
+        raise ValueError(f"routes: {where} must be an object with rate/burst")
+    rate = value.get("rate")
+    burst = value.get("burst", rate)
+    for key, num in (("rate", rate), ("burst", burst)):
+        if not isinstance(num, (int, float)) or isinstance(num, bool) or num <= 0:
+            raise ValueError(f"routes: {where}.{key} must be a positive number")
+    if burst < 1:
+        raise ValueError(f"routes: {where}.burst must be >= 1")
+    return float(rate), float(burst)
+
+
+class PrefixTable:
+    """
+    Longest-prefix match IPv4/IPv6: un dict {red: router} por longitud de prefijo.
+    Lookup = a lo más un dict lookup por longitud configurada (no por regla),
+    de la más específica a la menos.
+    """
+
+    def __init__(self):
+        self._tables: Dict[int, Dict[int, Dict[int, str]]] = {4: {}, 6: {}}
+        self._lengths: Dict[int, List[int]] = {4: [], 6: []}
+        self.rules = 0
+
+    def add(self, cidr: str, router: str) -> None:
+        addr, _, plen = cidr.strip().partition("/")
+        parsed = _ip_to_int(addr.strip())
+        if parsed is None:
+            raise ValueError(f"Invalid CIDR {cidr!r}")
+        family, value = parsed
+        bits = _IP_BITS[family]
+        prefix_len = int(plen) if plen else bits
+        if not 0 <= prefix_len <= bits:
+            raise ValueError(f"Invalid prefix length in {cidr!r}")
+
+        shift = bits - prefix_len
+        by_len = self._tables[family].setdefault(prefix_len, {})
+        by_len[value >> shift] = router
+        self._lengths[family] = sorted(self._tables[family], reverse=True)
+        self.rules += 1
+
+    def lookup(self, ip: str) -> Optional[str]:
+        parsed = _ip_to_int(ip)
+        if parsed is None:
+            return None
+        family, value = parsed
+        bits = _IP_BITS[family]
+        tables = self._tables[family]
+        for prefix_len in self._lengths[family]:
+            router = tables[prefix_len].get(value >> (bits - prefix_len))
+            if router is not None:
+                return router
+        return None
+
+
 @dataclass(frozen=True)
 class RoutesIndex:
     version: int
     default_router: str
     ip_to_router: Dict[str, str]
     host_to_router: Dict[str, str]
+    # "10.1.59.0/24" (en ip_addresses) y "*.kcscp.corp" (en hostnames)
+    cidr_table: PrefixTable = field(default_factory=PrefixTable)
+    host_suffix_to_router: Dict[str, str] = field(default_factory=dict)
+    # Config de ejecución por router: {"pipeline": [...], "queue_size": n, "workers": n,
+    # "rate_limit": (rate, burst), "per_source_limit": (rate, burst)}
+    router_configs: Dict[str, dict] = field(default_factory=dict)
+    # Token buckets de ingest: {"per_source": (rate, burst) | None, "max_sources": n} (ver RateLimiter)
+    rate_limit: Dict[str, object] = field(default_factory=dict)
+    cache_size: int = 4096
+    _cached_resolve: Optional[Callable[[str, Optional[str]], Tuple[str, str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
+    def __post_init__(self):
+        # LRU acotado de (source_ip, hostname) -> (router, reason); se descarta con el índice
+        cached = lru_cache(maxsize=self.cache_size)(self._resolve_uncached) if self.cache_size > 0 else None
+        object.__setattr__(self, "_cached_resolve", cached)
 
-def load_routes(routes_path: str) -> RoutesIndex:
-    path = Path(routes_path)
-    data = json.loads(path.read_text(encoding="utf-8"))
+    def _resolve_uncached(self, source_ip: str, hostname: Optional[str]) -> Tuple[str, str]:
+        if source_ip in self.ip_to_router:
+            return self.ip_to_router[source_ip], "ip"
+
+        router = self.cidr_table.lookup(source_ip)
+        if router is not None:
+            return router, "cidr"
+
+        nh = _norm_hostname(hostname)
+        if nh:
+            if nh in self.host_to_router:
+                return self.host_to_router[nh], "hostname"
+
+            # "*.kcscp.corp" matchea subdominios; el sufijo más largo gana
+            suffixes = self.host_suffix_to_router
+            if suffixes:
+                dot = nh.find(".")
+                while dot >= 0:
+                    router = suffixes.get(nh[dot + 1:])
+                    if router is not None:
+                        return router, "hostname_wildcard"
+                    dot = nh.find(".", dot + 1)
+
+        return self.default_router, "default"
+
+    def resolve(self, source_ip: str, hostname: Optional[str]) -> Tuple[str, str]:
+        if self._cached_resolve is None:
+            return self._resolve_uncached(source_ip, hostname)
+        return self._cached_resolve(source_ip, hostname)
+
+    def stats(self) -> dict:
+        out = {
+            "version": self.version,
+            "ips": len(self.ip_to_router),
+            "cidrs": self.cidr_table.rules,
+            "hostnames": len(self.host_to_router),
+            "hostname_wildcards": len(self.host_suffix_to_router),
+        }
+        if self._cached_resolve is not None:
+            info = self._cached_resolve.cache_info()
+            out.update(cache_hits=info.hits, cache_misses=info.misses, cache_size=info.currsize)
+        return out
+
+
+def parse_routes(data: dict, cache_size: int = 4096) -> RoutesIndex:
+    """
+    dict (routes.json ya decodificado) -> RoutesIndex.
+    Valida la estructura: ValueError si algo no cuadra (el índice en uso no se toca).
+    """
+    if not isinstance(data, dict):
+        raise ValueError("routes: top-level must be an object")
 
     version = int(data.get("version", 1))
     default_router = data.get("default_router", "raw")
+    if not isinstance(default_router, str) or not default_router.strip():
+        raise ValueError("routes: default_router must be a non-empty string")
+
+    routers = data.get("routers", [])
+    if not isinstance(routers, list):
+        raise ValueError("routes: routers must be a list")
+
+    rate_limit: Dict[str, object] = {}
+    global_limit = data.get("rate_limit")
+    if global_limit is not None:
+        if not isinstance(global_limit, dict):
+            raise ValueError("routes: rate_limit must be an object")
+        if global_limit.get("per_source") is not None:
+            rate_limit["per_source"] = _parse_bucket(global_limit["per_source"], "rate_limit.per_source")
+        max_sources = global_limit.get("max_sources")
+        if max_sources is not None:
+            if not isinstance(max_sources, int) or isinstance(max_sources, bool) or max_sources < 1:
+                raise ValueError("routes: rate_limit.max_sources must be a positive integer")
+            rate_limit["max_sources"] = max_sources
 
     ip_to_router: Dict[str, str] = {}
     host_to_router: Dict[str, str] = {}
+    cidr_table = PrefixTable()
+    host_suffix_to_router: Dict[str, str] = {}
+    router_configs: Dict[str, dict] = {}
+
+    for r in routers:
+        if not isinstance(r, dict):
+            raise ValueError("routes: each router must be an object")
+        name = r.get("name")
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError(f"routes: router without name ({r!r})")
 
-    for r in data.get("routers", []):
-        name = r["name"]
+        cfg: Dict[str, object] = {}
+        pipeline = r.get("pipeline")
+        if pipeline is not None:
+            if not isinstance(pipeline, list) or not all(isinstance(st, str) and st for st in pipeline):
+                raise ValueError(f"routes: pipeline of router {name!r} must be a list of stage names")
+            cfg["pipeline"] = list(pipeline)
+        for key in ("queue_size", "workers"):
+            if r.get(key) is not None:
+                value = r[key]
+                if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+                    raise ValueError(f"routes: {key} of router {name!r} must be a positive integer")
+                cfg[key] = value
+        # "rate_limit": {"rate": n, "burst": n, "per_source": {"rate": n, "burst": n}}
+        limit = r.get("rate_limit")
+        if limit is not None:
+            if not isinstance(limit, dict):
+                raise ValueError(f"routes: rate_limit of router {name!r} must be an object")
+            if limit.get("rate") is not None:
+                cfg["rate_limit"] = _parse_bucket(limit, f"rate_limit of router {name!r}")
+            if limit.get("per_source") is not None:
+                cfg["per_source_limit"] = _parse_bucket(limit["per_source"], f"rate_limit.per_source of router {name!r}")
+        router_configs[name] = cfg
 
         for ip in r.get("ip_addresses", []) or []:
-            ip_to_router[str(ip).strip()] = name
+            ip = str(ip).strip()
+            if "/" in ip:
+                cidr_table.add(ip, name)
+            elif _ip_to_int(ip) is None:
+                raise ValueError(f"routes: invalid IP {ip!r} in router {name!r}")
+            else:
+                ip_to_router[ip] = name
 
         for hn in r.get("hostnames", []) or []:
             nh = _norm_hostname(str(hn))
-            if nh:
+            if not nh:
+                continue
+            if nh.startswith("*."):
+                host_suffix_to_router[nh[2:]] = name
+            else:
                 host_to_router[nh] = name
 
     return RoutesIndex(
@@ -48,19 +245,24 @@ def load_routes(routes_path: str) -> RoutesIndex:
         default_router=default_router,
         ip_to_router=ip_to_router,
         host_to_router=host_to_router,
+        cidr_table=cidr_table,
+        host_suffix_to_router=host_suffix_to_router,
+        router_configs=router_configs,
+        rate_limit=rate_limit,
+        cache_size=cache_size,
     )
 
 
+def load_routes(routes_path: str, cache_size: int = 4096) -> RoutesIndex:
+    path = Path(routes_path)
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return parse_routes(data, cache_size=cache_size)
+
+
 def resolve_router(index: RoutesIndex, source_ip: str, hostname: Optional[str]) -> Tuple[str, str]:
     """
     Regresa (router_name, match_reason)
-    match_reason: ip | hostname | default
+    match_reason: ip | cidr | hostname | hostname_wildcard | default
+    Orden: IP exacta > CIDR (prefijo más largo) > hostname exacto > *.sufijo (más largo) > default
     """
-    if source_ip in index.ip_to_router:
-        return index.ip_to_router[source_ip], "ip"
-
-    nh = _norm_hostname(hostname)
-    if nh and nh in index.host_to_router:
-        return index.host_to_router[nh], "hostname"
-
-    return index.default_router, "default"
+    return index.resolve(source_ip, hostname)
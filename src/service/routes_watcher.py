@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from src.service.routes_loader import RoutesIndex, parse_routes
+
+
+class RoutesWatcher:
+    """
+    Hot reload de routes.json
+    - poll de (mtime, size) en background; si cambió, lee y calcula sha256
+    - contenido nuevo => parse_routes + validate (opcional) fuera del hot path y on_swap(index)
+    - archivo inválido => se rechaza, se loguea y el índice en uso no se toca
+      (se reintenta cuando el archivo vuelva a cambiar)
+    - versión, sha256 y hora de carga quedan en el log y en stats() (auditoría)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_swap: Callable[[RoutesIndex], None],
+        poll_sec: float = 5.0,
+        cache_size: int = 4096,
+        validate: Optional[Callable[[RoutesIndex], None]] = None,
+    ):
+        self.path = path
+        self.on_swap = on_swap
+        self.validate = validate
+        self.poll_sec = poll_sec
+        self.cache_size = cache_size
+
+        self._signature: Optional[Tuple[int, int]] = None
+        self._sha256: Optional[str] = None
+        self._version: Optional[int] = None
+        self._loaded_at: Optional[float] = None
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error: Optional[str] = None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> Tuple[Tuple[int, int], bytes, str]:
+        signature = self._stat()
+        with open(self.path, "rb") as f:
+            content = f.read()
+        return signature, content, hashlib.sha256(content).hexdigest()
+
+    def _parse(self, content: bytes) -> RoutesIndex:
+        index = parse_routes(json.loads(content.decode("utf-8-sig")), cache_size=self.cache_size)
+        if self.validate is not None:
+            # Validación extra del consumidor (p.ej. stages de pipeline conocidos)
+            self.validate(index)
+        return index
+
+    def _accept(self, signature, sha: str, index: RoutesIndex) -> None:
+        self._signature = signature
+        self._sha256 = sha
+        self._version = index.version
+        self._loaded_at = time.time()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def load(self) -> RoutesIndex:
+        """Carga inicial (síncrona): un archivo inválido aquí sí es error de arranque."""
+        signature, content, sha = self._read()
+        index = self._parse(content)
+        self._accept(signature, sha, index)
+        logging.info(
+            "Routes loaded: version=%s default_router=%s sha256=%s routes_path=%s",
+            index.version,
+            index.default_router,
+            sha[:12],
+            self.path,
+        )
+        return index
+
+    def start(self) -> None:
+        if self.poll_sec <= 0:
+            return
+        self._thread = threading.Thread(target=self._watch_loop, name="routes-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _watch_loop(self) -> None:
+        while not self._stop_event.wait(self.poll_sec):
+            try:
+                self.check()
+            except Exception:
+                logging.exception("Routes watcher failed")
+
+    # -------------------------
+    # Reload
+    # -------------------------
+    def check(self) -> bool:
+        """True si se cargó un índice nuevo."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+
+        t0 = time.perf_counter()
+        try:
+            signature, content, sha = self._read()
+        except OSError as exc:
+            logging.warning("Routes reload skipped: cannot read %s (%s)", self.path, exc)
+            return False
+
+        if sha == self._sha256:
+            # touch / mismo contenido
+            self._signature = signature
+            return False
+
+        try:
+            index = self._parse(content)
+        except Exception as exc:
+            self._signature = signature
+            self.reload_errors += 1
+            self.last_error = f"{type(exc).__name__}: {exc}"
+            logging.error(
+                "Routes reload rejected (sha256=%s): %s. Keeping version=%s sha256=%s",
+                sha[:12],
+                self.last_error,
+                self._version,
+                (self._sha256 or "")[:12],
+            )
+            return False
+
+        self.on_swap(index)
+        self._accept(signature, sha, index)
+        self.reloads += 1
+        self.last_error = None
+        logging.info(
+            "Routes reloaded: version=%s sha256=%s default_router=%s (%.1f ms)",
+            index.version,
+            sha[:12],
+            index.default_router,
+            (time.perf_counter() - t0) * 1000,
+        )
+        return True
+
+    def stats(self) -> dict:
+        loaded_at = None
+        if self._loaded_at is not None:
+            loaded_at = datetime.fromtimestamp(self._loaded_at, timezone.utc).isoformat(timespec="seconds")
+        return {
+            "version": self._version,
+            "sha256": (self._sha256 or "")[:12] or None,
+            "loaded_at_utc": loaded_at,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "last_error": self.last_error,
+        }
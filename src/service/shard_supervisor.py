@@ -0,0 +1,238 @@
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.logs.log_setup import setup_logging
+
+
+def merge_stats(items: List[dict]) -> dict:
+    """
+    Agrega los stats de varios shards como si fueran un solo servicio:
+    - contadores => suma
+    - *utilisation / *avg* => promedio
+    - *max* / last_* / version => máximo
+    - no numéricos => primer valor
+    """
+    merged: dict = {}
+    keys: List[str] = []
+    for item in items:
+        for k in item:
+            if k not in merged:
+                merged[k] = None
+                keys.append(k)
+
+    for k in keys:
+        values = [item[k] for item in items if k in item and item[k] is not None]
+        if not values:
+            merged[k] = None
+        elif all(isinstance(v, dict) for v in values):
+            merged[k] = merge_stats(values)
+        elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            if "utilisation" in k or "avg" in k:
+                merged[k] = round(sum(values) / len(values), 4)
+            elif "max" in k or k.startswith("last_") or k == "version":
+                merged[k] = max(values)
+            else:
+                total = sum(values)
+                merged[k] = round(total, 4) if isinstance(total, float) else total
+        else:
+            merged[k] = values[0]
+    return merged
+
+
+def _run_shard(host: str, port: int, shard_id: int, stats_queue) -> None:
+    # Import tardío: cada shard construye su propio ListenerService (DB writer, pools, caches)
+    from src.service.listener_service import ListenerService
+
+    # SIGTERM del supervisor / SIGHUP de la terminal => mismo shutdown ordenado que Ctrl+C (flush de batches)
+    def _on_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _on_sigterm)
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, _on_sigterm)
+
+    service = ListenerService(host=host, port=port, shard_id=shard_id, stats_queue=stats_queue)
+    service.run_forever()
+
+
+class ShardSupervisor:
+    """
+    Listener multi-proceso (Linux)
+    - arranca N procesos ListenerService que bindean el mismo puerto UDP con SO_REUSEPORT
+      (el kernel reparte los datagrams entre ellos; cada uno usa su propio core)
+    - cada shard tiene su propio DB writer / pools
+    - agrega los stats de los shards para verlos como un solo servicio
+    - reinicia shards que mueran, con backoff exponencial por shard (restart_backoff_sec,
+      duplicando hasta restart_backoff_max_sec); se resetea si el shard duró stable_sec
+    - SIGTERM / SIGHUP / Ctrl+C => stop(): termina y espera a los shards (no quedan huérfanos)
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        processes: int,
+        stats_interval: float = 60.0,
+        restart_backoff_sec: float = 1.0,
+        restart_backoff_max_sec: float = 60.0,
+        stable_sec: float = 300.0,
+    ):
+        if processes < 2:
+            raise ValueError("ShardSupervisor needs processes >= 2")
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT not supported on this platform")
+
+        setup_logging(process_tag=True)
+
+        self.host = host
+        self.port = port
+        self.processes = processes
+        self.stats_interval = stats_interval
+        self.restart_backoff_sec = restart_backoff_sec
+        self.restart_backoff_max_sec = restart_backoff_max_sec
+        self.stable_sec = stable_sec
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stats_queue = self._ctx.Queue(maxsize=processes * 16)
+        self._shards: Dict[int, multiprocessing.Process] = {}
+        self._latest: Dict[int, dict] = {}
+        self._restarts = 0
+        self._stop_event = threading.Event()
+        self._started_at: Dict[int, float] = {}
+        self._crashes: Dict[int, int] = {}        # caídas seguidas (backoff)
+        self._respawn_at: Dict[int, float] = {}   # shards caídos esperando su backoff
+
+    def _spawn(self, shard_id: int) -> None:
+        proc = self._ctx.Process(
+            target=_run_shard,
+            args=(self.host, self.port, shard_id, self._stats_queue),
+            name=f"shard-{shard_id}",
+            daemon=False,
+        )
+        proc.start()
+        self._shards[shard_id] = proc
+        self._started_at[shard_id] = time.monotonic()
+        logging.info("[SHARD] started shard-%s pid=%s", shard_id, proc.pid)
+
+    def _drain_stats(self, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                shard_id, stats = self._stats_queue.get(timeout=remaining)
+            except queue.Empty:
+                return
+            self._latest[shard_id] = stats
+
+    def stats(self) -> dict:
+        fleet = merge_stats([self._latest[k] for k in sorted(self._latest)])
+        fleet["shards"] = {
+            "configured": self.processes,
+            "alive": sum(1 for p in self._shards.values() if p.is_alive()),
+            "reporting": len(self._latest),
+            "restarts": self._restarts,
+            "waiting_restart": len(self._respawn_at),
+        }
+        return fleet
+
+    def _check_shards(self) -> None:
+        now = time.monotonic()
+        for shard_id, proc in list(self._shards.items()):
+            if proc.is_alive() or self._stop_event.is_set():
+                continue
+
+            due = self._respawn_at.get(shard_id)
+            if due is None:
+                # Recién caído: si venía estable el backoff arranca de nuevo
+                if now - self._started_at.get(shard_id, now) >= self.stable_sec:
+                    self._crashes[shard_id] = 0
+                crashes = self._crashes[shard_id] = self._crashes.get(shard_id, 0) + 1
+                delay = min(self.restart_backoff_max_sec, self.restart_backoff_sec * 2 ** (crashes - 1))
+                self._respawn_at[shard_id] = now + delay
+                logging.error(
+                    "[SHARD] shard-%s exited with code %s. Restarting in %.0fs (crash #%s in a row)",
+                    shard_id,
+                    proc.exitcode,
+                    delay,
+                    crashes,
+                )
+                continue
+
+            if now >= due:
+                del self._respawn_at[shard_id]
+                self._restarts += 1
+                self._spawn(shard_id)
+
+    def _on_signal(self, signum, frame) -> None:
+        # SIGTERM (service manager / kill) o SIGHUP => mismo camino que Ctrl+C: stop() en el finally.
+        # Durante stop() se ignora (no cortar el join de los shards a la mitad).
+        if self._stop_event.is_set():
+            return
+        logging.info("ShardSupervisor received signal %s", signum)
+        raise KeyboardInterrupt
+
+    def run_forever(self) -> None:
+        logging.info(
+            "ShardSupervisor starting %s shards on %s:%s (SO_REUSEPORT)",
+            self.processes,
+            self.host,
+            self.port,
+        )
+        signal.signal(signal.SIGTERM, self._on_signal)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self._on_signal)
+
+        for shard_id in range(self.processes):
+            self._spawn(shard_id)
+
+        next_report = time.monotonic() + self.stats_interval
+        try:
+            while True:
+                self._drain_stats(timeout=1.0)
+                self._check_shards()
+                if self.stats_interval > 0 and time.monotonic() >= next_report:
+                    logging.info("[STATS] fleet %s", self.stats())
+                    next_report = time.monotonic() + self.stats_interval
+        except KeyboardInterrupt:
+            logging.info("ShardSupervisor stopping (Ctrl+C / SIGTERM / SIGHUP)")
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 15.0) -> None:
+        self._stop_event.set()
+        for proc in self._shards.values():
+            if proc.is_alive():
+                proc.terminate()
+
+        deadline = time.monotonic() + timeout
+        for proc in self._shards.values():
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                proc.kill()
+
+        self._drain_stats(timeout=0.5)
+        logging.info("[STATS] fleet final %s", self.stats())
+        logging.info("ShardSupervisor shutdown complete")
+
+
+def sharding_requested() -> Optional[int]:
+    """N de LISTENER_PROCESSES si aplica sharding en esta plataforma, si no None."""
+    processes = int(os.getenv("LISTENER_PROCESSES", "1"))
+    if processes <= 1:
+        return None
+    if not hasattr(socket, "SO_REUSEPORT"):
+        logging.warning(
+            "LISTENER_PROCESSES=%s ignored: SO_REUSEPORT not available on this platform. Running single process.",
+            processes,
+        )
+        return None
+    return processes
@@ -0,0 +1,346 @@
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+# Campos que produce cada parser (mismo orden que syslog_parser._parse_fields):
+# (pri, facility, severity, timestamp, timestamp_raw, hostname, app_name, pid, message, msg_id, structured_data)
+Fields = Tuple[Any, ...]
+
+FORMAT_RFC3164 = "rfc3164"
+FORMAT_RFC5424 = "rfc5424"
+FORMAT_JSON = "json"
+FORMAT_CEF = "cef"
+FORMAT_UNKNOWN = "unknown"
+
+
+def detect_format(msg: str) -> str:
+    """
+    Formato por los primeros caracteres (sin regex):
+      "<PRI>1 "       -> RFC 5424
+      "{"             -> JSON
+      "CEF:" / "<PRI>CEF:" -> CEF
+      "<PRI>..."      -> RFC 3164 (formato original)
+      otro            -> unknown (ningún parser aplica)
+    """
+    if not msg:
+        return FORMAT_UNKNOWN
+
+    first = msg[0]
+    if first == "<":
+        end = msg.find(">", 1, 5)
+        if end < 0:
+            return FORMAT_UNKNOWN
+        if msg.startswith("1 ", end + 1):
+            return FORMAT_RFC5424
+        if msg.startswith("CEF:", end + 1):
+            return FORMAT_CEF
+        return FORMAT_RFC3164
+    if first == "{":
+        return FORMAT_JSON
+    if first == "C" and msg.startswith("CEF:"):
+        return FORMAT_CEF
+    return FORMAT_UNKNOWN
+
+
+# Anchos de columna de syslog_events / ControlM_Router_Logs (queries/general_db.sql, controlm.sql):
+# un valor más largo haría fallar el insert (el batch lo descarta como error de datos)
+HOSTNAME_MAX = 255
+APP_NAME_MAX = 128
+TS_RAW_MAX = 64
+PID_MAX = 2**31 - 1  # INT
+
+
+def _nil(value: str) -> Optional[str]:
+    return None if value == "-" else value
+
+
+def clip_column(value: Optional[str], width: int) -> Optional[str]:
+    return value[:width] if value is not None and len(value) > width else value
+
+
+def parse_pid(value: Any) -> Optional[int]:
+    """procid numérico dentro de INT; cualquier otra cosa -> None."""
+    if isinstance(value, str) and value.isdigit() and len(value) <= 10:
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= PID_MAX:
+        return value
+    return None
+
+
+def _iso_timestamp(value: str) -> Optional[datetime]:
+    """Timestamp RFC 3339 -> datetime UTC (None si no parsea)."""
+    try:
+        if value.endswith(("Z", "z")):
+            value = value[:-1] + "+00:00"
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+# -------------------------------------------------
+# RFC 5424
+# -------------------------------------------------
+
+RFC5424_RE = re.compile(
+    r"^<(?P<pri>\d{1,3})>1 "
+    r"(?P<ts>\S+) (?P<host>\S+) (?P<app>\S+) (?P<procid>\S+) (?P<msgid>\S+)"
+    r"(?: (?P<rest>.*))?$",
+    re.DOTALL,
+)
+
+
+def _split_structured_data(rest: str) -> Tuple[Optional[str], str]:
+    """'[id k="v"][id2 ...] msg' -> (sd, msg). Respeta \\] y \\" dentro de los valores."""
+    if rest.startswith("-"):
+        return None, rest[2:] if rest.startswith("- ") else rest[1:]
+    if not rest.startswith("["):
+        # SD inválido: se deja todo como mensaje
+        return None, rest
+
+    i = 0
+    n = len(rest)
+    while i < n and rest[i] == "[":
+        in_quotes = False
+        i += 1
+        while i < n:
+            c = rest[i]
+            if in_quotes:
+                if c == "\\":
+                    i += 1
+                elif c == '"':
+                    in_quotes = False
+            elif c == '"':
+                in_quotes = True
+            elif c == "]":
+                break
+            i += 1
+        i += 1  # "]"
+
+    sd = rest[:i]
+    msg = rest[i + 1:] if rest.startswith(" ", i) else rest[i:]
+    return sd, msg
+
+
+def parse_rfc5424(msg: str) -> Optional[Fields]:
+    m = RFC5424_RE.match(msg)
+    if not m:
+        return None
+
+    pri = int(m.group("pri"))
+    ts_raw = _nil(m.group("ts"))
+    sd, text = _split_structured_data(m.group("rest") or "")
+    if text.startswith("\ufeff"):
+        text = text[1:]
+
+    return (
+        pri,
+        pri // 8,
+        pri % 8,
+        _iso_timestamp(ts_raw) if ts_raw else None,
+        clip_column(ts_raw, TS_RAW_MAX),
+        clip_column(_nil(m.group("host")), HOSTNAME_MAX),
+        clip_column(_nil(m.group("app")), APP_NAME_MAX),
+        parse_pid(m.group("procid")),
+        text,
+        _nil(m.group("msgid")),
+        sd,
+    )
+
+
+# -------------------------------------------------
+# JSON (una línea por evento)
+# -------------------------------------------------
+
+_JSON_KEYS: Dict[str, Tuple[str, ...]] = {
+    "timestamp": ("timestamp", "@timestamp", "time", "ts"),
+    "hostname": ("hostname", "host", "host_name"),
+    "app_name": ("app_name", "appname", "app", "program", "ident"),
+    "pid": ("pid", "procid"),
+    "message": ("message", "msg"),
+    "msg_id": ("msgid", "msg_id"),
+    "pri": ("pri",),
+    "facility": ("facility",),
+    "severity": ("severity", "level"),
+}
+
+_SEVERITY_NAMES = {
+    "emerg": 0, "emergency": 0, "panic": 0,
+    "alert": 1,
+    "crit": 2, "critical": 2, "fatal": 2,
+    "err": 3, "error": 3,
+    "warn": 4, "warning": 4,
+    "notice": 5,
+    "info": 6, "informational": 6,
+    "debug": 7, "trace": 7,
+}
+
+
+def _pop_first(obj: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    value = None
+    for k in keys:
+        if k in obj:
+            v = obj.pop(k)
+            if value is None:
+                value = v
+    return value
+
+
+def _small_int(value: Any, upper: int) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if 0 <= value <= upper else None
+    if isinstance(value, str):
+        if value.isdigit():
+            return _small_int(int(value), upper)
+        return _SEVERITY_NAMES.get(value.lower()) if upper == 7 else None
+    return None
+
+
+def parse_json(msg: str) -> Optional[Fields]:
+    try:
+        obj = json.loads(msg)
+    except ValueError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+
+    ts_value = _pop_first(obj, _JSON_KEYS["timestamp"])
+    hostname = _pop_first(obj, _JSON_KEYS["hostname"])
+    app_name = _pop_first(obj, _JSON_KEYS["app_name"])
+    pid = parse_pid(_pop_first(obj, _JSON_KEYS["pid"]))
+    text = _pop_first(obj, _JSON_KEYS["message"])
+    msg_id = _pop_first(obj, _JSON_KEYS["msg_id"])
+    pri = _small_int(_pop_first(obj, _JSON_KEYS["pri"]), 191)
+    facility = _small_int(_pop_first(obj, _JSON_KEYS["facility"]), 23)
+    severity = _small_int(_pop_first(obj, _JSON_KEYS["severity"]), 7)
+
+    if pri is not None:
+        facility, severity = pri // 8, pri % 8
+    elif facility is not None and severity is not None:
+        pri = facility * 8 + severity
+
+    ts = None
+    ts_raw = None
+    if isinstance(ts_value, str):
+        ts_raw = ts_value
+        ts = _iso_timestamp(ts_value)
+    elif isinstance(ts_value, (int, float)) and not isinstance(ts_value, bool):
+        ts_raw = str(ts_value)
+        # epoch en segundos o milisegundos
+        seconds = ts_value / 1000.0 if ts_value > 1e11 else float(ts_value)
+        try:
+            ts = datetime.fromtimestamp(seconds, timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            ts = None
+
+    # Lo que no se mapeó a un campo se conserva como structured_data
+    extra = json.dumps(obj, ensure_ascii=False, separators=(",", ":")) if obj else None
+
+    return (
+        pri,
+        facility,
+        severity,
+        ts,
+        clip_column(ts_raw, TS_RAW_MAX),
+        clip_column(hostname, HOSTNAME_MAX) if isinstance(hostname, str) else None,
+        clip_column(app_name, APP_NAME_MAX) if isinstance(app_name, str) else None,
+        pid,
+        text if isinstance(text, str) else ("" if text is None else json.dumps(text, ensure_ascii=False)),
+        msg_id if isinstance(msg_id, str) else None,
+        extra,
+    )
+
+
+# -------------------------------------------------
+# CEF (ArcSight): CEF:Version|Vendor|Product|DeviceVersion|SignatureID|Name|Severity|Extension
+# -------------------------------------------------
+
+_CEF_SEVERITY_WORDS = {"low": 6, "medium": 4, "high": 3, "very-high": 2, "very high": 2}
+
+
+def _split_cef_header(body: str) -> Optional[list]:
+    """Separa los 7 campos del header por "|" sin escapar (\\| y \\\\ son escapes)."""
+    parts = []
+    buf = []
+    i = 0
+    n = len(body)
+    while i < n and len(parts) < 7:
+        c = body[i]
+        if c == "\\" and i + 1 < n and body[i + 1] in "|\\":
+            buf.append(body[i + 1])
+            i += 2
+            continue
+        if c == "|":
+            parts.append("".join(buf))
+            buf = []
+        else:
+            buf.append(c)
+        i += 1
+    if len(parts) < 7:
+        return None
+    parts.append(body[i:])  # extension
+    return parts
+
+
+def _cef_severity(value: str) -> Optional[int]:
+    """CEF 0-10 / Low..Very-High -> severidad syslog (0-3 info, 4-6 warning, 7-8 err, 9-10 crit)."""
+    value = value.strip()
+    if value.isdigit():
+        level = int(value)
+        if level <= 3:
+            return 6
+        if level <= 6:
+            return 4
+        if level <= 8:
+            return 3
+        return 2
+    return _CEF_SEVERITY_WORDS.get(value.lower())
+
+
+_CEF_HOST_RE = re.compile(r"(?:^|\s)(?:dvchost|shost)=(?P<host>\S+)")
+
+
+def parse_cef(msg: str) -> Optional[Fields]:
+    pri = None
+    body = msg
+    if msg.startswith("<"):
+        end = msg.find(">", 1, 5)
+        if end < 0 or not msg[1:end].isdigit():
+            return None
+        pri = int(msg[1:end])
+        body = msg[end + 1:]
+
+    if not body.startswith("CEF:"):
+        return None
+    parts = _split_cef_header(body[4:])
+    if parts is None:
+        return None
+
+    _version, vendor, product, _dev_version, signature_id, name, cef_sev, extension = parts
+
+    if pri is not None:
+        facility, severity = pri // 8, pri % 8
+    else:
+        facility, severity = None, _cef_severity(cef_sev)
+
+    host_m = _CEF_HOST_RE.search(extension)
+
+    return (
+        pri,
+        facility,
+        severity,
+        None,
+        None,
+        clip_column(host_m.group("host"), HOSTNAME_MAX) if host_m else None,
+        clip_column(product or vendor or None, APP_NAME_MAX),
+        None,
+        name,
+        signature_id or None,
+        body,
+    )
@@ -1,6 +1,24 @@
 import re
+import time
 from datetime import datetime, timezone
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.domain.models import AnySyslogEvent, CompactSyslogEvent, SyslogEvent
+from src.service.syslog_formats import (
+    APP_NAME_MAX,
+    FORMAT_CEF,
+    FORMAT_JSON,
+    FORMAT_RFC3164,
+    FORMAT_RFC5424,
+    FORMAT_UNKNOWN,
+    HOSTNAME_MAX,
+    clip_column,
+    detect_format,
+    parse_cef,
+    parse_json,
+    parse_pid,
+    parse_rfc5424,
+)
 
 
 RFC3164_RE = re.compile(
@@ -14,6 +32,24 @@ RFC3164_RE = re.compile(
 
 TAG_PID_RE = re.compile(r"^(?P<app>[A-Za-z0-9_.\-/]+)(?:\[(?P<pid>\d+)\])?$")
 
+# Versión bytes de RFC3164_RE/TAG_PID_RE para datagrams ASCII (CompactSyslogEvent).
+# \s de un patrón str también incluye \x1c-\x1f: se explicita para que sea idéntico.
+_WS = rb" \t\n\r\f\v\x1c-\x1f"
+RFC3164_BYTES_RE = re.compile(
+    rb"<(?P<pri>\d{1,3})>"
+    rb"(?P<ts>[A-Z][a-z]{2}[" + _WS + rb"]+\d{1,2}[" + _WS + rb"]+\d{2}:\d{2}:\d{2})[" + _WS + rb"]+"
+    rb"(?P<host>[^" + _WS + rb"]+)[" + _WS + rb"]+"
+    rb"(?P<tag>[^" + _WS + rb":]+)"
+    rb"(?::[" + _WS + rb"]*)?"
+    rb"(?P<msg>.*)$"
+)
+TAG_PID_BYTES_RE = re.compile(rb"(?P<app>[A-Za-z0-9_.\-/]+)(?:\[(?P<pid>\d+)\])?$")
+_WS_BYTES = frozenset(b" \t\n\r\f\v\x1c\x1d\x1e\x1f")
+
+# Tamaño máximo de los caches de timestamps y strings internados (se vacían al llenarse)
+TS_CACHE_MAX = 4096
+INTERN_MAX = 8192
+
 
 def pri_to_fac_sev(pri: int) -> Tuple[int, int]:
     return pri // 8, pri % 8
@@ -29,33 +65,117 @@ def parse_rfc3164_timestamp(ts: str) -> Optional[datetime]:
         return None
 
 
-def parse_syslog_rsyslog(message: str) -> dict:
+class _TimestampCache:
+    """
+    Memo de parse_rfc3164_timestamp por string "Mmm dd hh:mm:ss".
+    Miles de mensajes comparten el mismo segundo; el año (que no viene en
+    RFC 3164) se toma del reloj, así que el cache se vacía al cambiar de año.
+    """
+
+    def __init__(self, max_entries: int = TS_CACHE_MAX):
+        self.max_entries = max_entries
+        self._cache: Dict[str, Optional[datetime]] = {}
+        self._valid_until = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _roll_year(self, now: float) -> None:
+        year = datetime.fromtimestamp(now, timezone.utc).year
+        self._cache = {}
+        self._valid_until = datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()
+
+    def get(self, ts: str) -> Optional[datetime]:
+        now = time.time()
+        if now >= self._valid_until:
+            self._roll_year(now)
+
+        cache = self._cache
+        try:
+            value = cache[ts]
+            self.hits += 1
+            return value
+        except KeyError:
+            pass
+
+        self.misses += 1
+        value = parse_rfc3164_timestamp(ts)
+        if len(cache) >= self.max_entries:
+            cache.clear()
+        cache[ts] = value
+        return value
+
+
+class _StringInterner:
+    """Comparte una sola instancia por hostname/app_name/source_ip repetido (acotado)."""
+
+    def __init__(self, max_entries: int = INTERN_MAX):
+        self.max_entries = max_entries
+        self._strings: Dict[str, str] = {}
+
+    def __call__(self, s: Optional[str]) -> Optional[str]:
+        if s is None:
+            return None
+        strings = self._strings
+        cached = strings.get(s)
+        if cached is not None:
+            return cached
+        if len(strings) >= self.max_entries:
+            strings.clear()
+        strings[s] = s
+        return s
+
+
+_ts_cache = _TimestampCache()
+_intern = _StringInterner()
+
+
+_FORMAT_PARSERS = {
+    FORMAT_RFC5424: parse_rfc5424,
+    FORMAT_JSON: parse_json,
+    FORMAT_CEF: parse_cef,
+}
+
+_format_counts: Dict[str, int] = {}
+
+
+def _parse_fields(message: str, parse_ts=parse_rfc3164_timestamp, intern=lambda s: s) -> tuple:
+    """
+    (pri, facility, severity, timestamp, timestamp_raw, hostname, app_name, pid, message, msg_id, structured_data)
+    Núcleo común de parse_syslog_rsyslog y parse_event.
+    El parser se elige por los primeros caracteres (detect_format); si el
+    parser del formato no puede con el mensaje se trata como sin header.
+    """
     msg_in = message.strip()
 
+    fmt = detect_format(msg_in)
+    _format_counts[fmt] = _format_counts.get(fmt, 0) + 1
+
+    if fmt == FORMAT_RFC3164:
+        fields = _parse_rfc3164(msg_in, parse_ts, intern)
+    elif fmt in _FORMAT_PARSERS:
+        fields = _FORMAT_PARSERS[fmt](msg_in)
+        if fields is not None:
+            pri, facility, severity, ts, ts_raw, hostname, app_name, pid, msg, msg_id, sd = fields
+            # timestamp_raw no se interna: en estos formatos casi siempre es único
+            fields = pri, facility, severity, ts, ts_raw, intern(hostname), intern(app_name), pid, msg, msg_id, sd
+    else:
+        fields = None
+
+    if fields is None:
+        return None, None, None, None, None, None, None, None, msg_in, None, None
+    return fields
+
+
+def _parse_rfc3164(msg_in: str, parse_ts, intern) -> Optional[tuple]:
     m = RFC3164_RE.match(msg_in)
     if not m:
-        return {
-            "pri": None,
-            "facility": None,
-            "severity": None,
-            "timestamp": None,
-            "timestamp_raw": None,
-            "hostname": None,
-            "app_name": None,
-            "pid": None,
-            "message": msg_in,
-            "raw": message,
-        }
+        return None
 
     pri = int(m.group("pri"))
     facility, severity = pri_to_fac_sev(pri)
 
-    ts_raw = m.group("ts")
-    ts = parse_rfc3164_timestamp(ts_raw)
-
-    hostname = m.group("host")
-    tag = m.group("tag")
-    msg = m.group("msg")
+    ts_raw, hostname, tag, msg = m.group("ts", "host", "tag", "msg")
+    ts = parse_ts(ts_raw)
 
     app_name = None
     pid = None
@@ -64,14 +184,20 @@ def parse_syslog_rsyslog(message: str) -> dict:
     if tag_m:
         app_name = tag_m.group("app")
         if tag_m.group("pid"):
-            pid = int(tag_m.group("pid"))
+            pid = parse_pid(tag_m.group("pid"))
     else:
         app_name = tag
 
     # Limpia ":" por si llega como "controlm_test:" (depende del template)
     if app_name:
-        app_name = app_name.rstrip(":")
+        app_name = clip_column(app_name.rstrip(":"), APP_NAME_MAX)
+    hostname = clip_column(hostname, HOSTNAME_MAX)
+
+    return pri, facility, severity, ts, intern(ts_raw), intern(hostname), intern(app_name), pid, msg, None, None
 
+
+def parse_syslog_rsyslog(message: str) -> dict:
+    pri, facility, severity, ts, ts_raw, hostname, app_name, pid, msg, msg_id, sd = _parse_fields(message)
     return {
         "pri": pri,
         "facility": facility,
@@ -83,4 +209,115 @@ def parse_syslog_rsyslog(message: str) -> dict:
         "pid": pid,
         "message": msg,
         "raw": message,
+        "msg_id": msg_id,
+        "structured_data": sd,
+    }
+
+
+def _compact_event(packet) -> Optional[CompactSyslogEvent]:
+    """
+    RFC 3164 / sin header sobre los bytes del datagram, sin decodificar.
+    None si no aplica (no ASCII u otro formato): se usa el camino normal.
+    """
+    raw = packet.raw
+    if not raw.isascii():
+        return None
+
+    # strip() sin copiar: solo los límites
+    start, end = 0, len(raw)
+    while start < end and raw[start] in _WS_BYTES:
+        start += 1
+    while end > start and raw[end - 1] in _WS_BYTES:
+        end -= 1
+
+    if start < end and raw[start] == 0x3C:  # "<"
+        m = RFC3164_BYTES_RE.match(raw, start, end)
+        if m is None:
+            # "<PRI>1 " (5424), "<PRI>CEF:" ... o 3164 inválido: camino normal
+            return None
+    elif raw.startswith(b"{", start) or raw.startswith(b"CEF:", start):
+        return None
+    else:
+        return CompactSyslogEvent(
+            packet.received_ts, _intern(packet.source_ip), packet.source_port, raw, (-1, -1, -1, -1, start, end)
+        )
+
+    pri = int(m.group("pri"))
+    ts_raw = _intern(m.group("ts").decode("ascii"))
+
+    app_s, app_e = m.span("tag")
+    pid = None
+    tag_m = TAG_PID_BYTES_RE.match(raw, app_s, app_e)
+    if tag_m:
+        app_e = tag_m.end("app")
+        if tag_m.group("pid"):
+            pid = parse_pid(tag_m.group("pid").decode("ascii"))
+    # Anchos de columna (ver syslog_formats)
+    app_e = min(app_e, app_s + APP_NAME_MAX)
+
+    host_s, host_e = m.span("host")
+    host_e = min(host_e, host_s + HOSTNAME_MAX)
+    msg_s, msg_e = m.span("msg")
+    return CompactSyslogEvent(
+        packet.received_ts,
+        _intern(packet.source_ip),
+        packet.source_port,
+        raw,
+        (host_s, host_e, app_s, app_e, msg_s, msg_e),
+        pri=pri,
+        timestamp=_ts_cache.get(ts_raw),
+        timestamp_raw=ts_raw,
+        pid=pid,
+    )
+
+
+def parse_event(packet) -> AnySyslogEvent:
+    """
+    SyslogPacket -> evento directo (sin dict intermedio).
+    Mismo resultado que parse_syslog_rsyslog + SyslogEvent(...), pero con
+    timestamps memoizados y hostname/app_name/source_ip internados.
+    Datagrams ASCII RFC 3164 (o sin header) => CompactSyslogEvent sobre los
+    bytes originales; el resto => SyslogEvent.
+    """
+    compact = _compact_event(packet)
+    if compact is not None:
+        fmt = FORMAT_RFC3164 if compact.pri is not None else FORMAT_UNKNOWN
+        _format_counts[fmt] = _format_counts.get(fmt, 0) + 1
+        return compact
+
+    message = packet.message
+    pri, facility, severity, ts, ts_raw, hostname, app_name, pid, msg, msg_id, sd = _parse_fields(
+        message, _ts_cache.get, _intern
+    )
+    return SyslogEvent(
+        received_at_utc=packet.received_at_utc,
+        source_ip=_intern(packet.source_ip),
+        source_port=packet.source_port,
+        pri=pri,
+        facility=facility,
+        severity=severity,
+        timestamp=ts,
+        timestamp_raw=ts_raw,
+        hostname=hostname,
+        app_name=app_name,
+        pid=pid,
+        message=msg,
+        raw=message,
+        msg_id=msg_id,
+        structured_data=sd,
+    )
+
+
+def parse_many(packets: Iterable) -> List[AnySyslogEvent]:
+    """Batch de SyslogPacket -> lista de SyslogEvent (ver parse_event)."""
+    return [parse_event(p) for p in packets]
+
+
+def parser_stats() -> dict:
+    return {
+        "ts_cache_hits": _ts_cache.hits,
+        "ts_cache_misses": _ts_cache.misses,
+        "ts_cache_size": len(_ts_cache._cache),
+        "interned": len(_intern._strings),
+        "formats": dict(_format_counts),
     }
@@ -0,0 +1,307 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.domain.models import SyslogEvent
+from src.storage.disk_spool import DiskSpool, SpoolRecord
+from src.storage.mssql_writer import MSSQLWriter, is_connection_error
+
+
+class _Batch:
+    """Buffer de filas para una tabla."""
+
+    def __init__(
+        self,
+        key: str,
+        name: str,
+        insert_many: Callable[[Sequence[tuple]], None],
+    ):
+        self.key = key
+        self.name = name
+        self.insert_many = insert_many
+
+        self.lock = threading.Lock()
+        self.rows: List[tuple] = []
+        self.first_at: Optional[float] = None
+
+        self.rows_written = 0
+        self.rows_failed = 0
+        self.batches = 0
+        self.batch_failures = 0
+        self.rows_spooled = 0
+
+    def take(self) -> List[tuple]:
+        """Saca todas las filas pendientes (llamar con lock tomado)."""
+        rows = self.rows
+        self.rows = []
+        self.first_at = None
+        return rows
+
+
+class BatchingWriter:
+    """
+    Wrapper sobre MSSQLWriter que agrupa inserts
+    - flush por cantidad (batch_size) o antigüedad (max_age_sec), lo que ocurra primero
+    - executemany con fast_executemany, una transacción por batch
+    - si un batch falla se reintenta fila por fila para aislar la fila mala
+    - close() garantiza el flush de lo pendiente (shutdown)
+    - con spool (DiskSpool): si la DB no está disponible las filas van a disco en vez
+      de perderse; mientras haya backlog en disco todo se encola ahí (orden) y un
+      thread replayer lo drena en bulk cuando la DB regresa
+    Expone la misma interfaz que MSSQLWriter para ListenerService.
+    """
+
+    def __init__(
+        self,
+        writer: MSSQLWriter,
+        batch_size: int = 500,
+        max_age_sec: float = 1.0,
+        spool: Optional[DiskSpool] = None,
+        replay_sec: float = 2.0,
+        replay_batch_size: int = 5000,
+    ):
+        self.writer = writer
+        self.batch_size = max(1, batch_size)
+        self.max_age_sec = max_age_sec
+        self.spool = spool
+        self.replay_sec = replay_sec
+        self.replay_batch_size = max(1, replay_batch_size)
+
+        self._batches: Dict[str, _Batch] = {
+            "syslog_events": _Batch("syslog_events", "watchtower_logs.syslog_events", writer.insert_syslog_events),
+            "controlm_router_logs": _Batch(
+                "controlm_router_logs",
+                "watchtower_controlm.ControlM_Router_Logs",
+                writer.insert_controlm_router_logs,
+            ),
+        }
+
+        # Replay: contadores y ventana para la tasa (filas/s desde la lectura anterior de stats)
+        self.rows_replayed = 0
+        self.replay_failures = 0
+        self._replay_lock = threading.Lock()
+        self._replay_window_rows = 0
+        self._replay_window_at = time.monotonic()
+
+        self._stop_event = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, name="db-batch-flusher", daemon=True)
+        self._flusher.start()
+
+        self._replayer = None
+        if self.spool is not None:
+            self._replayer = threading.Thread(target=self._replay_loop, name="db-spool-replayer", daemon=True)
+            self._replayer.start()
+
+    # -------------------------
+    # Interfaz MSSQLWriter
+    # -------------------------
+    def insert_syslog_event(self, event: SyslogEvent, router_name: str) -> None:
+        self._add("syslog_events", MSSQLWriter.syslog_event_row(event, router_name))
+
+    def insert_controlm_router_log(self, event: SyslogEvent, router_name: str) -> None:
+        self._add("controlm_router_logs", MSSQLWriter.controlm_router_log_row(event, router_name))
+
+    def lookup_controlm_job(self, job_name: Optional[str]) -> Dict[str, Optional[object]]:
+        return self.writer.lookup_controlm_job(job_name)
+
+    # -------------------------
+    # Batching
+    # -------------------------
+    def _add(self, key: str, row: tuple) -> None:
+        batch = self._batches[key]
+        rows = None
+        with batch.lock:
+            if batch.first_at is None:
+                batch.first_at = time.monotonic()
+            batch.rows.append(row)
+            if len(batch.rows) >= self.batch_size:
+                rows = batch.take()
+
+        # El flush por tamaño corre en el thread que llena el batch (backpressure natural)
+        if rows:
+            self._write(batch, rows)
+
+    def _flush_loop(self) -> None:
+        interval = min(0.25, max(0.01, self.max_age_sec / 4))
+        while not self._stop_event.wait(interval):
+            now = time.monotonic()
+            for batch in self._batches.values():
+                rows = None
+                with batch.lock:
+                    if batch.first_at is not None and now - batch.first_at >= self.max_age_sec:
+                        rows = batch.take()
+                if rows:
+                    self._write(batch, rows)
+
+    def _write(self, batch: _Batch, rows: List[tuple]) -> None:
+        if self.spool is not None and self.spool.pending():
+            # Backlog en disco: no se toca la DB (la prueba el replayer) y se conserva el orden
+            self._spool(batch, rows)
+            return
+
+        written, failed, unsent = self._insert(batch, rows)
+        if unsent:
+            if self.spool is not None:
+                self._spool(batch, unsent)
+            else:
+                failed += len(unsent)
+        with batch.lock:
+            batch.batches += 1
+            batch.rows_written += written
+            batch.rows_failed += failed
+            if failed:
+                batch.batch_failures += 1
+
+    def _spool(self, batch: _Batch, rows: List[tuple]) -> None:
+        accepted = self.spool.append(batch.key, rows)
+        with batch.lock:
+            batch.rows_spooled += accepted
+            batch.rows_failed += len(rows) - accepted
+
+    def _insert(self, batch: _Batch, rows: List[tuple]) -> Tuple[int, int, List[tuple]]:
+        """
+        Regresa (filas escritas, filas descartadas, filas sin enviar).
+        Sin enviar = la DB no está disponible (error de conexión): se pueden reintentar.
+        """
+        try:
+            batch.insert_many(rows)
+            return len(rows), 0, []
+        except Exception as exc:
+            if is_connection_error(exc):
+                if self.spool is not None:
+                    logging.warning("DB unavailable (%s) rows=%s: %s. Spooling to disk.", batch.name, len(rows), exc)
+                else:
+                    logging.exception("DB batch insert failed (%s) rows=%s", batch.name, len(rows))
+                return 0, 0, rows
+            if len(rows) == 1:
+                logging.exception("DB insert failed (%s) row dropped", batch.name)
+                return 0, 1, []
+            logging.warning(
+                "DB batch insert failed (%s) rows=%s: %s. Retrying row by row.",
+                batch.name,
+                len(rows),
+                exc,
+            )
+
+        # Aislar filas malas: una transacción por fila
+        written = 0
+        dropped = 0
+        for i, row in enumerate(rows):
+            try:
+                batch.insert_many([row])
+                written += 1
+            except Exception as exc:
+                if is_connection_error(exc):
+                    logging.warning("DB lost while isolating batch (%s): %s", batch.name, exc)
+                    return written, dropped, rows[i:]
+                logging.exception("DB insert failed (%s) row dropped", batch.name)
+                dropped += 1
+        return written, dropped, []
+
+    # -------------------------
+    # Replay del spool
+    # -------------------------
+    def _replay_loop(self) -> None:
+        while not self._stop_event.wait(self.replay_sec):
+            if not self.spool.pending():
+                continue
+            try:
+                self._replay()
+            except Exception:
+                logging.exception("Spool replay failed")
+
+    def _replay(self) -> None:
+        """Drena el spool en bulk; se detiene al primer error de conexión (se reintenta en replay_sec)."""
+        t0 = time.monotonic()
+        replayed = 0
+        try:
+            while not self._stop_event.is_set():
+                records = self.spool.read(self.replay_batch_size)
+                if not records or not self._replay_records(records):
+                    return
+                replayed += len(records)
+        finally:
+            if replayed:
+                logging.info(
+                    "Spool replay: %s rows in %.1fs, depth=%s",
+                    replayed,
+                    time.monotonic() - t0,
+                    self.spool.pending(),
+                )
+
+    def _replay_records(self, records: List[SpoolRecord]) -> bool:
+        """False si la DB sigue sin estar disponible."""
+        # Tramos consecutivos de la misma tabla, en orden de seq; ack por tramo
+        i = 0
+        while i < len(records):
+            key = records[i][1]
+            j = i
+            while j < len(records) and records[j][1] == key:
+                j += 1
+            run = records[i:j]
+
+            batch = self._batches.get(key)
+            if batch is None:
+                logging.error("Spool: unknown table %r, dropping %s rows", key, len(run))
+                self.spool.ack(run[-1][0])
+                i = j
+                continue
+
+            written, dropped, unsent = self._insert(batch, [row for _seq, _key, row in run])
+            done = len(run) - len(unsent)
+            if done:
+                self.spool.ack(run[done - 1][0])
+            with batch.lock:
+                batch.rows_written += written
+                batch.rows_failed += dropped
+            with self._replay_lock:
+                self.rows_replayed += written
+                self._replay_window_rows += written
+            if unsent:
+                self.replay_failures += 1
+                return False
+            i = j
+        return True
+
+    def flush(self) -> None:
+        for batch in self._batches.values():
+            with batch.lock:
+                rows = batch.take()
+            if rows:
+                self._write(batch, rows)
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._flusher.join(timeout=5)
+        if self._replayer is not None:
+            self._replayer.join(timeout=5)
+        # DB caída en el shutdown => lo pendiente queda en el spool para el siguiente arranque
+        self.flush()
+        if self.spool is not None:
+            self.spool.close()
+        self.writer.close()
+
+    def stats(self) -> Dict[str, object]:
+        out: Dict[str, object] = dict(self.writer.stats())
+        for key, batch in self._batches.items():
+            out[key] = {
+                "pending": len(batch.rows),
+                "rows_written": batch.rows_written,
+                "rows_failed": batch.rows_failed,
+                "batches": batch.batches,
+                "batch_failures": batch.batch_failures,
+                "rows_spooled": batch.rows_spooled,
+            }
+        if self.spool is not None:
+            with self._replay_lock:
+                now = time.monotonic()
+                elapsed = now - self._replay_window_at
+                window_rows, self._replay_window_rows = self._replay_window_rows, 0
+                self._replay_window_at = now
+            spool = self.spool.stats()
+            spool["replayed"] = self.rows_replayed
+            spool["replay_failures"] = self.replay_failures
+            spool["replay_rate"] = round(window_rows / elapsed, 1) if elapsed > 0 else 0.0
+            out["spool"] = spool
+        return out
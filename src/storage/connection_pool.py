@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Tuple
+
+
+def _ping(conn: Any) -> None:
+    cur = conn.cursor()
+    cur.execute("SELECT 1")
+    cur.fetchone()
+    cur.close()
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones thread-safe (una instancia por DB)
+    - reutiliza conexiones (LIFO) en vez de connect por llamada
+    - liveness check (SELECT 1) si la conexión estuvo ociosa > ping_after_sec
+    - descarta conexiones rotas y reconecta en el siguiente acquire
+    - cierra conexiones ociosas más viejas que max_idle_sec
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[], Any],
+        size: int = 4,
+        max_idle_sec: float = 300.0,
+        ping_after_sec: float = 30.0,
+        acquire_timeout: float = 10.0,
+        is_broken: Callable[[BaseException], bool] = lambda exc: False,
+        ping: Callable[[Any], None] = _ping,
+    ):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+
+        self.name = name
+        self.size = size
+        self.max_idle_sec = max_idle_sec
+        self.ping_after_sec = ping_after_sec
+        self.acquire_timeout = acquire_timeout
+
+        self._connect = connect
+        self._is_broken = is_broken
+        self._ping = ping
+
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # (conn, last_used_monotonic); izquierda = más vieja
+        self._idle: Deque[Tuple[Any, float]] = deque()
+
+        self._hits = 0
+        self._misses = 0
+        self._discarded = 0
+        self._acquires = 0
+        self._in_use = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException as exc:
+            self._release(conn, broken=self._is_broken(exc) or not self._rollback(conn))
+            raise
+        else:
+            self._release(conn, broken=False)
+
+    def _acquire(self) -> Any:
+        t0 = time.monotonic()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise PoolTimeout(f"Pool {self.name}: no connection available after {self.acquire_timeout}s")
+        waited = time.monotonic() - t0
+
+        with self._lock:
+            self._acquires += 1
+            self._in_use += 1
+            self._wait_total += waited
+            if waited > self._wait_max:
+                self._wait_max = waited
+
+        try:
+            conn = self._checkout_idle()
+            if conn is not None:
+                with self._lock:
+                    self._hits += 1
+                return conn
+
+            conn = self._connect()
+            with self._lock:
+                self._misses += 1
+            return conn
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+            raise
+
+    def _checkout_idle(self) -> Any:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, last_used = self._idle.pop()
+
+            idle_for = time.monotonic() - last_used
+            if idle_for > self.max_idle_sec:
+                self._discard(conn)
+                continue
+
+            if idle_for > self.ping_after_sec:
+                try:
+                    self._ping(conn)
+                except Exception:
+                    logging.warning("[pool %s] Stale connection discarded (ping failed)", self.name)
+                    self._discard(conn)
+                    continue
+
+            return conn
+
+    def _rollback(self, conn: Any) -> bool:
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _release(self, conn: Any, broken: bool) -> None:
+        try:
+            if broken:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+                self._reap()
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def _reap(self) -> None:
+        """Cierra las conexiones ociosas más viejas que max_idle_sec."""
+        cutoff = time.monotonic() - self.max_idle_sec
+        stale = []
+        with self._lock:
+            while self._idle and self._idle[0][1] < cutoff:
+                stale.append(self._idle.popleft()[0])
+        for conn in stale:
+            self._discard(conn)
+
+    def _discard(self, conn: Any) -> None:
+        with self._lock:
+            self._discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [c for c, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            acquires = self._acquires
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "hits": self._hits,
+                "misses": self._misses,
+                "discarded": self._discarded,
+                "wait_avg_ms": round(self._wait_total / acquires * 1000, 3) if acquires else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
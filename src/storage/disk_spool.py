@@ -0,0 +1,298 @@
+import logging
+import os
+import pickle
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+
+# Registro: [len payload][crc32 payload][seq] + pickle((table, row))
+_HEADER = struct.Struct(">IIQ")
+_CHECKPOINT = "checkpoint"
+_SUFFIX = ".seg"
+
+# (seq, table, row)
+SpoolRecord = Tuple[int, str, tuple]
+
+
+class _Segment:
+    __slots__ = ("path", "first_seq", "last_seq", "count", "size", "sealed")
+
+    def __init__(self, path: Path, first_seq: int, sealed: bool):
+        self.path = path
+        self.first_seq = first_seq
+        self.last_seq = first_seq - 1
+        self.count = 0
+        self.size = 0
+        self.sealed = sealed
+
+
+class DiskSpool:
+    """
+    Spool write-ahead en disco para filas que no se pudieron insertar (DB caída / lenta)
+    - segmentos append-only (00000000000000000001.seg, ...), escritura buffered;
+      se rota al llegar a segment_bytes
+    - cada fila lleva un seq creciente; checkpoint = último seq ya insertado en la DB,
+      así un replay (o un reinicio a medio replay) no vuelve a insertar lo confirmado
+    - disco acotado: si se pasa de max_bytes se borra el segmento más viejo (drop contado)
+    - read()/ack() para el replayer (un solo lector): un segmento sellado y
+      confirmado completo se borra
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 1024 * 1024 * 1024,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync: bool = False,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        # Al menos 2 segmentos caben en max_bytes (si no, nunca habría uno sellado para descartar)
+        self.segment_bytes = max(64 * 1024, min(segment_bytes, max_bytes // 2))
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._segments: List[_Segment] = []
+        self._active_file = None
+        self._checkpoint = 0
+        self._next_seq = 1
+
+        # Cursor de lectura confirmado: (segmento, offset) justo después del último seq con ack
+        self._cursor_offset = 0
+        # seq -> offset de fin de registro de la última lectura (para ack)
+        self._read_offsets: Dict[int, int] = {}
+
+        self.appended = 0
+        self.acked = 0
+        self.dropped = 0
+        self.rejected = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._recover()
+
+    # -------------------------
+    # Recovery
+    # -------------------------
+    def _read_checkpoint(self) -> int:
+        try:
+            return int((self.directory / _CHECKPOINT).read_text(encoding="ascii").strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_checkpoint(self) -> None:
+        tmp = self.directory / (_CHECKPOINT + ".tmp")
+        tmp.write_text(str(self._checkpoint), encoding="ascii")
+        os.replace(tmp, self.directory / _CHECKPOINT)
+
+    @staticmethod
+    def _scan(path: Path):
+        """Itera (seq, end_offset, payload) y al final valid_size (cola cortada por crash => se ignora)."""
+        with open(path, "rb") as f:
+            data = f.read()
+        offset = 0
+        n = len(data)
+        while offset + _HEADER.size <= n:
+            length, crc, seq = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            end = start + length
+            if end > n or zlib.crc32(data[start:end]) != crc:
+                break
+            yield seq, end, data[start:end]
+            offset = end
+        yield None, offset, None
+
+    def _recover(self) -> None:
+        self._checkpoint = self._read_checkpoint()
+        for path in sorted(self.directory.glob("*" + _SUFFIX)):
+            seg = _Segment(path, first_seq=0, sealed=True)
+            for seq, end, _payload in self._scan(path):
+                if seq is None:
+                    if end < path.stat().st_size:
+                        logging.warning("Spool segment %s truncated at %s (torn write)", path.name, end)
+                        with open(path, "r+b") as f:
+                            f.truncate(end)
+                    seg.size = end
+                    break
+                if seg.count == 0:
+                    seg.first_seq = seq
+                seg.last_seq = seq
+                seg.count += 1
+
+            if seg.count == 0 or seg.last_seq <= self._checkpoint:
+                # Vacío o ya replicado completo
+                path.unlink()
+                continue
+            self._segments.append(seg)
+
+        last_seq = self._segments[-1].last_seq if self._segments else 0
+        self._next_seq = max(last_seq, self._checkpoint) + 1
+        if self._segments:
+            logging.info(
+                "Spool recovered: %s pending rows in %s segments (%s)",
+                self._pending(),
+                len(self._segments),
+                self.directory,
+            )
+
+    # -------------------------
+    # Append (writers)
+    # -------------------------
+    def _pending(self) -> int:
+        return self._next_seq - 1 - self._checkpoint
+
+    def pending(self) -> int:
+        """Filas en el spool aún no confirmadas (profundidad)."""
+        return self._pending()
+
+    def _total_bytes(self) -> int:
+        return sum(seg.size for seg in self._segments)
+
+    def _seal_active(self) -> None:
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+        if self._segments:
+            self._segments[-1].sealed = True
+
+    def _drop_oldest(self) -> bool:
+        for seg in self._segments:
+            if seg.sealed:
+                break
+        else:
+            return False
+
+        self._segments.remove(seg)
+        seg.path.unlink(missing_ok=True)
+        lost = seg.last_seq - max(self._checkpoint, seg.first_seq - 1)
+        if lost > 0:
+            self.dropped += lost
+            logging.error("Spool full (max_bytes=%s): dropped %s rows (%s)", self.max_bytes, lost, seg.path.name)
+        if seg.last_seq > self._checkpoint:
+            self._checkpoint = seg.last_seq
+            self._write_checkpoint()
+        # El cursor apuntaba a este segmento (es el más viejo): empieza en el siguiente
+        self._cursor_offset = 0
+        self._read_offsets = {}
+        return True
+
+    def append(self, table: str, rows: Sequence[tuple]) -> int:
+        """Escribe las filas al spool. Regresa cuántas se aceptaron."""
+        if not rows:
+            return 0
+
+        with self._lock:
+            chunks = []
+            for row in rows:
+                payload = pickle.dumps((table, row), protocol=pickle.HIGHEST_PROTOCOL)
+                chunks.append((payload, zlib.crc32(payload)))
+            size = sum(_HEADER.size + len(p) for p, _ in chunks)
+
+            while self._total_bytes() + size > self.max_bytes:
+                if not self._drop_oldest():
+                    if self._segments and not self._segments[-1].sealed:
+                        # Solo queda el activo: se sella para poder descartarlo en la siguiente vuelta
+                        self._seal_active()
+                        continue
+                    self.rejected += len(rows)
+                    return 0
+
+            active = self._segments[-1] if self._segments and not self._segments[-1].sealed else None
+            if active is None or active.size >= self.segment_bytes:
+                self._seal_active()
+                path = self.directory / f"{self._next_seq:020d}{_SUFFIX}"
+                active = _Segment(path, first_seq=self._next_seq, sealed=False)
+                self._segments.append(active)
+                self._active_file = open(path, "ab")
+
+            out = []
+            for payload, crc in chunks:
+                out.append(_HEADER.pack(len(payload), crc, self._next_seq))
+                out.append(payload)
+                active.last_seq = self._next_seq
+                active.count += 1
+                self._next_seq += 1
+            self._active_file.write(b"".join(out))
+            self._active_file.flush()
+            if self.fsync:
+                os.fsync(self._active_file.fileno())
+            active.size += size
+            self.appended += len(rows)
+            return len(rows)
+
+    # -------------------------
+    # Replay (un solo lector)
+    # -------------------------
+    def read(self, max_rows: int) -> List[SpoolRecord]:
+        """
+        Siguientes filas sin ack, en orden de seq (a lo más max_rows).
+        Sin ack se vuelven a entregar en la siguiente llamada.
+        """
+        with self._lock:
+            while self._segments:
+                seg = self._segments[0]
+                records: List[SpoolRecord] = []
+                self._read_offsets = {}
+                with open(seg.path, "rb") as f:
+                    f.seek(self._cursor_offset)
+                    data = f.read()
+
+                base = self._cursor_offset
+                offset = 0
+                while offset + _HEADER.size <= len(data) and len(records) < max_rows:
+                    length, crc, seq = _HEADER.unpack_from(data, offset)
+                    start = offset + _HEADER.size
+                    end = start + length
+                    if end > len(data) or zlib.crc32(data[start:end]) != crc:
+                        logging.error("Spool segment %s corrupt at offset %s; skipping rest", seg.path.name, base + offset)
+                        break
+                    offset = end
+                    if seq <= self._checkpoint:
+                        # Ya confirmado (replay previo / reinicio): idempotente
+                        self._cursor_offset = base + end
+                        continue
+                    table, row = pickle.loads(data[start:end])
+                    records.append((seq, table, row))
+                    self._read_offsets[seq] = base + end
+
+                if records or not seg.sealed:
+                    return records
+
+                # Segmento sellado, agotado y confirmado completo => se borra
+                self._segments.pop(0)
+                seg.path.unlink(missing_ok=True)
+                self._cursor_offset = 0
+            return []
+
+    def ack(self, seq: int) -> None:
+        """Confirma hasta seq (inclusive): ya está en la DB."""
+        with self._lock:
+            if seq <= self._checkpoint:
+                return
+            offset = self._read_offsets.get(seq)
+            if offset is not None:
+                self._cursor_offset = offset
+            self.acked += seq - self._checkpoint
+            self._checkpoint = seq
+            self._write_checkpoint()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "depth": self._pending(),
+                "bytes": self._total_bytes(),
+                "segments": len(self._segments),
+                "checkpoint_seq": self._checkpoint,
+                "appended": self.appended,
+                "acked": self.acked,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+            }
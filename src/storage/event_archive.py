@@ -0,0 +1,432 @@
+"""
+Archivo local de eventos syslog (histórico fuera de SQL Server)
+
+Layout (un par de archivos por hora UTC de received_at_utc):
+  <dir>/20261018-14.wtz   bloques zlib append-only: [b"WTAB"][len][count] + JSON lines
+  <dir>/20261018-14.idx   una línea JSON por bloque: offset, length, count, t0/t1 (epoch ms),
+                          routers y hosts del bloque
+
+El lector descarta por nombre de archivo (hora) y por índice (tiempo / router / host)
+antes de descomprimir: solo se lee el bloque que puede tener resultados.
+
+CLI (desde la raíz del repo):
+  python -m src.storage.event_archive --dir logs/archive --from 2026-10-18T10:00 --to 2026-10-18T12:00 \
+      [--router controlm] [--host kcautopilotp01.kcscp.corp] [--count | --segments]
+"""
+import argparse
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+DATA_SUFFIX = ".wtz"
+INDEX_SUFFIX = ".idx"
+_BLOCK_HEADER = struct.Struct(">4sII")
+_BLOCK_MAGIC = b"WTAB"
+_HOUR_FMT = "%Y%m%d-%H"
+
+# Más hosts distintos que esto en un bloque => el índice no los lista (el bloque matchea cualquier host)
+MAX_INDEXED_HOSTS = 256
+
+
+def _epoch(event) -> float:
+    ts = getattr(event, "received_ts", None)
+    if ts is not None:
+        return ts
+    dt = event.received_at_utc
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat() if dt is not None else None
+
+
+def event_record(event, router_name: str, epoch: float) -> dict:
+    return {
+        "received_at_utc": datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec="milliseconds"),
+        "source_ip": event.source_ip,
+        "source_port": event.source_port,
+        "router_name": router_name,
+        "pri": event.pri,
+        "facility": event.facility,
+        "severity": event.severity,
+        "syslog_ts_utc": _iso(event.timestamp),
+        "syslog_ts_raw": event.timestamp_raw,
+        "hostname": event.hostname,
+        "app_name": event.app_name,
+        "pid": event.pid,
+        "msg_id": event.msg_id,
+        "structured_data": event.structured_data,
+        "message": event.message,
+        "raw": event.raw,
+    }
+
+
+def _hour_key(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime(_HOUR_FMT)
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    """ISO 8601 -> epoch; sin zona = UTC."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+# -------------------------------------------------
+# Writer
+# -------------------------------------------------
+
+class EventArchive:
+    """
+    Sink de archivo: add() solo encola (evento, router); un thread serializa,
+    comprime y escribe un bloque por hora cada flush_sec o block_events eventos
+    - append-only: un crash a medio bloque deja bytes sin entrada en el índice (se ignoran)
+    - retain_days > 0 borra segmentos más viejos (revisado una vez por hora)
+    - max_pending acota la memoria si el disco no alcanza (drop contado)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        block_events: int = 2000,
+        flush_sec: float = 5.0,
+        compress_level: int = 6,
+        retain_days: int = 0,
+        max_pending: int = 200000,
+    ):
+        self.directory = Path(directory)
+        self.block_events = max(1, block_events)
+        self.flush_sec = flush_sec
+        self.compress_level = compress_level
+        self.retain_days = retain_days
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[object, str]] = []
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_retention = 0.0
+
+        self.events_written = 0
+        self.blocks_written = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def add(self, event, router_name: str) -> None:
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending.append((event, router_name))
+            full = len(self._pending) >= self.block_events
+        if full:
+            self._wakeup.set()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._flush_loop, name="event-archive", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_sec)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                self._apply_retention()
+            except Exception:
+                logging.exception("Event archive flush failed")
+
+    # -------------------------
+    # Escritura
+    # -------------------------
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        by_hour: Dict[str, List[Tuple[float, object, str]]] = {}
+        for event, router_name in pending:
+            epoch = _epoch(event)
+            by_hour.setdefault(_hour_key(epoch), []).append((epoch, event, router_name))
+
+        with self._write_lock:
+            for hour, items in sorted(by_hour.items()):
+                for i in range(0, len(items), self.block_events):
+                    try:
+                        self._write_block(hour, items[i:i + self.block_events])
+                    except Exception:
+                        self.write_errors += 1
+                        logging.exception("Event archive write failed (%s)", hour)
+
+    def _write_block(self, hour: str, items: List[Tuple[float, object, str]]) -> None:
+        lines = []
+        routers = set()
+        hosts = set()
+        t0 = t1 = items[0][0]
+        for epoch, event, router_name in items:
+            lines.append(json.dumps(event_record(event, router_name, epoch), ensure_ascii=False, separators=(",", ":")))
+            routers.add(router_name)
+            if event.hostname:
+                hosts.add(event.hostname.lower())
+            t0 = min(t0, epoch)
+            t1 = max(t1, epoch)
+
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        compressed = zlib.compress(payload, self.compress_level)
+
+        data_path = self.directory / (hour + DATA_SUFFIX)
+        with open(data_path, "ab") as f:
+            offset = f.tell()
+            f.write(_BLOCK_HEADER.pack(_BLOCK_MAGIC, len(compressed), len(items)) + compressed)
+
+        entry = {
+            "offset": offset,
+            "length": _BLOCK_HEADER.size + len(compressed),
+            "count": len(items),
+            "t0": int(t0 * 1000),
+            "t1": int(t1 * 1000) + 1,
+            "routers": sorted(routers),
+            "hosts": sorted(hosts) if len(hosts) <= MAX_INDEXED_HOSTS else None,
+        }
+        # El índice se escribe después del bloque: una entrada siempre apunta a datos completos
+        with open(self.directory / (hour + INDEX_SUFFIX), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+        self.events_written += len(items)
+        self.blocks_written += 1
+        self.bytes_in += len(payload)
+        self.bytes_out += entry["length"]
+
+    def _apply_retention(self) -> None:
+        if self.retain_days <= 0 or time.monotonic() - self._last_retention < 3600:
+            return
+        self._last_retention = time.monotonic()
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.retain_days)).strftime(_HOUR_FMT)
+        removed = 0
+        for path in self.directory.glob("*" + DATA_SUFFIX):
+            if path.stem < cutoff:
+                path.unlink(missing_ok=True)
+                path.with_suffix(INDEX_SUFFIX).unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logging.info("Event archive retention: removed %s hourly segments older than %s", removed, cutoff)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "pending": len(self._pending),
+            "events_written": self.events_written,
+            "blocks_written": self.blocks_written,
+            "compression_ratio": round(self.bytes_in / self.bytes_out, 2) if self.bytes_out else None,
+            "bytes_written": self.bytes_out,
+            "dropped": self.dropped,
+            "write_errors": self.write_errors,
+        }
+
+
+# -------------------------------------------------
+# Reader
+# -------------------------------------------------
+
+class ArchiveReader:
+    """
+    Lectura por rango de tiempo con filtros opcionales de router / hostname
+    directory puede ser el de un proceso o el padre de los shard-N (se leen todos).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def _dirs(self) -> List[Path]:
+        dirs = [self.directory]
+        dirs.extend(sorted(p for p in self.directory.glob("shard-*") if p.is_dir()))
+        return dirs
+
+    def segments(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Path]:
+        """Archivos .wtz cuya hora cae en [start, end) (solo por nombre, sin abrirlos)."""
+        out = []
+        for d in self._dirs():
+            for path in sorted(d.glob("*" + DATA_SUFFIX)):
+                try:
+                    hour = datetime.strptime(path.stem, _HOUR_FMT).replace(tzinfo=timezone.utc).timestamp()
+                except ValueError:
+                    continue
+                if end is not None and hour >= end:
+                    continue
+                if start is not None and hour + 3600 <= start:
+                    continue
+                out.append(path)
+        return out
+
+    @staticmethod
+    def read_index(data_path: Path) -> List[dict]:
+        index_path = data_path.with_suffix(INDEX_SUFFIX)
+        entries = []
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        # Línea cortada por crash: el resto del índice sigue valiendo
+                        continue
+        except FileNotFoundError:
+            return ArchiveReader._scan_blocks(data_path)
+        return entries
+
+    @staticmethod
+    def _scan_blocks(data_path: Path) -> List[dict]:
+        """Sin .idx: recorre los headers de bloque (sin filtros de router/host ni tiempo)."""
+        entries = []
+        with open(data_path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset + _BLOCK_HEADER.size <= len(data):
+            magic, length, count = _BLOCK_HEADER.unpack_from(data, offset)
+            end = offset + _BLOCK_HEADER.size + length
+            if magic != _BLOCK_MAGIC or end > len(data):
+                break
+            entries.append({"offset": offset, "length": end - offset, "count": count, "routers": None, "hosts": None})
+            offset = end
+        return entries
+
+    @staticmethod
+    def _block_matches(entry: dict, start_ms, end_ms, router, host) -> bool:
+        if start_ms is not None and entry.get("t1") is not None and entry["t1"] <= start_ms:
+            return False
+        if end_ms is not None and entry.get("t0") is not None and entry["t0"] >= end_ms:
+            return False
+        if router is not None and entry.get("routers") is not None and router not in entry["routers"]:
+            return False
+        if host is not None and entry.get("hosts") is not None and host not in entry["hosts"]:
+            return False
+        return True
+
+    @staticmethod
+    def _read_block(f, entry: dict) -> List[dict]:
+        f.seek(entry["offset"])
+        raw = f.read(entry["length"])
+        magic, length, _count = _BLOCK_HEADER.unpack_from(raw, 0)
+        if magic != _BLOCK_MAGIC:
+            raise ValueError(f"bad block magic at offset {entry['offset']}")
+        payload = zlib.decompress(raw[_BLOCK_HEADER.size:_BLOCK_HEADER.size + length])
+        return [json.loads(line) for line in payload.decode("utf-8").splitlines() if line]
+
+    def iter_events(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        router: Optional[str] = None,
+        hostname: Optional[str] = None,
+    ) -> Iterator[dict]:
+        """Eventos (dict) con received_at_utc en [start, end) epoch, en orden por segmento/bloque."""
+        start_ms = int(start * 1000) if start is not None else None
+        end_ms = int(end * 1000) if end is not None else None
+        host = hostname.lower() if hostname else None
+
+        for data_path in self.segments(start, end):
+            entries = [e for e in self.read_index(data_path) if self._block_matches(e, start_ms, end_ms, router, host)]
+            if not entries:
+                continue
+            with open(data_path, "rb") as f:
+                for entry in entries:
+                    try:
+                        records = self._read_block(f, entry)
+                    except (ValueError, zlib.error, struct.error) as exc:
+                        logging.warning("Archive block skipped (%s @%s): %s", data_path.name, entry.get("offset"), exc)
+                        continue
+                    for rec in records:
+                        if router is not None and rec.get("router_name") != router:
+                            continue
+                        if host is not None and (rec.get("hostname") or "").lower() != host:
+                            continue
+                        if start is not None or end is not None:
+                            epoch = _parse_time(rec["received_at_utc"])
+                            if start is not None and epoch < start:
+                                continue
+                            if end is not None and epoch >= end:
+                                continue
+                        yield rec
+
+    def segment_summary(self, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        out = []
+        for data_path in self.segments(start, end):
+            entries = self.read_index(data_path)
+            out.append({
+                "segment": str(data_path),
+                "blocks": len(entries),
+                "events": sum(e.get("count", 0) for e in entries),
+                "bytes": data_path.stat().st_size,
+            })
+        return out
+
+
+# -------------------------------------------------
+# CLI
+# -------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Lee el archivo local de eventos syslog")
+    ap.add_argument("--dir", default=os.getenv("ARCHIVE_DIR", "logs/archive"))
+    ap.add_argument("--from", dest="start", help="ISO 8601 (sin zona = UTC), inclusivo")
+    ap.add_argument("--to", dest="end", help="ISO 8601 (sin zona = UTC), exclusivo")
+    ap.add_argument("--router")
+    ap.add_argument("--host")
+    ap.add_argument("--count", action="store_true", help="solo cuenta los eventos")
+    ap.add_argument("--segments", action="store_true", help="lista los segmentos del rango")
+    args = ap.parse_args(argv)
+
+    reader = ArchiveReader(args.dir)
+    start, end = _parse_time(args.start), _parse_time(args.end)
+
+    if args.segments:
+        for seg in reader.segment_summary(start, end):
+            print(json.dumps(seg))
+        return 0
+
+    n = 0
+    for rec in reader.iter_events(start, end, router=args.router, hostname=args.host):
+        n += 1
+        if not args.count:
+            sys.stdout.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    if args.count:
+        print(n)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
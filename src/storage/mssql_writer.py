@@ -1,15 +1,82 @@
 import os
 import logging
-from typing import Optional, Dict
+import time
+from datetime import datetime
+from typing import Optional, Dict, List, Sequence
 
 import pyodbc
 from dotenv import load_dotenv
 from pathlib import Path
 
+from src.core.metrics import DB_INSERT_ERRORS, DB_INSERT_ROWS, DB_INSERT_SECONDS
 from src.domain.models import SyslogEvent
+from src.storage.connection_pool import ConnectionPool, PoolTimeout
+from src.storage.raw_storage import (
+    CONTROLM_ROUTER_LOGS_LAYOUT,
+    STORAGE_FULL,
+    SYSLOG_EVENTS_LAYOUT,
+    StorageStats,
+    check_mode,
+    storage_rows,
+)
 
 PROJECT_ROOT = Path(r"D:\cpkc_tac_programs\watchtower")
 
+SYSLOG_EVENTS_INSERT = """
+    INSERT INTO dbo.syslog_events (
+        received_at_utc, source_ip, source_port, router_name,
+        pri, facility, severity,
+        syslog_ts_utc, syslog_ts_raw,
+        hostname, app_name, pid,
+        message, raw
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+CONTROLM_ROUTER_LOGS_INSERT = """
+    INSERT INTO dbo.ControlM_Router_Logs (
+        received_at_utc, source_ip, source_port,
+        router_name, hostname, app_name,
+        pri, facility, severity,
+        syslog_ts_utc, syslog_ts_raw,
+        message, raw
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# MSSQL_STORAGE_MODE=compact|compressed (requiere queries/storage_mode.sql):
+# raw NULL si se reconstruye desde los campos; raw_z = gzip UTF-16LE (COMPRESS de SQL Server)
+SYSLOG_EVENTS_INSERT_Z = """
+    INSERT INTO dbo.syslog_events (
+        received_at_utc, source_ip, source_port, router_name,
+        pri, facility, severity,
+        syslog_ts_utc, syslog_ts_raw,
+        hostname, app_name, pid,
+        message, raw, raw_z
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+CONTROLM_ROUTER_LOGS_INSERT_Z = """
+    INSERT INTO dbo.ControlM_Router_Logs (
+        received_at_utc, source_ip, source_port,
+        router_name, hostname, app_name,
+        pri, facility, severity,
+        syslog_ts_utc, syslog_ts_raw,
+        message, raw, raw_z
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    """True si el error es de conectividad (DB caída / timeout), no de datos."""
+    if isinstance(exc, (pyodbc.OperationalError, pyodbc.InterfaceError, PoolTimeout)):
+        return True
+    sqlstate = exc.args[0] if getattr(exc, "args", None) else ""
+    return isinstance(sqlstate, str) and (sqlstate.startswith("08") or sqlstate == "HYT00")
+
+
 class MSSQLWriter:
     """
     Writer para 2 DBs en el mismo servidor (misma credencial SQL Auth):
@@ -30,9 +97,24 @@ class MSSQLWriter:
         if not all([self.server, self.user, self.password]):
             raise ValueError("Missing MSSQL env vars: MSSQL_SERVER, MSSQL_USER, MSSQL_PASSWORD")
 
+        # fast_executemany acelera mucho los bulk inserts (param arrays ODBC)
+        self.fast_executemany = os.getenv("MSSQL_FAST_EXECUTEMANY", "1").strip() in ("1", "true", "True", "YES", "yes")
+
+        # full (default) | compact | compressed: cómo se guarda raw (ver raw_storage)
+        self.storage_mode = check_mode(os.getenv("MSSQL_STORAGE_MODE", STORAGE_FULL))
+        self.storage_stats = {"syslog_events": StorageStats(), "controlm_router_logs": StorageStats()}
+        full = self.storage_mode == STORAGE_FULL
+        self.syslog_events_sql = SYSLOG_EVENTS_INSERT if full else SYSLOG_EVENTS_INSERT_Z
+        self.controlm_router_logs_sql = CONTROLM_ROUTER_LOGS_INSERT if full else CONTROLM_ROUTER_LOGS_INSERT_Z
+
         self.cs_logs = self._build_cs(self.db_logs)
         self.cs_controlm = self._build_cs(self.db_controlm)
 
+        # Pool persistente por DB (evita login/TLS por mensaje)
+        self.connect_timeout = int(os.getenv("MSSQL_CONNECT_TIMEOUT", "5"))
+        self.pool_logs = self._build_pool(self.db_logs, self.cs_logs)
+        self.pool_controlm = self._build_pool(self.db_controlm, self.cs_controlm)
+
     def _build_cs(self, database: str) -> str:
         # Driver name debe ir entre llaves: DRIVER={ODBC Driver 18 for SQL Server}
         return (
@@ -44,77 +126,117 @@ class MSSQLWriter:
             "TrustServerCertificate=yes;"
         )
 
+    def _build_pool(self, database: str, cs: str) -> ConnectionPool:
+        return ConnectionPool(
+            name=database,
+            connect=lambda: pyodbc.connect(cs, timeout=self.connect_timeout),
+            size=int(os.getenv("MSSQL_POOL_SIZE", "4")),
+            max_idle_sec=float(os.getenv("MSSQL_POOL_MAX_IDLE_SEC", "300")),
+            ping_after_sec=float(os.getenv("MSSQL_POOL_PING_AFTER_SEC", "30")),
+            is_broken=is_connection_error,
+        )
+
+    def _executemany(self, pool: ConnectionPool, sql: str, rows: Sequence[tuple], table: str) -> None:
+        if not rows:
+            return
+        t0 = time.perf_counter()
+        try:
+            with pool.connection() as conn:
+                cur = conn.cursor()
+                if len(rows) > 1:
+                    cur.fast_executemany = self.fast_executemany
+                    cur.executemany(sql, rows)
+                else:
+                    cur.execute(sql, rows[0])
+                conn.commit()
+        except Exception as exc:
+            DB_INSERT_ERRORS.labels(table, "connection" if is_connection_error(exc) else "data").inc()
+            raise
+        finally:
+            DB_INSERT_SECONDS.labels(table).observe(time.perf_counter() - t0)
+        DB_INSERT_ROWS.labels(table).inc(len(rows))
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "pool_logs": self.pool_logs.stats(),
+            "pool_controlm": self.pool_controlm.stats(),
+            "storage": {
+                "mode": self.storage_mode,
+                **{table: st.as_dict() for table, st in self.storage_stats.items()},
+            },
+        }
+
+    def close(self) -> None:
+        self.pool_logs.close()
+        self.pool_controlm.close()
+
     # -------------------------
     # watchtower_logs
     # -------------------------
     def insert_syslog_event(self, event: SyslogEvent, router_name: str) -> None:
         try:
-            with pyodbc.connect(self.cs_logs, timeout=5) as conn:
-                cur = conn.cursor()
-                cur.execute("""
-                    INSERT INTO dbo.syslog_events (
-                        received_at_utc, source_ip, source_port, router_name,
-                        pri, facility, severity,
-                        syslog_ts_utc, syslog_ts_raw,
-                        hostname, app_name, pid,
-                        message, raw
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                event.received_at_utc,
-                event.source_ip,
-                event.source_port,
-                router_name,
-                event.pri,
-                event.facility,
-                event.severity,
-                event.timestamp,
-                event.timestamp_raw,
-                event.hostname,
-                event.app_name,
-                event.pid,
-                event.message,
-                event.raw
-                )
-                conn.commit()
+            self.insert_syslog_events([self.syslog_event_row(event, router_name)])
         except Exception:
             logging.exception("DB insert failed (watchtower_logs.syslog_events)")
 
+    def insert_syslog_events(self, rows: Sequence[tuple]) -> None:
+        """Bulk insert (una transacción). Lanza excepción si falla."""
+        rows = storage_rows(self.storage_mode, rows, SYSLOG_EVENTS_LAYOUT, self.storage_stats["syslog_events"])
+        self._executemany(self.pool_logs, self.syslog_events_sql, rows, "syslog_events")
+
+    @staticmethod
+    def syslog_event_row(event: SyslogEvent, router_name: str) -> tuple:
+        return (
+            event.received_at_utc,
+            event.source_ip,
+            event.source_port,
+            router_name,
+            event.pri,
+            event.facility,
+            event.severity,
+            event.timestamp,
+            event.timestamp_raw,
+            event.hostname,
+            event.app_name,
+            event.pid,
+            event.message,
+            event.raw,
+        )
+
     # -------------------------
     # watchtower_controlm
     # -------------------------
     def insert_controlm_router_log(self, event: SyslogEvent, router_name: str) -> None:
         try:
-            with pyodbc.connect(self.cs_controlm, timeout=5) as conn:
-                cur = conn.cursor()
-                cur.execute("""
-                    INSERT INTO dbo.ControlM_Router_Logs (
-                        received_at_utc, source_ip, source_port,
-                        router_name, hostname, app_name,
-                        pri, facility, severity,
-                        syslog_ts_utc, syslog_ts_raw,
-                        message, raw
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                event.received_at_utc,
-                event.source_ip,
-                event.source_port,
-                router_name,
-                event.hostname,
-                event.app_name,
-                event.pri,
-                event.facility,
-                event.severity,
-                event.timestamp,
-                event.timestamp_raw,
-                event.message,
-                event.raw
-                )
-                conn.commit()
+            self.insert_controlm_router_logs([self.controlm_router_log_row(event, router_name)])
         except Exception:
             logging.exception("DB insert failed (watchtower_controlm.ControlM_Router_Logs)")
 
+    def insert_controlm_router_logs(self, rows: Sequence[tuple]) -> None:
+        """Bulk insert (una transacción). Lanza excepción si falla."""
+        rows = storage_rows(
+            self.storage_mode, rows, CONTROLM_ROUTER_LOGS_LAYOUT, self.storage_stats["controlm_router_logs"]
+        )
+        self._executemany(self.pool_controlm, self.controlm_router_logs_sql, rows, "controlm_router_logs")
+
+    @staticmethod
+    def controlm_router_log_row(event: SyslogEvent, router_name: str) -> tuple:
+        return (
+            event.received_at_utc,
+            event.source_ip,
+            event.source_port,
+            router_name,
+            event.hostname,
+            event.app_name,
+            event.pri,
+            event.facility,
+            event.severity,
+            event.timestamp,
+            event.timestamp_raw,
+            event.message,
+            event.raw,
+        )
+
     def lookup_controlm_job(self, job_name: Optional[str]) -> Dict[str, Optional[object]]:
         """
         Busca en watchtower_controlm:
@@ -128,29 +250,63 @@ class MSSQLWriter:
             return {"group_code": None, "group_name": None, "sev_num": None}
 
         try:
-            with pyodbc.connect(self.cs_controlm, timeout=5) as conn:
-                cur = conn.cursor()
-                cur.execute("""
-                    SELECT TOP 1
-                        j.GroupCode,
-                        g.GroupName,
-                        j.Severity
-                    FROM dbo.Jobs_information j
-                    LEFT JOIN dbo.Groups g
-                        ON g.GroupCode = j.GroupCode
-                    WHERE j.JobName = ?
-                """, job_name)
-
-                row = cur.fetchone()
-                if not row:
-                    return {"group_code": None, "group_name": None, "sev_num": None}
-
-                group_code = row[0]
-                group_name = row[1]
-                sev_num = int(row[2]) if row[2] is not None else None
-
-                return {"group_code": group_code, "group_name": group_name, "sev_num": sev_num}
-
+            found = self.fetch_controlm_job(job_name)
         except Exception:
             logging.exception("DB lookup failed (watchtower_controlm Jobs/Groups)")
-            return {"group_code": None, "group_name": None, "sev_num": None}
+            found = None
+
+        return found or {"group_code": None, "group_name": None, "sev_num": None}
+
+    def fetch_controlm_job(self, job_name: str) -> Optional[Dict[str, Optional[object]]]:
+        """Igual que lookup_controlm_job pero None si no existe y lanza excepción si la DB falla."""
+        with self.pool_controlm.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT TOP 1
+                    j.GroupCode,
+                    g.GroupName,
+                    j.Severity
+                FROM dbo.Jobs_information j
+                LEFT JOIN dbo.Groups g
+                    ON g.GroupCode = j.GroupCode
+                WHERE j.JobName = ?
+            """, job_name)
+
+            row = cur.fetchone()
+            if not row:
+                return None
+
+            return {
+                "group_code": row[0],
+                "group_name": row[1],
+                "sev_num": int(row[2]) if row[2] is not None else None,
+            }
+
+    def fetch_controlm_jobs(self, since: Optional[datetime] = None) -> List[tuple]:
+        """
+        Snapshot de Jobs_information + Groups para la réplica en memoria.
+        since=None => tabla completa; si no, solo filas con CreatedAtUtc > since.
+
+        Returns:
+          [(JobName, GroupCode, GroupName, Severity, ChangedAtUtc), ...]
+        """
+        sql = """
+            SELECT
+                j.JobName,
+                j.GroupCode,
+                g.GroupName,
+                j.Severity,
+                CASE WHEN g.CreatedAtUtc > j.CreatedAtUtc THEN g.CreatedAtUtc ELSE j.CreatedAtUtc END
+            FROM dbo.Jobs_information j
+            LEFT JOIN dbo.Groups g
+                ON g.GroupCode = j.GroupCode
+        """
+        params: tuple = ()
+        if since is not None:
+            sql += " WHERE j.CreatedAtUtc > ? OR g.CreatedAtUtc > ?"
+            params = (since, since)
+
+        with self.pool_controlm.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, *params)
+            return [tuple(r) for r in cur.fetchall()]
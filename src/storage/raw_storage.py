@@ -0,0 +1,173 @@
+import gzip
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+
+# MSSQL_STORAGE_MODE
+STORAGE_FULL = "full"              # message + raw completos (esquema original)
+STORAGE_COMPACT = "compact"        # raw = NULL si se reconstruye idéntico desde los campos parseados
+STORAGE_COMPRESSED = "compressed"  # como compact; si no se reconstruye va comprimido en raw_z
+STORAGE_MODES = (STORAGE_FULL, STORAGE_COMPACT, STORAGE_COMPRESSED)
+
+
+class RowLayout:
+    """Posiciones de los campos en una fila de insert (ver MSSQLWriter.*_row)."""
+
+    def __init__(self, pri: int, ts_raw: int, hostname: int, app_name: int, pid: Optional[int], message: int, raw: int):
+        self.pri = pri
+        self.ts_raw = ts_raw
+        self.hostname = hostname
+        self.app_name = app_name
+        self.pid = pid
+        self.message = message
+        self.raw = raw
+
+
+# syslog_events: (..., pri, facility, severity, ts, ts_raw, hostname, app_name, pid, message, raw)
+SYSLOG_EVENTS_LAYOUT = RowLayout(pri=4, ts_raw=8, hostname=9, app_name=10, pid=11, message=12, raw=13)
+# ControlM_Router_Logs no guarda pid: solo se reconstruye el raw de mensajes sin [pid]
+CONTROLM_ROUTER_LOGS_LAYOUT = RowLayout(pri=6, ts_raw=10, hostname=4, app_name=5, pid=None, message=11, raw=12)
+
+
+def rebuild_raw(
+    pri: Optional[int],
+    ts_raw: Optional[str],
+    hostname: Optional[str],
+    app_name: Optional[str],
+    pid: Optional[int],
+    message: Optional[str],
+) -> Optional[str]:
+    """
+    Forma canónica RFC 3164: "<PRI>TIMESTAMP HOST APP[PID]: MSG".
+    Misma expresión que la vista SQL (queries/storage_mode.sql).
+    None si faltan campos.
+    """
+    if pri is None or not ts_raw or not hostname or not app_name or message is None:
+        return None
+    tag = app_name if pid is None else f"{app_name}[{pid}]"
+    return f"<{pri}>{ts_raw} {hostname} {tag}: {message}"
+
+
+def compress_raw(raw: str) -> bytes:
+    """gzip de UTF-16LE: lo mismo que COMPRESS(N'...') en SQL Server (DECOMPRESS lo lee)."""
+    return gzip.compress(raw.encode("utf-16-le"), mtime=0)
+
+
+def decompress_raw(raw_z: bytes) -> str:
+    return gzip.decompress(raw_z).decode("utf-16-le")
+
+
+def encode_raw(mode: str, raw: str, rebuilt: Optional[str]) -> Tuple[Optional[str], Optional[bytes]]:
+    """(raw, raw_z) a guardar según el modo."""
+    if mode == STORAGE_FULL:
+        return raw, None
+    if rebuilt is not None and rebuilt == raw:
+        return None, None
+    if mode == STORAGE_COMPRESSED:
+        raw_z = compress_raw(raw)
+        # Mensajes muy cortos: gzip (header ~20 bytes) puede salir más grande que el texto
+        if len(raw_z) < 2 * len(raw):
+            return None, raw_z
+    return raw, None
+
+
+def read_raw(
+    raw: Optional[str],
+    raw_z: Optional[bytes],
+    pri: Optional[int],
+    ts_raw: Optional[str],
+    hostname: Optional[str],
+    app_name: Optional[str],
+    pid: Optional[int],
+    message: Optional[str],
+) -> Optional[str]:
+    """Raw original de una fila leída de la DB, sin importar el modo con que se escribió."""
+    if raw is not None:
+        return raw
+    if raw_z is not None:
+        return decompress_raw(bytes(raw_z))
+    return rebuild_raw(pri, ts_raw, hostname, app_name, pid, message)
+
+
+class StorageStats:
+    """Bytes de raw (como NVARCHAR: 2 bytes/char) antes y después del modo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.rebuilt = 0
+        self.compressed = 0
+        self.raw_bytes_in = 0
+        self.raw_bytes_stored = 0
+
+    def add(self, rows: int, rebuilt: int, compressed: int, raw_bytes_in: int, raw_bytes_stored: int) -> None:
+        with self._lock:
+            self.rows += rows
+            self.rebuilt += rebuilt
+            self.compressed += compressed
+            self.raw_bytes_in += raw_bytes_in
+            self.raw_bytes_stored += raw_bytes_stored
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "raw_rebuilt": self.rebuilt,
+            "raw_compressed": self.compressed,
+            "raw_bytes_in": self.raw_bytes_in,
+            "raw_bytes_stored": self.raw_bytes_stored,
+            "raw_bytes_per_row_in": round(self.raw_bytes_in / self.rows, 1) if self.rows else 0.0,
+            "raw_bytes_per_row_stored": round(self.raw_bytes_stored / self.rows, 1) if self.rows else 0.0,
+        }
+
+
+def storage_rows(
+    mode: str,
+    rows: Iterable[tuple],
+    layout: RowLayout,
+    stats: Optional[StorageStats] = None,
+) -> List[tuple]:
+    """
+    Filas completas (MSSQLWriter.*_row) -> filas para el INSERT del modo.
+    full: sin cambios. compact/compressed: raw reemplazado y raw_z agregado al final.
+    """
+    rows = list(rows)
+    if mode == STORAGE_FULL:
+        if stats is not None:
+            n = sum(2 * len(row[layout.raw]) for row in rows)
+            stats.add(len(rows), 0, 0, n, n)
+        return rows
+
+    out = []
+    rebuilt_n = compressed_n = bytes_in = bytes_stored = 0
+    for row in rows:
+        raw = row[layout.raw]
+        rebuilt = rebuild_raw(
+            row[layout.pri],
+            row[layout.ts_raw],
+            row[layout.hostname],
+            row[layout.app_name],
+            row[layout.pid] if layout.pid is not None else None,
+            row[layout.message],
+        )
+        new_raw, raw_z = encode_raw(mode, raw, rebuilt)
+        bytes_in += 2 * len(raw)
+        if raw_z is not None:
+            compressed_n += 1
+            bytes_stored += len(raw_z)
+        elif new_raw is None:
+            rebuilt_n += 1
+        else:
+            bytes_stored += 2 * len(new_raw)
+        out.append(row[:layout.raw] + (new_raw, raw_z) + row[layout.raw + 1:])
+
+    if stats is not None:
+        stats.add(len(out), rebuilt_n, compressed_n, bytes_in, bytes_stored)
+    return out
+
+
+def check_mode(mode: str) -> str:
+    mode = (mode or STORAGE_FULL).strip().lower()
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Invalid MSSQL_STORAGE_MODE={mode!r} (expected one of {list(STORAGE_MODES)})")
+    return mode
+
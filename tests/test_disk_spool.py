@@ -0,0 +1,122 @@
+import os
+
+from src.storage.disk_spool import DiskSpool
+
+
+def _rows(start: int, count: int, width: int = 16):
+    return [(i, "x" * width) for i in range(start, start + count)]
+
+
+def _segments(directory):
+    return sorted(p for p in directory.iterdir() if p.suffix == ".seg")
+
+
+def test_recover_truncates_torn_tail(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    assert spool.append("syslog_events", _rows(1, 5)) == 5
+    spool.close()
+
+    # Crash a mitad del último registro
+    seg = _segments(tmp_path)[0]
+    size = seg.stat().st_size
+    with open(seg, "r+b") as f:
+        f.truncate(size - 3)
+
+    spool = DiskSpool(str(tmp_path))
+    assert spool.pending() == 4
+    assert seg.stat().st_size < size - 3  # la cola cortada se quitó del archivo
+
+    records = spool.read(100)
+    assert [seq for seq, _table, _row in records] == [1, 2, 3, 4]
+    assert [row for _seq, _table, row in records] == _rows(1, 4)
+
+    # El seq perdido se reutiliza y lo nuevo se lee después de lo recuperado
+    spool.append("syslog_events", _rows(99, 1))
+    spool.ack(4)
+    assert [(seq, row) for seq, _table, row in spool.read(100)] == [(5, (99, "x" * 16))]
+    spool.close()
+
+
+def test_partial_ack_survives_reopen(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    spool.append("syslog_events", _rows(1, 6))
+    spool.append("ControlM_Router_Logs", _rows(7, 4))
+
+    records = spool.read(100)
+    assert [seq for seq, _t, _r in records] == list(range(1, 11))
+    spool.ack(4)
+    # Mismo proceso: el cursor avanza hasta lo confirmado
+    assert [seq for seq, _t, _r in spool.read(100)] == list(range(5, 11))
+    spool.close()
+
+    # Reinicio: el checkpoint evita re-entregar 1..4
+    spool = DiskSpool(str(tmp_path))
+    assert spool.pending() == 6
+    records = spool.read(100)
+    assert [seq for seq, _t, _r in records] == list(range(5, 11))
+    assert records[-1][1] == "ControlM_Router_Logs"
+
+    spool.ack(10)
+    assert spool.read(100) == []
+    assert spool.stats()["depth"] == 0
+    spool.close()
+
+
+def test_ack_all_then_reopen_removes_segments(tmp_path):
+    spool = DiskSpool(str(tmp_path))
+    spool.append("syslog_events", _rows(1, 3))
+    spool.read(100)
+    spool.ack(3)
+    spool.close()
+
+    spool = DiskSpool(str(tmp_path))
+    assert spool.pending() == 0
+    assert _segments(tmp_path) == []
+    # Los seq siguen después del checkpoint
+    spool.append("syslog_events", _rows(4, 1))
+    assert spool.read(100)[0][0] == 4
+    spool.close()
+
+
+def test_max_bytes_drops_oldest_segment(tmp_path):
+    # segment_bytes mínimo 64 KiB => max_bytes de 4 segmentos
+    spool = DiskSpool(str(tmp_path), max_bytes=256 * 1024, segment_bytes=64 * 1024)
+    total = 0
+    for i in range(200):
+        total += spool.append("syslog_events", _rows(i * 10, 10, width=200))
+    stats = spool.stats()
+
+    assert total == 2000
+    assert stats["rejected"] == 0
+    assert stats["dropped"] > 0
+    assert stats["bytes"] <= 256 * 1024
+    assert stats["depth"] == total - stats["dropped"]
+    assert sum(p.stat().st_size for p in _segments(tmp_path)) == stats["bytes"]
+
+    # Lo descartado es exactamente lo más viejo: la lectura arranca en dropped + 1, sin huecos
+    seqs = []
+    while True:
+        records = spool.read(500)
+        if not records:
+            break
+        seqs.extend(seq for seq, _t, _r in records)
+        spool.ack(records[-1][0])
+    assert seqs == list(range(stats["dropped"] + 1, total + 1))
+    spool.close()
+
+
+def test_drop_while_reading_resets_cursor(tmp_path):
+    spool = DiskSpool(str(tmp_path), max_bytes=256 * 1024, segment_bytes=64 * 1024)
+    spool.append("syslog_events", _rows(0, 10, width=200))
+    first = spool.read(5)
+    spool.ack(first[-1][0])
+
+    # Llenar hasta descartar el segmento que se estaba leyendo
+    while spool.stats()["dropped"] == 0:
+        spool.append("syslog_events", _rows(0, 10, width=200))
+
+    dropped = spool.stats()["dropped"]
+    records = spool.read(1)
+    assert records[0][0] == 5 + dropped + 1
+    assert not os.path.exists(tmp_path / f"{1:020d}.seg")
+    spool.close()
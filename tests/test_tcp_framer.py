@@ -0,0 +1,78 @@
+import pytest
+
+from src.core.tcp_syslog_listener import FramingError, SyslogFramer
+
+
+def _octet(msg: bytes) -> bytes:
+    return str(len(msg)).encode("ascii") + b" " + msg
+
+
+def _feed_bytewise(framer: SyslogFramer, data: bytes):
+    frames = []
+    for i in range(len(data)):
+        frames.extend(framer.feed(data[i : i + 1]))
+    return frames
+
+
+MESSAGES = [
+    b"<13>Oct 18 10:00:00 host app: hello",
+    b"<14>1 2026-10-18T10:00:00Z host app 12 - - multi\nline",
+    b"<11>x",
+]
+
+
+def test_octet_counting_split_bytewise():
+    framer = SyslogFramer()
+    frames = _feed_bytewise(framer, b"".join(_octet(m) for m in MESSAGES))
+    # El LF dentro de un frame octet-counted es parte del mensaje
+    assert frames == MESSAGES
+    assert framer.buffered == 0
+
+
+def test_octet_counting_split_at_every_boundary():
+    stream = b"".join(_octet(m) for m in MESSAGES)
+    for cut in range(1, len(stream)):
+        framer = SyslogFramer()
+        frames = framer.feed(stream[:cut]) + framer.feed(stream[cut:])
+        assert frames == MESSAGES, cut
+
+
+def test_lf_framing_split_bytewise():
+    framer = SyslogFramer()
+    stream = b"<13>first\r\n<14>second\n\n<15>third\n<16>pending"
+    frames = _feed_bytewise(framer, stream)
+    # CR final fuera, líneas vacías ignoradas, el último frame espera su LF
+    assert frames == [b"<13>first", b"<14>second", b"<15>third"]
+    assert framer.buffered == len(b"<16>pending")
+    assert framer.feed(b"\n") == [b"<16>pending"]
+
+
+def test_mixed_framing_and_leading_digit_lf_frame():
+    framer = SyslogFramer()
+    stream = _octet(b"<13>counted") + b"2026-10-18 10:00:00 no pri\n" + _octet(b"<14>again")
+    frames = _feed_bytewise(framer, stream)
+    assert frames == [b"<13>counted", b"2026-10-18 10:00:00 no pri", b"<14>again"]
+
+
+def test_octet_count_over_max_frame_raises():
+    framer = SyslogFramer(max_frame=16)
+    assert framer.feed(_octet(b"<13>0123456789a")) == [b"<13>0123456789a"]
+    with pytest.raises(FramingError):
+        framer.feed(b"17 ")
+
+
+def test_lf_frame_over_max_frame_is_truncated_and_rest_discarded():
+    framer = SyslogFramer(max_frame=16)
+    long_line = b"<13>" + b"a" * 40
+    stream = long_line + b"\n<14>next\n"
+    frames = _feed_bytewise(framer, stream)
+    assert frames == [long_line[:16], b"<14>next"]
+    assert framer.oversize == 1
+    assert framer.buffered == 0
+
+
+def test_lf_frame_over_max_frame_in_one_read():
+    framer = SyslogFramer(max_frame=16)
+    frames = framer.feed(b"<13>" + b"b" * 40 + b"\n<14>ok\n")
+    assert frames == [b"<13>" + b"b" * 12, b"<14>ok"]
+    assert framer.oversize == 1
@@ -16,6 +16,10 @@ STDERR_LOG = os.path.join(LOG_DIR, "service_stderr.log")
 
 APP_ARGS = [PYTHON_EXE, "-m", "src.main"]
 
+# El hijo sabe que corre como servicio: sin print()/consola por mensaje
+# (stdout/stderr van a archivos y duplicarían logs/syslog_listener.log)
+APP_ENV = dict(os.environ, WATCHTOWER_SERVICE="1")
+
 
 class WatchtowerService(win32serviceutil.ServiceFramework):
     _svc_name_ = "Watchtower"
@@ -53,6 +57,7 @@ class WatchtowerService(win32serviceutil.ServiceFramework):
             self.proc = subprocess.Popen(
                 APP_ARGS,
                 cwd=PROJECT_ROOT,
+                env=APP_ENV,
                 stdout=out,
                 stderr=err,
                 creationflags=subprocess.CREATE_NO_WINDOW,
@@ -71,6 +76,7 @@ class WatchtowerService(win32serviceutil.ServiceFramework):
                     self.proc = subprocess.Popen(
                         APP_ARGS,
                         cwd=PROJECT_ROOT,
+                        env=APP_ENV,
                         stdout=out,
                         stderr=err,
                         creationflags=subprocess.CREATE_NO_WINDOW,